@@ -1,6 +1,7 @@
-from fastapi import APIRouter
-from .endpoints import  forecast_router
-
-api_router = APIRouter()
-
-api_router.include_router(forecast_router, prefix="/forecast", tags=["forecast"])
\ No newline at end of file
+from fastapi import APIRouter
+from .endpoints import  forecast_router, metrics_router
+
+api_router = APIRouter()
+
+api_router.include_router(forecast_router, prefix="/forecast", tags=["forecast"])
+api_router.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
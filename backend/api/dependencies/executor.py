@@ -0,0 +1,27 @@
+# dependencies/executor.py
+
+import typing as t
+from backend.config import settings
+from backend.services.executor import BlockingExecutor
+
+blocking_executor: t.Optional[BlockingExecutor] = None
+
+def create_executor() -> BlockingExecutor:
+    return BlockingExecutor(
+        kind=settings.EXECUTOR_KIND,
+        max_workers=settings.EXECUTOR_MAX_WORKERS,
+        max_concurrency=settings.EXECUTOR_MAX_CONCURRENCY,
+        models_dir=settings.MODELS_DIR,
+    )
+
+async def get_executor() -> BlockingExecutor:
+    global blocking_executor
+    if blocking_executor is None:
+        raise RuntimeError("Executor not initialized")
+    return blocking_executor
+
+def close_executor():
+    global blocking_executor
+    if blocking_executor is not None:
+        blocking_executor.shutdown()
+        blocking_executor = None
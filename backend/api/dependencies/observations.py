@@ -0,0 +1,38 @@
+# dependencies/observations.py
+
+import typing as t
+from backend.config import settings
+from backend.services.executor import BlockingExecutor
+from backend.services.observations import CassandraSource, MeteostatSource, ObservationSource
+from db.cassandra.repository import CassandraRepository
+
+observation_source: t.Optional[ObservationSource] = None
+cassandra_repository: t.Optional[CassandraRepository] = None
+
+def create_observation_source(executor: BlockingExecutor) -> ObservationSource:
+    global cassandra_repository
+    meteostat = MeteostatSource(executor)
+    if settings.OBSERVATION_SOURCE == "meteostat":
+        return meteostat
+    if settings.OBSERVATION_SOURCE != "cassandra":
+        raise ValueError(f"Unknown observation source {settings.OBSERVATION_SOURCE!r}")
+
+    cassandra_repository = CassandraRepository(
+        settings.CASSANDRA_HOST.split(","),
+        port=settings.CASSANDRA_PORT,
+        username=settings.CASSANDRA_USERNAME,
+        password=settings.CASSANDRA_PASSWORD,
+        keyspace=settings.CASSANDRA_KEYSPACE,
+        local_dc=settings.CASSANDRA_LOCAL_DC,
+    ).connect()
+    return CassandraSource(cassandra_repository, fallback=meteostat, limit=settings.OBSERVATION_RETENTION_HOURS)
+
+async def get_observation_source() -> t.Optional[ObservationSource]:
+    return observation_source
+
+def close_observation_source():
+    global observation_source, cassandra_repository
+    if cassandra_repository is not None:
+        cassandra_repository.shutdown()
+        cassandra_repository = None
+    observation_source = None
@@ -0,0 +1,39 @@
+# dependencies/precompute.py
+
+import typing as t
+from functools import partial
+from redis.asyncio import Redis
+from backend.config import settings
+from backend.services import AsyncWeatherPredictorV2, BlockingExecutor, ModelRegistry
+from backend.services.observations import ObservationSource
+from backend.services.precompute import ForecastPrecomputer
+from backend.services.station import StationLookup
+from backend.utils.cache import store_forecast
+
+forecast_precomputer: t.Optional[ForecastPrecomputer] = None
+
+def create_precomputer(
+    redis: Redis,
+    registry: ModelRegistry,
+    executor: BlockingExecutor,
+    source: t.Optional[ObservationSource] = None,
+) -> ForecastPrecomputer:
+    return ForecastPrecomputer(
+        redis,
+        AsyncWeatherPredictorV2(redis, registry, executor, source),
+        StationLookup.get_station_ids(),
+        partial(store_forecast, model_version=registry.version),
+        predict_hours=settings.FORECAST_HOURS,
+        interval=settings.FORECAST_REFRESH_INTERVAL,
+        offset=settings.FORECAST_REFRESH_OFFSET,
+        jitter=settings.FORECAST_REFRESH_JITTER,
+    )
+
+async def get_precomputer() -> t.Optional[ForecastPrecomputer]:
+    return forecast_precomputer
+
+async def stop_precomputer():
+    global forecast_precomputer
+    if forecast_precomputer is not None:
+        await forecast_precomputer.stop()
+        forecast_precomputer = None
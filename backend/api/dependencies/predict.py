@@ -1,12 +1,26 @@
 # dependencies/predictor.py
 
-from backend.services import AsyncWeatherPredictorV1, AsyncWeatherPredictorV2
+from backend.services import AsyncWeatherPredictorV1, AsyncWeatherPredictorV2, BlockingExecutor, ModelRegistry
+from backend.services.observations import ObservationSource
+from backend.api.dependencies.executor import get_executor
+from backend.api.dependencies.observations import get_observation_source
 from backend.api.dependencies.redis import get_redis
+from backend.api.dependencies.registry import get_model_registry
 from redis.asyncio import Redis
 from fastapi import Depends
 
-async def get_predictor_v1(redis: Redis = Depends(get_redis)) -> AsyncWeatherPredictorV1:
-    return AsyncWeatherPredictorV1(redis)
+async def get_predictor_v1(
+    redis: Redis = Depends(get_redis),
+    registry: ModelRegistry = Depends(get_model_registry),
+    executor: BlockingExecutor = Depends(get_executor),
+    source: ObservationSource | None = Depends(get_observation_source),
+) -> AsyncWeatherPredictorV1:
+    return AsyncWeatherPredictorV1(redis, registry, executor, source)
 
-async def get_predictor_v2(redis: Redis = Depends(get_redis)) -> AsyncWeatherPredictorV2:
-    return AsyncWeatherPredictorV2(redis)
\ No newline at end of file
+async def get_predictor_v2(
+    redis: Redis = Depends(get_redis),
+    registry: ModelRegistry = Depends(get_model_registry),
+    executor: BlockingExecutor = Depends(get_executor),
+    source: ObservationSource | None = Depends(get_observation_source),
+) -> AsyncWeatherPredictorV2:
+    return AsyncWeatherPredictorV2(redis, registry, executor, source)
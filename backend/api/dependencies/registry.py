@@ -0,0 +1,22 @@
+# dependencies/registry.py
+
+import typing as t
+from backend.config import settings
+from backend.services.executor import BlockingExecutor
+from backend.services.registry import ModelRegistry
+
+model_registry: t.Optional[ModelRegistry] = None
+
+def load_model_registry(executor: t.Optional[BlockingExecutor] = None) -> ModelRegistry:
+    return ModelRegistry(
+        settings.MODELS_DIR,
+        max_batch_size=settings.INFERENCE_BATCH_SIZE,
+        max_batch_delay=settings.INFERENCE_BATCH_DELAY,
+        executor=executor,
+    ).load()
+
+async def get_model_registry() -> ModelRegistry:
+    global model_registry
+    if model_registry is None:
+        raise RuntimeError("Model registry not loaded")
+    return model_registry
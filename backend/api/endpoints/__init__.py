@@ -1 +1,2 @@
-from .forecast import router as forecast_router
\ No newline at end of file
+from .forecast import router as forecast_router
+from .metrics import router as metrics_router
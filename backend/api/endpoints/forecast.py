@@ -1,18 +1,32 @@
-
-from fastapi_cache.decorator import cache
-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from backend.schemas.forecast import ForecastInputSchema, ForcastOutputBase, ForecastOutputSchema
 from backend.services.predict import AsyncWeatherPredictor
+from backend.services.station import StationLookup
 from backend.api.dependencies.predict import get_predictor_v1, get_predictor_v2
+from backend.config import settings
+from backend.utils.cache import forecast_batch_cache, forecast_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=list[ForcastOutputBase])
-@cache(expire=1800)
+@forecast_cache(expire=settings.FORECAST_CACHE_EXPIRE, max_stale=settings.FORECAST_CACHE_MAX_STALE)
 async def forecast_weather(
     params: ForecastInputSchema=Depends(),
     predictor: AsyncWeatherPredictor = Depends(get_predictor_v2),
 ) -> list[ForcastOutputBase]:
-    predictions = await predictor.predict(station_id=params.station_id, predict_hours=72)
+    predictions = await predictor.predict(station_id=params.station_id, predict_hours=settings.FORECAST_HOURS)
+    return predictions
+
+
+@router.get("/batch", response_model=dict[str, list[ForcastOutputBase]])
+@forecast_batch_cache(expire=settings.FORECAST_CACHE_EXPIRE)
+async def forecast_weather_batch(
+    station_id: list[str] | None = Query(None, description="Repeat for each station; omit for all stations"),
+    predictor: AsyncWeatherPredictor = Depends(get_predictor_v2),
+) -> dict[str, list[ForcastOutputBase]]:
+    station_ids = station_id or StationLookup.get_station_ids()
+    unknown = sorted(set(station_ids) - set(StationLookup.get_station_ids()))
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown station ids: {', '.join(unknown)}")
+    predictions = await predictor.predict_batch(station_ids=station_ids, predict_hours=settings.FORECAST_HOURS)
     return predictions
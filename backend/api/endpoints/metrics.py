@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from fastapi_cache import FastAPICache
+from backend.services.executor import BlockingExecutor
+from backend.services.registry import ModelRegistry
+from backend.services.precompute import ForecastPrecomputer
+from backend.api.dependencies.executor import get_executor
+from backend.api.dependencies.precompute import get_precomputer
+from backend.utils.cache import TieredBackend, cache_stats
+from backend.api.dependencies.registry import get_model_registry
+
+router = APIRouter()
+
+@router.get("/")
+async def service_metrics(
+    registry: ModelRegistry = Depends(get_model_registry),
+    executor: BlockingExecutor = Depends(get_executor),
+    precomputer: ForecastPrecomputer | None = Depends(get_precomputer),
+) -> dict:
+    cache_backend = FastAPICache.get_backend()
+    return {
+        "inference": registry.scheduler_stats(),
+        "executor": executor.stats(),
+        "cache": cache_stats(),
+        "cache_l1": cache_backend.stats() if isinstance(cache_backend, TieredBackend) else None,
+        "precompute": precomputer.stats() if precomputer is not None else None,
+    }
@@ -0,0 +1,46 @@
+"""
+Compare the binary observation rows with the old DataFrame JSON path.
+
+    python -m backend.benchmarks.station_codec
+"""
+
+import timeit
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from backend.utils.codec import decode_rows, encode_rows
+
+FEATURES = [
+    'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
+    'wind_speed', 'wind_direction', 'wdir_sin', 'wdir_cos',
+    'pressure', 'hour_sin', 'hour_cos', 'dayofyear_sin', 'dayofyear_cos'
+]
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, len(FEATURES))).round(1), columns=FEATURES)
+    df.insert(0, 'timestamp', pd.date_range('2025-01-01', periods=rows, freq='h'))
+    return df
+
+
+def bench(label: str, encode, decode, size, number: int = 200) -> None:
+    payload = encode()
+    encode_ms = timeit.timeit(encode, number=number) / number * 1000
+    decode_ms = timeit.timeit(lambda: decode(payload), number=number) / number * 1000
+    print(f"{label:<12} {size(payload):>8} B  encode {encode_ms:7.3f} ms  decode {decode_ms:7.3f} ms")
+
+
+def main() -> None:
+    for rows in (24, 96):
+        df = make_frame(rows)
+        print(f"--- {rows} rows x {len(FEATURES)} features")
+        bench("json", lambda: df.to_json().encode(), lambda raw: pd.read_json(StringIO(raw.decode())), len)
+        bench("binary rows", lambda: encode_rows(df, FEATURES), lambda records: decode_rows(records, FEATURES),
+              lambda records: sum(map(len, records)))
+
+
+if __name__ == "__main__":
+    main()
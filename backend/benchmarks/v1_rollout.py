@@ -0,0 +1,85 @@
+"""
+Per-request latency of the v1 72h forecast: the full-window loop (two 24h
+passes per forecast hour) against the step-wise rollout (one recurrent step
+per forecast hour).
+
+    python -m backend.benchmarks.v1_rollout [--models-dir backend/models] [--requests 3]
+
+Run from the repository root. Without a trained step-wise model in the
+models directory, an untrained one of the same shape is written to a
+scratch copy of it; latency does not depend on the weights.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.services import AsyncWeatherPredictorV1, BlockingExecutor, ModelRegistry
+from backend.services.observations import FEATURES
+
+
+def models_with_stepwise(models_dir: Path, scratch: Path) -> Path:
+    """`models_dir`, or a scratch copy of it with an untrained step-wise model added."""
+    if (models_dir / "stepwise").exists():
+        return models_dir
+
+    import joblib
+    import pandas as pd
+    from sklearn.preprocessing import MinMaxScaler
+
+    from model.train import TARGETS, build_stepwise
+
+    for entry in models_dir.iterdir():
+        (scratch / entry.name).symlink_to(entry.resolve())
+    label_encoder = joblib.load(models_dir / "condition" / "label_encoder_condition.pkl")
+    _, step_model = build_stepwise(len(FEATURES), len(label_encoder.classes_))
+
+    sample = pd.DataFrame(np.random.default_rng(0).normal(size=(100, len(FEATURES))), columns=FEATURES)
+    files = TARGETS["stepwise"].files
+    (scratch / "stepwise").mkdir()
+    step_model.save(scratch / "stepwise" / files["model"])
+    joblib.dump(MinMaxScaler().fit(sample), scratch / "stepwise" / files["scaler_x"])
+    joblib.dump(MinMaxScaler().fit(sample[["air_temperature"]]), scratch / "stepwise" / files["scaler_y"])
+    joblib.dump(label_encoder, scratch / "stepwise" / files["label_encoder"])
+    print("⚠️ No trained step-wise model; timing an untrained one")
+    return scratch
+
+
+async def bench(label: str, predictor: AsyncWeatherPredictorV1, rows: np.ndarray, requests: int, hours: int) -> float:
+    await predictor.rollout(rows, predict_hours=2)  # build the predict functions first
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await predictor.rollout(rows, predict_hours=hours)
+        latencies.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(latencies)
+    print(f"{label:<10} median {median:9.1f} ms  min {min(latencies):9.1f} ms  over {requests} requests")
+    return median
+
+
+async def main(models_dir: Path, requests: int, hours: int) -> None:
+    rows = np.random.default_rng(0).normal(size=(24, len(FEATURES))).astype(np.float32)
+    with tempfile.TemporaryDirectory() as scratch:
+        executor = BlockingExecutor()
+        registry = ModelRegistry(models_with_stepwise(models_dir, Path(scratch)), executor=executor).load()
+        print(f"--- {hours}h forecast, one station")
+        full = await bench("full", AsyncWeatherPredictorV1(None, registry, executor, stepwise=False), rows, requests, hours)
+        stepwise = await bench("stepwise", AsyncWeatherPredictorV1(None, registry, executor, stepwise=True), rows, requests, hours)
+        print(f"step-wise is {full / stepwise:.1f}x faster per request")
+        await registry.close()
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--models-dir", type=Path, default=Path("backend/models"))
+    parser.add_argument("--requests", type=int, default=3)
+    parser.add_argument("--hours", type=int, default=72)
+    args = parser.parse_args()
+    asyncio.run(main(args.models_dir, args.requests, args.hours))
@@ -31,6 +31,44 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_USERNAME: str | None = None
     REDIS_PASSWORD: str | None = None
+    # Model artifacts (relative to the working directory)
+    MODELS_DIR: Path = Path("models")
+    # Micro-batching of concurrent model calls
+    INFERENCE_BATCH_SIZE: int = 64
+    INFERENCE_BATCH_DELAY: timedelta = timedelta(milliseconds=5)
+    # Off-loop execution of blocking work ("thread" or "process" for inference)
+    EXECUTOR_KIND: str = "thread"
+    EXECUTOR_MAX_WORKERS: int = 4
+    EXECUTOR_MAX_CONCURRENCY: int = 8
+    # Single-flight dedup of station fetches and forecast recomputation
+    SINGLE_FLIGHT_LOCK_TIMEOUT: timedelta = timedelta(seconds=120)
+    SINGLE_FLIGHT_WAIT_TIMEOUT: timedelta = timedelta(seconds=60)
+    # Per-station hourly observation series kept in Redis
+    OBSERVATION_RETENTION_HOURS: int = 120
+    OBSERVATION_REFRESH_INTERVAL: timedelta = timedelta(minutes=10)
+    # Where observation history comes from: "meteostat" or "cassandra"
+    # (Cassandra falls back to Meteostat for hours it doesn't have)
+    OBSERVATION_SOURCE: str = "meteostat"
+    CASSANDRA_HOST: str = "cassandra"
+    CASSANDRA_PORT: int = 9042
+    CASSANDRA_USERNAME: str = "cassandra"
+    CASSANDRA_PASSWORD: str = "cassandra"
+    CASSANDRA_KEYSPACE: str = "weather_forecast"
+    CASSANDRA_LOCAL_DC: str | None = None
+    # Forecast horizon and response cache lifetime (seconds)
+    FORECAST_HOURS: int = 72
+    FORECAST_CACHE_EXPIRE: int = 5400
+    # How long past expiry a forecast may still be served while it refreshes
+    FORECAST_CACHE_MAX_STALE: timedelta = timedelta(hours=2)
+    # Per-worker in-memory cache of response bytes in front of Redis
+    RESPONSE_CACHE_L1_MAX_BYTES: int = 32 * 1024 * 1024
+    RESPONSE_CACHE_L1_TTL: timedelta = timedelta(minutes=5)
+    # Background precompute of every station's forecast, run `OFFSET` past
+    # each `INTERVAL` boundary plus up to `JITTER` so workers don't align
+    FORECAST_PRECOMPUTE_ENABLED: bool = True
+    FORECAST_REFRESH_INTERVAL: timedelta = timedelta(hours=1)
+    FORECAST_REFRESH_OFFSET: timedelta = timedelta(minutes=10)
+    FORECAST_REFRESH_JITTER: timedelta = timedelta(seconds=60)
 
     @computed_field  # type: ignore[prop-decorator]
     @property
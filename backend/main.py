@@ -6,10 +6,11 @@ from starlette.middleware.sessions import SessionMiddleware
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from backend.api.dependencies import redis
+from backend.api.dependencies import executor, observations, precompute, redis, registry
 
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
+from backend.utils.cache import ResponseCoder, TieredBackend, count_cache_status
 
 
 @asynccontextmanager
@@ -20,10 +21,38 @@ async def lifespan(app: FastAPI):
     """
     print("🔌 Connecting to Redis...")
     redis.redis_db = await redis.create_redis_connection()
-    FastAPICache.init(RedisBackend(redis.redis_db), prefix="forecast_cache")
+    cache_backend = TieredBackend(
+        RedisBackend(redis.redis_db),
+        redis.redis_db,
+        max_bytes=settings.RESPONSE_CACHE_L1_MAX_BYTES,
+        ttl=settings.RESPONSE_CACHE_L1_TTL,
+    )
+    cache_backend.start()
+    FastAPICache.init(cache_backend, prefix="forecast_cache", coder=ResponseCoder)
+    executor.blocking_executor = executor.create_executor()
+    print(f"🛰️ Observation source: {settings.OBSERVATION_SOURCE}")
+    observations.observation_source = observations.create_observation_source(executor.blocking_executor)
+    print("🧠 Loading model registry...")
+    registry.model_registry = registry.load_model_registry(executor.blocking_executor)
+    for artifact in registry.model_registry.describe():
+        print(f"   {artifact['name']:<28} {artifact['memory_bytes'] / 1024:>9.1f} KiB  ({artifact['load_seconds']}s)")
+    print(f"✅ {len(registry.model_registry.loaded)} artifacts loaded (bundle {registry.model_registry.version}), "
+          f"{registry.model_registry.memory_bytes / 1024 ** 2:.1f} MiB in memory")
+    if settings.FORECAST_PRECOMPUTE_ENABLED:
+        print("🔁 Starting forecast precompute...")
+        precompute.forecast_precomputer = precompute.create_precomputer(
+            redis.redis_db, registry.model_registry, executor.blocking_executor, observations.observation_source,
+        )
+        precompute.forecast_precomputer.start()
     yield
+    await precompute.stop_precomputer()
+    await cache_backend.close()
     print("🛑 Closing Redis connection...")
     await redis.close_redis()
+    await registry.model_registry.close()
+    registry.model_registry = None
+    observations.close_observation_source()
+    executor.close_executor()
 
 app = FastAPI(
     lifespan=lifespan,
@@ -53,6 +82,9 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Response-cache hit/miss counters for /metrics
+app.middleware("http")(count_cache_status)
+
 app.include_router(api_router)
 
 
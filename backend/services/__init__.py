@@ -1,2 +1,4 @@
+from .executor import BlockingExecutor
+from .registry import ModelRegistry
 from .predict import AsyncWeatherPredictor as AsyncWeatherPredictorV1
 from .predict_v2 import AsyncWeatherPredictor as AsyncWeatherPredictorV2
\ No newline at end of file
@@ -0,0 +1,101 @@
+# services/executor.py
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+# Per-process registry used when inference runs in a process pool
+_worker_registry = None
+
+
+def _init_inference_worker(models_dir: Path) -> None:
+    global _worker_registry
+    from backend.services.registry import ModelRegistry
+    _worker_registry = ModelRegistry(models_dir).load()
+
+
+def _predict_in_worker(name: str, X: np.ndarray) -> np.ndarray:
+    return _worker_registry.get(name).predict(X, verbose=0)
+
+
+def _predict_on_batch_in_worker(name: str, inputs: Any) -> Any:
+    return _worker_registry.get(name).predict_on_batch(inputs)
+
+
+class BlockingExecutor:
+    """
+    Runs blocking work off the event loop so one forecast can't stall other
+    requests. I/O (Meteostat downloads) always goes to a thread pool;
+    inference goes to a thread pool or, with kind="process", to worker
+    processes that each load their own copy of the models. Each pool has
+    its own bound on how many jobs may be in flight at once.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_concurrency: int = 8,
+        models_dir: Optional[Path] = None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind {kind!r}")
+        self.kind = kind
+        self.max_concurrency = max_concurrency
+        self._io_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="forecast-io")
+        if kind == "process":
+            self._inference_pool: Executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_inference_worker,
+                initargs=(models_dir,),
+            )
+        else:
+            self._inference_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="forecast-inference")
+        self._io_slots = asyncio.Semaphore(max_concurrency)
+        self._inference_slots = asyncio.Semaphore(max_concurrency)
+        self.in_flight = {"io": 0, "inference": 0}
+
+    async def _run(self, pool: Executor, slots: asyncio.Semaphore, label: str, fn: Callable, *args: Any) -> Any:
+        async with slots:
+            self.in_flight[label] += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, partial(fn, *args))
+            finally:
+                self.in_flight[label] -= 1
+
+    async def run_io(self, fn: Callable, *args: Any) -> Any:
+        """Run a blocking I/O call in the thread pool."""
+        return await self._run(self._io_pool, self._io_slots, "io", fn, *args)
+
+    async def predict(self, name: str, model: Any, X: np.ndarray) -> np.ndarray:
+        """Run `model.predict(X)` in the inference pool."""
+        if self.kind == "process":
+            return await self._run(self._inference_pool, self._inference_slots, "inference", _predict_in_worker, name, X)
+        return await self._run(self._inference_pool, self._inference_slots, "inference", partial(model.predict, verbose=0), X)
+
+    async def predict_on_batch(self, name: str, model: Any, inputs: Any) -> Any:
+        """
+        Run `model.predict_on_batch(inputs)` in the inference pool. It skips
+        the input pipeline `predict` builds per call, which dominates small,
+        frequent calls such as single recurrent steps.
+        """
+        if self.kind == "process":
+            return await self._run(self._inference_pool, self._inference_slots, "inference", _predict_on_batch_in_worker, name, inputs)
+        return await self._run(self._inference_pool, self._inference_slots, "inference", model.predict_on_batch, inputs)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": dict(self.in_flight),
+        }
+
+    def shutdown(self) -> None:
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        self._inference_pool.shutdown(wait=False, cancel_futures=True)
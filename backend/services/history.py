@@ -0,0 +1,66 @@
+# services/history.py
+
+import numpy as np
+
+
+class HistoryWindow:
+    """
+    Rolling window of the last `steps` feature rows for one or more stations,
+    used by the autoregressive rollouts.
+
+    Rows live in a preallocated float32 buffer twice the window length: every
+    row is written at `i` and `i + steps`, so the current window is always one
+    contiguous slice and appending never allocates or shifts data.
+    """
+
+    def __init__(self, steps: int, n_features: int, batch: int = 1):
+        self.steps = steps
+        self.n_features = n_features
+        self.batch = batch
+        self._buffer = np.zeros((batch, 2 * steps, n_features), dtype=np.float32)
+        self._head = 0
+
+    @classmethod
+    def from_array(cls, history: np.ndarray) -> "HistoryWindow":
+        """Build a window from a (steps, features) or (batch, steps, features) array."""
+        history = np.asarray(history, dtype=np.float32)
+        if history.ndim == 2:
+            history = history[np.newaxis]
+        batch, steps, n_features = history.shape
+        window = cls(steps, n_features, batch)
+        window._buffer[:, :steps] = history
+        window._buffer[:, steps:] = history
+        return window
+
+    def view(self) -> np.ndarray:
+        """The current (batch, steps, features) window, oldest row first. Not a copy."""
+        return self._buffer[:, self._head:self._head + self.steps]
+
+    def last(self) -> np.ndarray:
+        """The newest (batch, features) row. Not a copy."""
+        return self._buffer[:, self._head + self.steps - 1]
+
+    def append(self, rows: np.ndarray) -> None:
+        """Push one (batch, features) row per station, dropping the oldest."""
+        self._buffer[:, self._head] = rows
+        self._buffer[:, self._head + self.steps] = rows
+        self._head = (self._head + 1) % self.steps
+
+    def extend(self, rows: np.ndarray) -> None:
+        """Push (batch, k, features) rows per station, dropping the k oldest."""
+        rows = rows[:, -self.steps:]
+        positions = (self._head + np.arange(rows.shape[1])) % self.steps
+        self._buffer[:, positions] = rows
+        self._buffer[:, positions + self.steps] = rows
+        self._head = (self._head + rows.shape[1]) % self.steps
+
+    def scaled(self, scaler) -> np.ndarray:
+        """
+        Apply a fitted MinMaxScaler to the window. Same result as
+        `scaler.transform` but works on the 3D view directly and skips
+        sklearn's per-call input validation.
+        """
+        X = self.view() * scaler.scale_.astype(np.float32) + scaler.min_.astype(np.float32)
+        if getattr(scaler, "clip", False):
+            np.clip(X, *scaler.feature_range, out=X)
+        return X
@@ -0,0 +1,199 @@
+# services/observations.py
+
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional, Protocol
+
+import numpy as np
+import pandas as pd
+from meteostat import Point, Hourly
+from redis.asyncio import Redis
+
+from backend.config import settings
+from db.cassandra.repository import CassandraRepository
+from backend.services.executor import BlockingExecutor
+from backend.services.station import Station
+from backend.utils.codec import ROW_VERSION, decode_rows, encode_rows
+from backend.utils.singleflight import SingleFlight
+
+FEATURES = [
+    'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
+    'wind_speed', 'wind_direction', 'wdir_sin', 'wdir_cos',
+    'pressure', 'hour_sin', 'hour_cos', 'dayofyear_sin', 'dayofyear_cos'
+]
+
+station_flight = SingleFlight(
+    "observations",
+    lock_timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT,
+    wait_timeout=settings.SINGLE_FLIGHT_WAIT_TIMEOUT,
+)
+
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename raw Meteostat columns and add the derived cyclical features."""
+    df = df.rename(columns={
+        "time": "timestamp",
+        "temp": "air_temperature",
+        "dwpt": "dew_point",
+        "rhum": "relative_humidity",
+        "prcp": "precipitation",
+        "wspd": "wind_speed",
+        "wdir": "wind_direction",
+        "pres": "pressure"
+    })
+
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['hour'] = df['timestamp'].dt.hour
+    df['dayofyear'] = df['timestamp'].dt.dayofyear
+    df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
+    df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
+    df['dayofyear_sin'] = np.sin(2 * np.pi * df['dayofyear'] / 365)
+    df['dayofyear_cos'] = np.cos(2 * np.pi * df['dayofyear'] / 365)
+    df['wdir_sin'] = np.sin(np.deg2rad(df['wind_direction']))
+    df['wdir_cos'] = np.cos(np.deg2rad(df['wind_direction']))
+    return df
+
+
+class ObservationSource(Protocol):
+    async def fetch(self, station: Station, start: datetime, end: datetime) -> pd.DataFrame:
+        """Hourly observations in [start, end] as `timestamp` + FEATURES, oldest first."""
+        ...
+
+
+class MeteostatSource:
+    """Observations straight from the Meteostat API."""
+
+    def __init__(self, executor: BlockingExecutor):
+        self.executor = executor
+
+    async def fetch(self, station: Station, start: datetime, end: datetime) -> pd.DataFrame:
+        hourly = await self.executor.run_io(Hourly, Point(station.latitude, station.longitude), start, end)
+        df = build_features(hourly.fetch().reset_index())
+        return df[['timestamp'] + FEATURES]
+
+
+class CassandraSource:
+    """
+    Observations from `weather_forecast.weather_data`, read with one prepared
+    async query per station through the shared repository. Hours missing
+    from Cassandra are filled from `fallback` (normally Meteostat) when one
+    is given.
+    """
+
+    _columns = [
+        'timestamp', 'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
+        'wind_speed', 'wind_direction', 'pressure',
+    ]
+
+    _select = (
+        f"SELECT {', '.join(_columns)} FROM weather_data "
+        "WHERE station_id = ? AND timestamp >= ? AND timestamp <= ? LIMIT ?"
+    )
+
+    def __init__(self, repository: CassandraRepository, fallback: Optional[ObservationSource] = None, limit: int = 96):
+        self.repository = repository
+        self.fallback = fallback
+        self.limit = limit
+
+    async def fetch(self, station: Station, start: datetime, end: datetime) -> pd.DataFrame:
+        rows = await self.repository.fetch_all(self._select, (station.id, start, end, self.limit))
+        # Clustering order is newest first
+        df = pd.DataFrame(rows[::-1], columns=self._columns)
+        df[self._columns[1:]] = df[self._columns[1:]].astype('float64')
+        df['wind_direction'] = df['wind_direction'].fillna(0)
+        df = build_features(df)[['timestamp'] + FEATURES]
+
+        expected = pd.date_range(pd.Timestamp(start).ceil('h'), pd.Timestamp(end).floor('h'), freq='h')[-self.limit:]
+        missing = expected.difference(df['timestamp'])
+        if self.fallback is not None and len(missing):
+            upstream = await self.fallback.fetch(station, missing.min().to_pydatetime(), missing.max().to_pydatetime())
+            upstream = upstream[upstream['timestamp'].isin(missing)]
+            df = pd.concat([df, upstream], ignore_index=True).sort_values('timestamp', ignore_index=True)
+        return df
+
+
+def _hour_score(timestamps: pd.Series) -> np.ndarray:
+    return timestamps.to_numpy(dtype='datetime64[h]').astype(np.int64)
+
+
+class ObservationStore:
+    """
+    Per-station, append-only hourly observation series in Redis.
+
+    Each station is a sorted set `observations:v<ROW_VERSION>:<station_id>`
+    scored by epoch hour, one encoded row per member. A refresh only asks
+    the source (Meteostat unless another is given) for the hours after the
+    newest stored one, and entries older than `retention_hours` are trimmed
+    on every append.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        executor: BlockingExecutor,
+        retention_hours: int = settings.OBSERVATION_RETENTION_HOURS,
+        refresh_interval: timedelta = settings.OBSERVATION_REFRESH_INTERVAL,
+        source: Optional[ObservationSource] = None,
+    ):
+        self.redis = redis
+        self.executor = executor
+        self.source = source or MeteostatSource(executor)
+        self.retention_hours = retention_hours
+        self.refresh_interval = refresh_interval
+
+    def _key(self, station_id: str) -> str:
+        return f"observations:v{ROW_VERSION}:{station_id}"
+
+    def _checked_key(self, station_id: str) -> str:
+        return f"observations:v{ROW_VERSION}:{station_id}:checked"
+
+    async def latest_hour(self, station_id: str) -> Optional[pd.Timestamp]:
+        newest = await self.redis.zrange(self._key(station_id), -1, -1, withscores=True)
+        if not newest:
+            return None
+        return pd.Timestamp(int(newest[0][1]) * 3600, unit='s')
+
+    async def append(self, station_id: str, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        key = self._key(station_id)
+        scores = _hour_score(df['timestamp'])
+        # Replace any hours we already hold (upstream may revise recent values).
+        # One MULTI/EXEC, so a concurrent `window` never sees them half replaced
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(key, int(scores.min()), int(scores.max()))
+            pipe.zadd(key, dict(zip(encode_rows(df, FEATURES), scores.tolist())))
+            pipe.zremrangebyscore(key, "-inf", f"({int(scores.max()) - self.retention_hours + 1}")
+            await pipe.execute()
+
+    async def window(self, station_id: str, hours: int) -> pd.DataFrame:
+        records = await self.redis.zrange(self._key(station_id), -hours, -1)
+        return decode_rows(records, FEATURES)
+
+    async def recent(self, station: Station, hours: int) -> pd.DataFrame:
+        """Return the last `hours` observations, topping the series up first if due."""
+        if not await self.redis.get(self._checked_key(station.id)):
+            # Only one fetch per station runs at a time, across all workers
+            await station_flight.do(station.id, self.redis, partial(self._refresh, station))
+
+        df = await self.window(station.id, hours)
+        if len(df) < hours:
+            raise ValueError(f"❌ Not enough data fetched ({len(df)}) for {station.name}")
+        return df
+
+    async def _refresh(self, station: Station) -> None:
+        # Another worker may have refreshed while we waited for the lock
+        if await self.redis.get(self._checked_key(station.id)):
+            return
+
+        end_date = datetime.now()
+        latest = await self.latest_hour(station.id)
+        if latest is None or latest < end_date - timedelta(hours=self.retention_hours):
+            start_date = end_date - timedelta(hours=self.retention_hours)
+        else:
+            start_date = latest + timedelta(hours=1)
+
+        if start_date <= end_date:
+            await self.append(station.id, await self.source.fetch(station, start_date, end_date))
+
+        await self.redis.set(self._checked_key(station.id), 1, ex=int(self.refresh_interval.total_seconds()))
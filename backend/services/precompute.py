@@ -0,0 +1,143 @@
+# services/precompute.py
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from redis.asyncio import Redis
+
+from backend.schemas import ForcastOutputBase
+
+StoreForecast = Callable[[str, int, list[ForcastOutputBase]], Awaitable[None]]
+
+
+class ForecastPrecomputer:
+    """
+    Refreshes every station's forecast in the background so requests are
+    served from the cache instead of running inference.
+
+    A refresh runs once at start-up and then `offset` past every `interval`
+    boundary (shortly after Meteostat publishes the new hour), delayed by a
+    random amount up to `jitter`. Only one worker refreshes per cycle; the
+    others skip it while the Redis lock is held.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        predictor,
+        station_ids: list[str],
+        store: StoreForecast,
+        predict_hours: int = 72,
+        interval: timedelta = timedelta(hours=1),
+        offset: timedelta = timedelta(minutes=10),
+        jitter: timedelta = timedelta(seconds=60),
+    ):
+        self.redis = redis
+        self.predictor = predictor
+        self.station_ids = station_ids
+        self.store = store
+        self.predict_hours = predict_hours
+        self.interval = interval
+        self.offset = offset
+        self.jitter = jitter
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.batch_failures = 0
+        self.last_duration: Optional[float] = None
+        self.last_success: Optional[datetime] = None
+        self.observation_hours: dict[str, datetime] = {}
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def seconds_until_boundary(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next `offset` past an `interval` boundary, without jitter."""
+        now = (now or datetime.now()).timestamp()
+        interval = self.interval.total_seconds()
+        boundary = now // interval * interval + self.offset.total_seconds()
+        if boundary <= now:
+            boundary += interval
+        return boundary - now
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                self.failures += 1
+                print(f"⚠️ Forecast precompute failed: {exc}")
+            await asyncio.sleep(self.seconds_until_boundary() + random.uniform(0, self.jitter.total_seconds()))
+
+    async def refresh(self) -> bool:
+        """Recompute and cache all forecasts. Returns False if another worker holds the cycle."""
+        # One lock per cycle, left to expire so the other workers skip the whole cycle
+        cycle = int((time.time() - self.offset.total_seconds()) // self.interval.total_seconds())
+        lock = self.redis.lock(f"forecast_precompute:lock:{cycle}", timeout=self.interval.total_seconds())
+        if not await lock.acquire(blocking=False):
+            self.skipped += 1
+            return False
+
+        started = time.perf_counter()
+        self.runs += 1
+        forecasts = await self._predict_all()
+        for station_id, predictions in forecasts.items():
+            await self.store(station_id, self.predict_hours, predictions)
+            # The first forecast hour follows the newest observation
+            self.observation_hours[station_id] = datetime.fromisoformat(predictions[0].timestamp) - timedelta(hours=1)
+        self.last_duration = time.perf_counter() - started
+
+        self.last_success = datetime.now()
+        print(f"🔁 Precomputed {len(forecasts)} forecasts in {self.last_duration:.1f}s")
+        return True
+
+    async def _predict_all(self) -> dict[str, list[ForcastOutputBase]]:
+        try:
+            forecasts = await self.predictor.predict_batch(self.station_ids, predict_hours=self.predict_hours)
+        except Exception as exc:
+            self.batch_failures += 1
+            print(f"⚠️ Forecast precompute batch failed, retrying station by station: {exc}")
+        else:
+            # Stations without enough history are left out of the batch
+            self.failures += len(set(self.station_ids) - set(forecasts))
+            return forecasts
+
+        # Any other station failure fails the whole batch; retry each on its own
+        forecasts = {}
+        for station_id in self.station_ids:
+            try:
+                forecasts.update(await self.predictor.predict_batch([station_id], predict_hours=self.predict_hours))
+            except Exception as exc:
+                self.failures += 1
+                print(f"⚠️ Forecast precompute skipped {station_id}: {exc}")
+        return forecasts
+
+    def stats(self) -> dict:
+        now = datetime.now()
+        observation_ages = [(now - hour).total_seconds() for hour in self.observation_hours.values()]
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "batch_failures": self.batch_failures,
+            "last_duration_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "seconds_since_success": round((now - self.last_success).total_seconds(), 1) if self.last_success else None,
+            "max_observation_age_seconds": round(max(observation_ages), 1) if observation_ages else None,
+            "next_refresh_in_seconds": round(self.seconds_until_boundary(now), 1) if self._task is not None else None,
+        }
@@ -1,6 +1,5 @@
 # services/predictor.py
 
-import pandas as pd
 import numpy as np
 import os
 
@@ -13,81 +12,70 @@ os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
 
 from datetime import datetime, timedelta
-from meteostat import Point, Hourly
-import joblib
-import tensorflow as tf
+from typing import Optional
 from redis.asyncio import Redis
-from backend.services.station import StationLookup
+from backend.services.executor import BlockingExecutor
+from backend.services.history import HistoryWindow
+from backend.services.observations import FEATURES, ObservationSource, ObservationStore
+from backend.services.registry import ModelRegistry
+from backend.services.station import Station, StationLookup
 
 class AsyncWeatherPredictor:
-    def __init__(self, redis: Redis):
+    def __init__(
+        self,
+        redis: Redis,
+        registry: ModelRegistry,
+        executor: BlockingExecutor,
+        source: Optional[ObservationSource] = None,
+        stepwise: Optional[bool] = None,
+    ):
         self.redis = redis
-        self.features = [
-            'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
-            'wind_speed', 'wind_direction', 'wdir_sin', 'wdir_cos',
-            'pressure', 'hour_sin', 'hour_cos', 'dayofyear_sin', 'dayofyear_cos'
-        ]
-        self.scaler_X = joblib.load('models/scaler_X_latest.pkl')
-        self.label_encoder = joblib.load('models/label_encoder_condition.pkl')
-        self.model_temp = tf.keras.models.load_model('models/lstm_temperature_latest.keras')
-        self.model_cond = tf.keras.models.load_model('models/lstm_condition_classifier_latest.keras')
-
-    async def fetch_recent_data(self, station_name: str, latitude: float, longitude: float, hours_back=24):
-        cache_key = f"station_cache:{station_name.lower().replace(' ', '_')}"
-        cached_data = await self.redis.get(cache_key)
-
-        if cached_data:
-            df = pd.read_json(cached_data.decode('utf-8'))
-        else:
-            pt = Point(latitude, longitude)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(hours=hours_back)
-
-            df = Hourly(pt, start_date, end_date).fetch().reset_index()
-
-            if df.empty or len(df) < 24:
-                raise ValueError(f"❌ Not enough data fetched ({len(df)}) for {station_name}")
-
-            df = df.rename(columns={
-                "time": "timestamp",
-                "temp": "air_temperature",
-                "dwpt": "dew_point",
-                "rhum": "relative_humidity",
-                "prcp": "precipitation",
-                "wdir": "wind_direction",
-                "wspd": "wind_speed",
-                "pres": "pressure"
-            })
-
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df['hour'] = df['timestamp'].dt.hour
-            df['dayofyear'] = df['timestamp'].dt.dayofyear
-            df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-            df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-            df['dayofyear_sin'] = np.sin(2 * np.pi * df['dayofyear'] / 365)
-            df['dayofyear_cos'] = np.cos(2 * np.pi * df['dayofyear'] / 365)
-            df['wdir_sin'] = np.sin(np.deg2rad(df['wind_direction']))
-            df['wdir_cos'] = np.cos(np.deg2rad(df['wind_direction']))
-
-            df = df[self.features]
-            await self.redis.set(cache_key, df.to_json(), ex=3600)
-
-        return df.tail(24)
+        self.executor = executor
+        self.observations = ObservationStore(redis, executor, source=source)
+        self.features = FEATURES
+        self.scaler_X = registry.get('v1.scaler_x')
+        self.label_encoder = registry.get('condition.label_encoder')
+        self.model_temp = registry.scheduler('v1.model_temp')
+        self.model_cond = registry.scheduler('condition.model')
+        # The scaler the condition model was trained with (the v1 one before that was saved)
+        self.scaler_X_cond = registry.get('condition.scaler_x') if registry.has('condition.scaler_x') else self.scaler_X
+
+        # Incremental rollout: one recurrent step per forecast hour instead of two
+        # full 24h passes. Used whenever the step-wise model has been trained
+        # (`python -m model.train --targets stepwise`) unless `stepwise=False`
+        self.stepwise = registry.has('stepwise.model') if stepwise is None else stepwise
+        if self.stepwise:
+            self.scaler_X_step = registry.get('stepwise.scaler_x')
+            self.scaler_y_step = registry.get('stepwise.scaler_y')
+            self.label_encoder_step = registry.get('stepwise.label_encoder')
+            self.model_step = registry.get('stepwise.model')
+
+    async def fetch_recent_data(self, station: Station, hours_back: int = 24):
+        return await self.observations.recent(station, hours_back)
 
     async def predict(self, station_id: str, predict_hours: int = 72):
         station = StationLookup.get_station(station_id)
-        recent_data = await self.fetch_recent_data(station.name, station.latitude, station.longitude)
+        recent_data = await self.fetch_recent_data(station)
+        return await self.rollout(recent_data[self.features].to_numpy(), predict_hours)
 
+    async def rollout(self, rows: np.ndarray, predict_hours: int = 72, base_timestamp: Optional[datetime] = None):
+        """Forecast `predict_hours` hours following the observed (24, features) `rows`."""
+        base_timestamp = base_timestamp or datetime.now()
+        if self.stepwise:
+            return await self._rollout_stepwise(rows, predict_hours, base_timestamp)
+        return await self._rollout_full(rows, predict_hours, base_timestamp)
+
+    async def _rollout_full(self, rows: np.ndarray, predict_hours: int, base_timestamp: datetime):
         predicted_results = []
-        history = recent_data.copy()
-        base_timestamp = datetime.now()
+        history = HistoryWindow.from_array(rows)
+        temp_idx = self.features.index('air_temperature')
 
         for step in range(predict_hours):
-            X_scaled = self.scaler_X.transform(history)
-            X_scaled = np.expand_dims(X_scaled, axis=0)
+            X_scaled = history.scaled(self.scaler_X)
+            X_cond = X_scaled if self.scaler_X_cond is self.scaler_X else history.scaled(self.scaler_X_cond)
 
-            temp_pred = self.model_temp.predict(X_scaled)[0][0]
-            cond_probs = self.model_cond.predict(X_scaled)[0]
+            temp_pred = (await self.model_temp.predict(X_scaled))[0][0]
+            cond_probs = (await self.model_cond.predict(X_cond))[0]
             cond_pred = self.label_encoder.inverse_transform([np.argmax(cond_probs)])[0]
 
 
@@ -100,9 +88,42 @@ class AsyncWeatherPredictor:
             predicted_results.append(prediction)
 
             # Update history
-            new_row = history.iloc[-1].copy()
-            new_row['air_temperature'] = temp_pred
-            history = pd.concat([history, pd.DataFrame([new_row])], ignore_index=True)
-            history = history.iloc[1:]  # keep last 24h
+            new_row = history.last().copy()
+            new_row[:, temp_idx] = temp_pred
+            history.append(new_row)  # keep last 24h
+
+        return predicted_results
+
+    async def _rollout_stepwise(self, rows: np.ndarray, predict_hours: int, base_timestamp: datetime):
+        """
+        The same rollout with the step-wise model: the observed rows are read
+        once, then every forecast hour is a single recurrent step over the
+        row just predicted, continuing from the LSTM states of the last call.
+        """
+        predicted_results = []
+        temp_idx = self.features.index('air_temperature')
+        X_scaled = HistoryWindow.from_array(rows).scaled(self.scaler_X_step)
+        states = [np.zeros((1, state.shape[-1]), dtype=np.float32) for state in self.model_step.inputs[1:]]
+        last = HistoryWindow.from_array(rows[-1:])
+
+        for step in range(predict_hours):
+            temp_scaled, cond_probs, *states = await self.executor.predict_on_batch(
+                'stepwise.model', self.model_step, [X_scaled, *states])
+            temp_pred = self.scaler_y_step.inverse_transform(np.asarray(temp_scaled).reshape(-1, 1))[0][0]
+            cond_pred = self.label_encoder_step.inverse_transform([np.argmax(cond_probs[0])])[0]
+
+            prediction = ForcastOutputBase(
+                temperature=f"{round(temp_pred,2)}",
+                condition=cond_pred,
+                timestamp=(base_timestamp + timedelta(hours=step)).isoformat(),
+                type="hourly"
+            )
+            predicted_results.append(prediction)
+
+            # Next input is the last row with the predicted temperature
+            new_row = last.last().copy()
+            new_row[:, temp_idx] = temp_pred
+            last.append(new_row)
+            X_scaled = last.scaled(self.scaler_X_step)
 
         return predicted_results
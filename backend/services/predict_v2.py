@@ -1,4 +1,5 @@
-import pandas as pd
+import asyncio
+import json
 import numpy as np
 import os
 
@@ -7,137 +8,175 @@ os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
 
 from datetime import datetime, timedelta
-from meteostat import Point, Hourly
-import joblib
-import tensorflow as tf
+from typing import Optional
+from functools import partial
 from redis.asyncio import Redis
-from backend.services.station import StationLookup
+from backend.services.executor import BlockingExecutor
+from backend.services.history import HistoryWindow
+from backend.services.observations import FEATURES, ObservationSource, ObservationStore
+from backend.services.registry import ModelRegistry
+from backend.services.station import Station, StationLookup
+from backend.utils.singleflight import SingleFlight
+from backend.config import settings
 from backend.schemas import ForcastOutputBase
 
+def _encode_forecast(predictions: list[ForcastOutputBase]) -> bytes:
+    return json.dumps([p.model_dump() for p in predictions]).encode()
+
+def _decode_forecast(raw: bytes) -> list[ForcastOutputBase]:
+    return [ForcastOutputBase(**p) for p in json.loads(raw)]
+
+forecast_flight = SingleFlight(
+    "forecast",
+    lock_timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT,
+    wait_timeout=settings.SINGLE_FLIGHT_WAIT_TIMEOUT,
+    encode=_encode_forecast,
+    decode=_decode_forecast,
+)
+
 class AsyncWeatherPredictor:
-    def __init__(self, redis: Redis):
+    def __init__(self, redis: Redis, registry: ModelRegistry, executor: BlockingExecutor, source: Optional[ObservationSource] = None):
         self.redis = redis
+        self.executor = executor
+        self.observations = ObservationStore(redis, executor, source=source)
+        self.model_version = registry.version
 
-        self.features = [
-            'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
-            'wind_speed', 'wind_direction', 'wdir_sin', 'wdir_cos',
-            'pressure', 'hour_sin', 'hour_cos', 'dayofyear_sin', 'dayofyear_cos'
-        ]
+        self.features = FEATURES
+
+        # Temperature, humidity and precipitation from one shared-encoder model
+        # when it has been trained (`python -m model.train --targets multi_output`)
+        self.multi_output = registry.has('multi_output.seq2seq')
+        if self.multi_output:
+            self.scaler_X_multi = registry.get('multi_output.scaler_x')
+            self.scaler_y_multi = registry.get('multi_output.scaler_y')
+            self.model_seq2seq_multi = registry.scheduler('multi_output.seq2seq')
 
         # Temperature models & scalers
-        self.scaler_X_temp = joblib.load('models/temperature/scaler_X_latest2.pkl')
-        self.scaler_y_temp = joblib.load('models/temperature/scaler_y_temperature_latest2.pkl')
-        self.model_seq2seq_temp = tf.keras.models.load_model('models/temperature/seq2seq_temperature_forecast_optimized.keras')
+        self.scaler_X_temp = registry.get('temperature.scaler_x')
+        self.scaler_y_temp = registry.get('temperature.scaler_y')
+        self.model_seq2seq_temp = registry.scheduler('temperature.seq2seq')
 
         # Humidity models & scalers
-        self.scaler_X_rh = joblib.load('models/relative_humidity/scaler_x_relative_humidity.pkl')
-        self.scaler_y_rh = joblib.load('models/relative_humidity/scaler_y_relative_humidity.pkl')
-        self.model_seq2seq_rh = tf.keras.models.load_model('models/relative_humidity/seq2seq_relative_humidity_forecast.keras')
+        self.scaler_X_rh = registry.get('relative_humidity.scaler_x')
+        self.scaler_y_rh = registry.get('relative_humidity.scaler_y')
+        self.model_seq2seq_rh = registry.scheduler('relative_humidity.seq2seq')
 
-        # Condition model
-        self.model_cond = tf.keras.models.load_model('models/condition/lstm_condition_classifier_latest.keras')
-        self.label_encoder = joblib.load('models/condition/label_encoder_condition.pkl')
+        # Condition model, with the scaler it was trained with (the temperature one before that was saved)
+        self.model_cond = registry.scheduler('condition.model')
+        self.label_encoder = registry.get('condition.label_encoder')
+        self.scaler_X_cond = registry.get('condition.scaler_x') if registry.has('condition.scaler_x') else self.scaler_X_temp
 
         # Config
         self.history_steps = 96
         self.future_block = 10  # Predict 10 hours per loop (rolling)
 
-    async def fetch_recent_data(self, station_name: str, latitude: float, longitude: float, hours_back: int = 96):
-        cache_key = f"station_cache:{station_name.lower().replace(' ', '_')}"
-        cached_data = await self.redis.get(cache_key)
-
-        if cached_data:
-            df = pd.read_json(cached_data.decode('utf-8'))
-        else:
-            pt = Point(latitude, longitude)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(hours=hours_back)
-
-            df = Hourly(pt, start_date, end_date).fetch().reset_index()
-
-            if df.empty or len(df) < hours_back:
-                raise ValueError(f"❌ Not enough data fetched ({len(df)}) for {station_name}")
-
-            df = df.rename(columns={
-                "time": "timestamp",
-                "temp": "air_temperature",
-                "dwpt": "dew_point",
-                "rhum": "relative_humidity",
-                "prcp": "precipitation",
-                "wspd": "wind_speed",
-                "wdir": "wind_direction",
-                "pres": "pressure"
-            })
-
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df['hour'] = df['timestamp'].dt.hour
-            df['dayofyear'] = df['timestamp'].dt.dayofyear
-            df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-            df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-            df['dayofyear_sin'] = np.sin(2 * np.pi * df['dayofyear'] / 365)
-            df['dayofyear_cos'] = np.cos(2 * np.pi * df['dayofyear'] / 365)
-            df['wdir_sin'] = np.sin(np.deg2rad(df['wind_direction']))
-            df['wdir_cos'] = np.cos(np.deg2rad(df['wind_direction']))
-
-            await self.redis.set(cache_key, df.to_json(), ex=3600)
-
-        return df.tail(self.history_steps)
+    async def fetch_recent_data(self, station: Station):
+        return await self.observations.recent(station, self.history_steps)
 
     async def predict(self, station_id: str, predict_hours: int = 72):
-        station = StationLookup.get_station(station_id)
-        history_df = await self.fetch_recent_data(station.name, station.latitude, station.longitude)
-
-        history = history_df.copy()
-        last_history_timestamp = history_df['timestamp'].max()
-        base_timestamp = last_history_timestamp + timedelta(hours=1)
-
-        # Only features
-        history_features = history[self.features]
-
-        predicted_results = []
+        # Concurrent requests for the same forecast share a single computation
+        return await forecast_flight.do(
+            # The version keeps a result from the previous models out of reach after a rollout
+            f"v2:{station_id}:{predict_hours}:{self.model_version}",
+            self.redis,
+            partial(self._predict_station, station_id, predict_hours),
+        )
+
+    async def _predict_station(self, station_id: str, predict_hours: int):
+        forecasts = await self.predict_batch([station_id], predict_hours=predict_hours)
+        return forecasts[station_id]
+
+    async def _forecast_block(self, history: HistoryWindow) -> tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        Temperature, humidity and precipitation for the next block, each
+        (N, future steps). Precipitation is only forecast by the multi-output
+        model; it is None with the separate models.
+        """
+        n_stations = history.batch
+        if self.multi_output:
+            y_scaled = await self.model_seq2seq_multi.predict(history.scaled(self.scaler_X_multi))
+            y = self.scaler_y_multi.inverse_transform(y_scaled.reshape(-1, y_scaled.shape[-1])).reshape(y_scaled.shape)
+            return y[..., 0], y[..., 1], np.maximum(y[..., 2], 0)  # no negative rainfall
+
+        # One seq2seq per target; they run side by side in the executor
+        scaled = await asyncio.gather(
+            self.model_seq2seq_temp.predict(history.scaled(self.scaler_X_temp)),
+            self.model_seq2seq_rh.predict(history.scaled(self.scaler_X_rh)),
+        )
+        y_temp, y_rh = (
+            scaler_y.inverse_transform(y_scaled.reshape(-1, 1)).reshape(n_stations, -1)
+            for scaler_y, y_scaled in zip((self.scaler_y_temp, self.scaler_y_rh), scaled)
+        )
+        return y_temp, y_rh, None
+
+    async def predict_batch(self, station_ids: list[str], predict_hours: int = 72) -> dict[str, list[ForcastOutputBase]]:
+        """
+        Forecast several stations at once. Every station's history window is
+        stacked into one (N, history_steps, n_features) array so each model
+        runs on the whole batch instead of once per station.
+
+        A station without `history_steps` hours of observations is left out
+        of the result; the ValueError is only raised when no station has them.
+        """
+        stations = [StationLookup.get_station(station_id) for station_id in dict.fromkeys(station_ids)]
+        fetched = await asyncio.gather(*(
+            self.fetch_recent_data(station)
+            for station in stations
+        ), return_exceptions=True)
+        for result in fetched:
+            if isinstance(result, BaseException) and not isinstance(result, ValueError):
+                raise result
+        short = [(station, result) for station, result in zip(stations, fetched) if isinstance(result, ValueError)]
+        if len(short) == len(stations):
+            raise short[0][1]
+        for station, error in short:
+            print(f"⚠️ Skipping {station.id} in the batch forecast: {error}")
+        stations, history_dfs = zip(*(
+            (station, result) for station, result in zip(stations, fetched) if not isinstance(result, ValueError)
+        ))
+
+        base_timestamps = [history_df['timestamp'].max() + timedelta(hours=1) for history_df in history_dfs]
+
+        # Only features, stacked as (N, steps, features)
+        history = HistoryWindow.from_array(np.stack([history_df[self.features].to_numpy() for history_df in history_dfs]))
+        temp_idx = self.features.index('air_temperature')
+        rh_idx = self.features.index('relative_humidity')
+        prcp_idx = self.features.index('precipitation')
+
+        predicted_results = {station.id: [] for station in stations}
         total_predicted_hours = 0
 
         while total_predicted_hours < predict_hours:
-            # Scale inputs
-            X_input_temp = self.scaler_X_temp.transform(history_features)
-            X_input_rh = self.scaler_X_rh.transform(history_features)
-
-            X_input_temp = np.expand_dims(X_input_temp, axis=0)
-            X_input_rh = np.expand_dims(X_input_rh, axis=0)
-
-            # Predict temperature block
-            y_pred_temp_scaled = self.model_seq2seq_temp.predict(X_input_temp, verbose=0)[0]
-            y_pred_temp = self.scaler_y_temp.inverse_transform(y_pred_temp_scaled).flatten()
-
-            # Predict humidity block
-            y_pred_rh_scaled = self.model_seq2seq_rh.predict(X_input_rh, verbose=0)[0]
-            y_pred_rh = self.scaler_y_rh.inverse_transform(y_pred_rh_scaled).flatten()
+            # Predict the temperature, humidity and precipitation block, and the
+            # condition once per block (its input is the same for every hour in it)
+            (y_pred_temp, y_pred_rh, y_pred_prcp), cond_probs = await asyncio.gather(
+                self._forecast_block(history),
+                self.model_cond.predict(history.scaled(self.scaler_X_cond)),
+            )
+            cond_preds = self.label_encoder.inverse_transform(np.argmax(cond_probs, axis=1))
 
             # How many hours to process this round
             hours_to_add = min(self.future_block, predict_hours - total_predicted_hours)
 
             for i in range(hours_to_add):
-                # Predict condition (we can reuse the same X_input_temp)
-                cond_probs = self.model_cond.predict(X_input_temp, verbose=0)[0]
-                cond_pred = self.label_encoder.inverse_transform([np.argmax(cond_probs)])[0]
-
-                prediction = ForcastOutputBase(
-                    temperature=f"{round(y_pred_temp[i], 2)}",
-                    humidity=f"{round(y_pred_rh[i], 2)}",
-                    precipitation="0",  # Placeholder if needed
-                    condition=cond_pred,
-                    timestamp=(base_timestamp + timedelta(hours=total_predicted_hours + i)).replace(minute=0, second=0, microsecond=0).isoformat(),
-                    type="hourly"
-                )
-                predicted_results.append(prediction)
-
-            # Update history for next round
-            for temp, rh in zip(y_pred_temp[:hours_to_add], y_pred_rh[:hours_to_add]):
-                new_row = history_features.iloc[-1].copy()
-                new_row['air_temperature'] = temp
-                new_row['relative_humidity'] = rh
-                history_features = pd.concat([history_features, pd.DataFrame([new_row])], ignore_index=True)
-                history_features = history_features.iloc[1:]  # Keep last 96
+                for n, station in enumerate(stations):
+                    prediction = ForcastOutputBase(
+                        temperature=f"{round(y_pred_temp[n, i], 2)}",
+                        humidity=f"{round(y_pred_rh[n, i], 2)}",
+                        precipitation=f"{round(y_pred_prcp[n, i], 2)}" if y_pred_prcp is not None else "0",
+                        condition=cond_preds[n],
+                        timestamp=(base_timestamps[n] + timedelta(hours=total_predicted_hours + i)).replace(minute=0, second=0, microsecond=0).isoformat(),
+                        type="hourly"
+                    )
+                    predicted_results[station.id].append(prediction)
+
+            # Update history for next round: repeat the last row with the predicted values
+            new_rows = np.repeat(history.last()[:, np.newaxis], hours_to_add, axis=1)
+            new_rows[:, :, temp_idx] = y_pred_temp[:, :hours_to_add]
+            new_rows[:, :, rh_idx] = y_pred_rh[:, :hours_to_add]
+            if y_pred_prcp is not None:
+                new_rows[:, :, prcp_idx] = y_pred_prcp[:, :hours_to_add]
+            history.extend(new_rows)  # Keep last 96
 
             total_predicted_hours += hours_to_add
 
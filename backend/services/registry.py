@@ -0,0 +1,179 @@
+# services/registry.py
+
+import hashlib
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, ClassVar, Dict, Optional
+
+import numpy as np
+
+# Environment configs
+os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
+
+import joblib
+import tensorflow as tf
+
+from backend.services.executor import BlockingExecutor
+from backend.services.scheduler import InferenceScheduler
+
+
+@dataclass(frozen=True)
+class ArtifactSpec:
+    path: str  # relative to the models directory
+    kind: str  # "keras" or "joblib"
+    optional: bool = False  # skipped when the file has not been trained yet
+
+
+@dataclass
+class LoadedArtifact:
+    name: str
+    path: Path
+    kind: str
+    obj: Any
+    file_bytes: int
+    digest: str  # sha256 of the file on disk
+    memory_bytes: int
+    load_seconds: float
+
+
+def _estimate_memory(obj: Any, kind: str) -> int:
+    """Rough resident size of a loaded artifact in bytes."""
+    if kind == "keras":
+        return int(sum(np.prod(w.shape) * np.dtype(w.dtype).itemsize for w in obj.weights))
+    arrays = [v for v in vars(obj).values() if isinstance(v, np.ndarray)]
+    return sys.getsizeof(obj) + sum(a.nbytes for a in arrays)
+
+
+class ModelRegistry:
+    """
+    Process-wide holder of every model, scaler and encoder the predictors use.
+    Filled once from the app lifespan and shared by all requests.
+    """
+
+    # artifact name → location under the models directory
+    _artifacts: ClassVar[Dict[str, ArtifactSpec]] = {
+        # v1 (24h autoregressive LSTMs)
+        "v1.scaler_x":                  ArtifactSpec("scaler_X_latest.pkl", "joblib"),
+        "v1.model_temp":                ArtifactSpec("lstm_temperature_latest.keras", "keras"),
+        # v2 (96h seq2seq)
+        "temperature.scaler_x":         ArtifactSpec("temperature/scaler_X_latest2.pkl", "joblib"),
+        "temperature.scaler_y":         ArtifactSpec("temperature/scaler_y_temperature_latest2.pkl", "joblib"),
+        "temperature.seq2seq":          ArtifactSpec("temperature/seq2seq_temperature_forecast_optimized.keras", "keras"),
+        "relative_humidity.scaler_x":   ArtifactSpec("relative_humidity/scaler_x_relative_humidity.pkl", "joblib"),
+        "relative_humidity.scaler_y":   ArtifactSpec("relative_humidity/scaler_y_relative_humidity.pkl", "joblib"),
+        "relative_humidity.seq2seq":    ArtifactSpec("relative_humidity/seq2seq_relative_humidity_forecast.keras", "keras"),
+        # v2, one shared-encoder model for temperature, humidity and precipitation
+        "multi_output.scaler_x":        ArtifactSpec("multi_output/scaler_x_multi_output.pkl", "joblib", optional=True),
+        "multi_output.scaler_y":        ArtifactSpec("multi_output/scaler_y_multi_output.pkl", "joblib", optional=True),
+        "multi_output.seq2seq":         ArtifactSpec("multi_output/seq2seq_multi_output_forecast.keras", "keras", optional=True),
+        # v1 step-wise (one recurrent step per forecast hour)
+        "stepwise.scaler_x":            ArtifactSpec("stepwise/scaler_x_stepwise.pkl", "joblib", optional=True),
+        "stepwise.scaler_y":            ArtifactSpec("stepwise/scaler_y_stepwise.pkl", "joblib", optional=True),
+        "stepwise.label_encoder":       ArtifactSpec("stepwise/label_encoder_stepwise.pkl", "joblib", optional=True),
+        "stepwise.model":               ArtifactSpec("stepwise/lstm_stepwise.keras", "keras", optional=True),
+        # shared by v1 and v2; models trained before the condition scaler was
+        # saved read the input scaled like the forecast models next to them
+        "condition.model":              ArtifactSpec("condition/lstm_condition_classifier_latest.keras", "keras"),
+        "condition.label_encoder":      ArtifactSpec("condition/label_encoder_condition.pkl", "joblib"),
+        "condition.scaler_x":           ArtifactSpec("condition/scaler_x_condition.pkl", "joblib", optional=True),
+    }
+
+    def __init__(
+        self,
+        models_dir: Path,
+        max_batch_size: int = 64,
+        max_batch_delay: timedelta = timedelta(milliseconds=5),
+        executor: Optional[BlockingExecutor] = None,
+    ):
+        self.models_dir = Path(models_dir)
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.executor = executor
+        self.loaded: Dict[str, LoadedArtifact] = {}
+        self.schedulers: Dict[str, InferenceScheduler] = {}
+
+    def load(self) -> "ModelRegistry":
+        """Load every registered artifact from disk. Safe to call more than once."""
+        for name, spec in self._artifacts.items():
+            if name in self.loaded:
+                continue
+            path = self.models_dir / spec.path
+            if spec.optional and not path.exists():
+                continue
+            started = time.perf_counter()
+            if spec.kind == "keras":
+                obj = tf.keras.models.load_model(path)
+            else:
+                obj = joblib.load(path)
+            self.loaded[name] = LoadedArtifact(
+                name=name,
+                path=path,
+                kind=spec.kind,
+                obj=obj,
+                file_bytes=path.stat().st_size,
+                digest=hashlib.sha256(path.read_bytes()).hexdigest(),
+                memory_bytes=_estimate_memory(obj, spec.kind),
+                load_seconds=time.perf_counter() - started,
+            )
+        return self
+
+    def has(self, name: str) -> bool:
+        return name in self.loaded
+
+    def get(self, name: str) -> Any:
+        """Return the loaded object for the given artifact name, or raise KeyError."""
+        try:
+            return self.loaded[name].obj
+        except KeyError:
+            raise KeyError(f"Artifact {name!r} is not loaded") from None
+
+    def scheduler(self, name: str) -> InferenceScheduler:
+        """Return the micro-batching scheduler wrapping the given Keras model."""
+        if name not in self.schedulers:
+            self.schedulers[name] = InferenceScheduler(
+                self.get(name),
+                max_batch_size=self.max_batch_size,
+                max_delay=self.max_batch_delay,
+                name=name,
+                executor=self.executor,
+            )
+        return self.schedulers[name]
+
+    def scheduler_stats(self) -> dict:
+        return {name: scheduler.stats() for name, scheduler in self.schedulers.items()}
+
+    async def close(self) -> None:
+        for scheduler in self.schedulers.values():
+            await scheduler.close()
+
+    @property
+    def version(self) -> str:
+        """Short digest of every loaded artifact; changes whenever any model file does."""
+        bundle = hashlib.sha256()
+        for name in sorted(self.loaded):
+            bundle.update(f"{name}={self.loaded[name].digest}\n".encode())
+        return bundle.hexdigest()[:12]
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(a.memory_bytes for a in self.loaded.values())
+
+    def describe(self) -> list[dict]:
+        """Return one record per loaded artifact (without the object itself)."""
+        return [
+            {
+                "name": a.name,
+                "path": str(a.path),
+                "kind": a.kind,
+                "file_bytes": a.file_bytes,
+                "digest": a.digest,
+                "memory_bytes": a.memory_bytes,
+                "load_seconds": round(a.load_seconds, 3),
+            }
+            for a in self.loaded.values()
+        ]
@@ -0,0 +1,122 @@
+# services/scheduler.py
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional
+
+import numpy as np
+
+from backend.services.executor import BlockingExecutor
+
+
+@dataclass
+class _Pending:
+    X: np.ndarray
+    future: asyncio.Future = field(repr=False)
+
+
+class InferenceScheduler:
+    """
+    Coalesces concurrent `predict` calls for one model into a single batched
+    `model.predict`. A batch is flushed when it reaches `max_batch_size` rows
+    or `max_delay` after its first request arrived, whichever comes first.
+    With an executor the model call runs off the event loop.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        max_batch_size: int = 64,
+        max_delay: timedelta = timedelta(milliseconds=5),
+        name: str = "",
+        executor: Optional[BlockingExecutor] = None,
+    ):
+        self.model = model
+        self.name = name
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay.total_seconds()
+        self.batch_sizes: Counter = Counter()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def predict(self, X: np.ndarray) -> np.ndarray:
+        """Queue a (n, ...) input and wait for its n output rows."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Pending(X, future))
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        batches = sum(self.batch_sizes.values())
+        rows = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "queue_depth": self.queue_depth,
+            "batches": batches,
+            "mean_batch_size": round(rows / batches, 2) if batches else 0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _collect(self) -> list[_Pending]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        rows = len(batch[0].X)
+        deadline = loop.time() + self.max_delay
+        while rows < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                pending = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(pending)
+            rows += len(pending.X)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # Inputs of different window lengths can't be stacked together
+            groups: dict[tuple, list[_Pending]] = {}
+            for pending in batch:
+                groups.setdefault(pending.X.shape[1:], []).append(pending)
+            for group in groups.values():
+                await self._flush(group)
+
+    async def _flush(self, group: list[_Pending]) -> None:
+        X = np.concatenate([pending.X for pending in group])
+        self.batch_sizes[len(X)] += 1
+        try:
+            if self.executor is not None:
+                outputs = await self.executor.predict(self.name, self.model, X)
+            else:
+                outputs = self.model.predict(X, verbose=0)
+        except Exception as exc:
+            for pending in group:
+                if not pending.future.done():
+                    pending.future.set_exception(exc)
+            return
+        offset = 0
+        for pending in group:
+            n = len(pending.X)
+            if not pending.future.done():
+                pending.future.set_result(outputs[offset:offset + n])
+            offset += n
@@ -48,3 +48,8 @@ class StationLookup:
         """Return the station data as a dict."""
         station = cls.get_station(id)
         return station.__dict__.copy()
+
+    @classmethod
+    def get_station_ids(cls) -> list[str]:
+        """Return the IDs of every registered station."""
+        return list(cls._stations)
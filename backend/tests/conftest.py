@@ -1,4 +1,6 @@
+import asyncio
 import pytest
+from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
 from backend.main import app
 from backend.api.dependencies import redis
@@ -8,9 +10,117 @@ def test_client():
     return TestClient(app)
 
 @pytest.fixture(autouse=True)
-async def mock_redis():
+def mock_redis():
     """Mock Redis connection for all tests"""
     with pytest.MonkeyPatch.context() as m:
         m.setattr(redis, "create_redis_connection", AsyncMock())
         m.setattr(redis, "close_redis", AsyncMock())
-        yield 
\ No newline at end of file
+        yield
+
+
+class FakeLock:
+    def __init__(self, redis, name):
+        self.redis = redis
+        self.name = name
+
+    async def acquire(self, blocking=True):
+        while self.name in self.redis.locks:
+            if not blocking:
+                return False
+            await asyncio.sleep(0.001)
+        self.redis.locks.add(self.name)
+        return True
+
+    async def release(self):
+        self.redis.locks.discard(self.name)
+
+
+class FakePipeline:
+    """Queues commands and applies them in one step on `execute`, like MULTI/EXEC."""
+
+    def __init__(self, redis, transaction):
+        self.redis = redis
+        self.transaction = transaction
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.commands = []
+
+    def zadd(self, key, mapping):
+        self.commands.append((self.redis._zadd, key, mapping))
+        return self
+
+    def zremrangebyscore(self, key, min, max):
+        self.commands.append((self.redis._zremrangebyscore, key, min, max))
+        return self
+
+    async def execute(self):
+        await asyncio.sleep(0)
+        for command, *args in self.commands:
+            command(*args)
+        self.commands = []
+
+
+class FakeRedis:
+    """In-memory stand-in for the handful of redis.asyncio calls the services make."""
+
+    def __init__(self):
+        self.store = {}
+        self.zsets = {}
+        self.published = []
+        self.locks = set()
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value.encode() if isinstance(value, str) else value
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    async def zadd(self, key, mapping):
+        await asyncio.sleep(0)  # every command is a round trip other tasks can run during
+        self._zadd(key, mapping)
+
+    async def zrange(self, key, start, end, withscores=False):
+        await asyncio.sleep(0)
+        members = sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+        stop = None if end == -1 else end + 1
+        members = members[start:stop]
+        return [(member, float(score)) for member, score in members] if withscores else [member for member, _ in members]
+
+    async def zremrangebyscore(self, key, min, max):
+        await asyncio.sleep(0)
+        self._zremrangebyscore(key, min, max)
+
+    def _zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def _zremrangebyscore(self, key, min, max):
+        def bound(value):
+            value = str(value)
+            if value.startswith("("):
+                return float(value[1:]), True
+            return float(value), False
+
+        low, low_open = bound(min)
+        high, high_open = bound(max)
+        zset = self.zsets.get(key, {})
+        for member, score in list(zset.items()):
+            if (score > low or (score == low and not low_open)) and (score < high or (score == high and not high_open)):
+                del zset[member]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self, transaction)
+
+    def lock(self, name, timeout=None, blocking_timeout=None):
+        return FakeLock(self, name)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
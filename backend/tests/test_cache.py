@@ -0,0 +1,257 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from backend.api.dependencies.predict import get_predictor_v2
+from backend.api.endpoints.forecast import router
+from backend.config import settings
+from backend.schemas.forecast import ForcastOutputBase
+from backend.utils import cache as response_cache
+from backend.utils.cache import ResponseCoder, TieredBackend, count_cache_status, store_forecast, write_forecast_entry
+
+
+class FakeObservations:
+    def __init__(self):
+        self.hour = datetime(2025, 1, 5, 0)
+
+    async def latest_hour(self, station_id):
+        return self.hour
+
+
+class FakePredictor:
+    def __init__(self):
+        self.observations = FakeObservations()
+        self.model_version = "v-a"
+        self.delay = 0
+        self.calls = 0
+        self.new_hours = 0  # observation hours fetched while predicting
+
+    async def predict(self, station_id, predict_hours=72):
+        await asyncio.sleep(self.delay)
+        self.calls += 1
+        self.observations.hour += timedelta(hours=self.new_hours)
+        first_hour = self.observations.hour + timedelta(hours=1)
+        return [ForcastOutputBase(temperature=str(self.calls), condition="Clear", timestamp=first_hour.isoformat(), type="hourly")]
+
+    async def predict_batch(self, station_ids, predict_hours=72):
+        forecast = await self.predict(station_ids[0], predict_hours)
+        return {station_id: forecast for station_id in station_ids}
+
+
+class DroppingPubSub:
+    """Subscription whose first connection drops; later ones deliver `messages`."""
+
+    def __init__(self, redis, messages):
+        self.redis = redis
+        self.messages = messages
+
+    async def subscribe(self, channel):
+        self.redis.subscriptions += 1
+
+    async def listen(self):
+        if self.redis.subscriptions == 1:
+            raise ConnectionError("connection reset")
+        for message in self.messages:
+            yield {"type": "message", "data": message}
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def client_and_predictor(monkeypatch):
+    monkeypatch.setattr(response_cache, "cache_counters", response_cache.defaultdict(response_cache.Counter))
+    predictor = FakePredictor()
+    app = FastAPI()
+    app.include_router(router, prefix="/forecast")
+    app.middleware("http")(count_cache_status)
+    app.dependency_overrides[get_predictor_v2] = lambda: predictor
+    backend = InMemoryBackend()
+    backend._store = {}  # the class-level default is shared between instances
+    FastAPICache.init(backend, prefix="forecast_cache", coder=ResponseCoder)
+    # Entering the client keeps one event loop alive for background refreshes
+    with TestClient(app) as client:
+        yield client, predictor
+    FastAPICache.reset()
+
+
+def test_key_follows_data_hour_and_model_version(client_and_predictor):
+    client, predictor = client_and_predictor
+
+    assert client.get("/forecast/?station_id=12756").json()[0]["temperature"] == "1"
+    assert client.get("/forecast/?station_id=12756").json()[0]["temperature"] == "1"
+
+    # A new observation hour: the previous forecast is served while it refreshes
+    predictor.observations.hour = datetime(2025, 1, 5, 1)
+    response = client.get("/forecast/?station_id=12756")
+    assert response.headers["X-FastAPI-Cache"] == "STALE"
+    assert response.json()[0]["temperature"] == "1"
+    wait_for(lambda: predictor.calls == 2)
+    assert client.get("/forecast/?station_id=12756").json()[0]["temperature"] == "2"
+
+    # A new model bundle never reuses the old model's forecasts
+    predictor.model_version = "v-b"
+    assert client.get("/forecast/?station_id=12756").json()[0]["temperature"] == "3"
+
+    assert response_cache.cache_stats()["/forecast/"] == {"hits": 2, "stale": 1, "misses": 2, "hit_ratio": 0.6}
+
+
+def test_forecast_is_stored_under_the_hour_it_was_computed_from(client_and_predictor):
+    client, predictor = client_and_predictor
+    predictor.new_hours = 1
+
+    # The lookup saw 00:00, but predicting fetched 01:00 and forecast from it
+    assert client.get("/forecast/?station_id=12756").headers["X-FastAPI-Cache"] == "MISS"
+    assert predictor.observations.hour == datetime(2025, 1, 5, 1)
+
+    response = client.get("/forecast/?station_id=12756")
+    assert response.headers["X-FastAPI-Cache"] == "HIT"
+    assert response.json()[0]["timestamp"] == "2025-01-05T02:00:00"
+    assert predictor.calls == 1
+
+
+def test_batch_is_stored_under_the_hours_it_was_computed_from(client_and_predictor):
+    client, predictor = client_and_predictor
+    predictor.new_hours = 1
+
+    response = client.get("/forecast/batch?station_id=12756&station_id=12772")
+    assert response.headers["X-FastAPI-Cache"] == "MISS"
+    assert response.json()["12772"][0]["timestamp"] == "2025-01-05T02:00:00"
+
+    response = client.get("/forecast/batch?station_id=12772&station_id=12756")
+    assert response.headers["X-FastAPI-Cache"] == "HIT"
+    assert response.json()["12756"][0]["temperature"] == "1"
+    assert client.get(
+        "/forecast/batch?station_id=12756&station_id=12772", headers={"If-None-Match": response.headers["ETag"]}
+    ).status_code == 304
+    assert predictor.calls == 1
+
+    # A newer hour is a new batch
+    predictor.observations.hour = datetime(2025, 1, 5, 3)
+    assert client.get("/forecast/batch?station_id=12756&station_id=12772").headers["X-FastAPI-Cache"] == "MISS"
+    assert predictor.calls == 2
+
+
+def test_batch_rejects_unknown_stations(client_and_predictor):
+    client, predictor = client_and_predictor
+    response = client.get("/forecast/batch?station_id=12756&station_id=nowhere")
+    assert response.status_code == 404
+    assert "nowhere" in response.json()["detail"]
+    assert predictor.calls == 0
+
+
+def test_expired_forecast_is_served_stale_within_limit(client_and_predictor):
+    client, predictor = client_and_predictor
+    expired = time.time() - settings.FORECAST_CACHE_EXPIRE - 60
+    data_hour = predictor.observations.hour
+    asyncio.run(write_forecast_entry("12756", 72, "v-a", data_hour, b'[{"temperature": "old"}]', written_at=expired))
+    predictor.delay = 0.2
+
+    responses = [client.get("/forecast/?station_id=12756") for _ in range(3)]
+    assert [r.headers["X-FastAPI-Cache"] for r in responses] == ["STALE"] * 3
+    assert int(responses[0].headers["Age"]) >= settings.FORECAST_CACHE_EXPIRE + 60
+    wait_for(lambda: predictor.calls == 1)
+    assert client.get("/forecast/?station_id=12756").headers["X-FastAPI-Cache"] == "HIT"
+    assert predictor.calls == 1  # one background refresh for all the stale hits
+
+
+def test_forecast_past_max_stale_is_recomputed(client_and_predictor):
+    client, predictor = client_and_predictor
+    too_old = time.time() - settings.FORECAST_CACHE_EXPIRE - settings.FORECAST_CACHE_MAX_STALE.total_seconds() - 1
+    data_hour = predictor.observations.hour
+    asyncio.run(write_forecast_entry("12756", 72, "v-a", data_hour, b'[{"temperature": "old"}]', written_at=too_old))
+
+    response = client.get("/forecast/?station_id=12756")
+    assert response.headers["X-FastAPI-Cache"] == "MISS"
+    assert response.json()[0]["temperature"] == "1"
+
+
+def test_precomputed_forecast_is_served_from_cache(client_and_predictor):
+    client, predictor = client_and_predictor
+    precomputed = [ForcastOutputBase(temperature="9.5", condition="Clear", timestamp="2025-01-05T01:00:00", type="hourly")]
+    asyncio.run(store_forecast("12756", 72, precomputed, model_version="v-a"))
+
+    response = client.get("/forecast/?station_id=12756")
+    assert response.json()[0]["temperature"] == "9.5"
+    assert predictor.calls == 0
+
+
+def test_cache_control_request_headers_are_honoured(client_and_predictor):
+    client, predictor = client_and_predictor
+    assert client.get("/forecast/?station_id=12756").json()[0]["temperature"] == "1"
+
+    # no-cache recomputes and stores the new forecast
+    response = client.get("/forecast/?station_id=12756", headers={"Cache-Control": "no-cache"})
+    assert response.headers["X-FastAPI-Cache"] == "MISS"
+    assert response.json()[0]["temperature"] == "2"
+    assert client.get("/forecast/?station_id=12756").json()[0]["temperature"] == "2"
+
+    # no-store neither reads nor writes the cache
+    response = client.get("/forecast/?station_id=12756", headers={"Cache-Control": "no-store, max-age=0"})
+    assert "X-FastAPI-Cache" not in response.headers
+    assert response.json()[0]["temperature"] == "3"
+    assert client.get("/forecast/?station_id=12756").json()[0]["temperature"] == "2"
+    assert predictor.calls == 3
+
+
+def test_tiered_backend_serves_l1_and_evicts_by_size(fake_redis):
+    l2 = InMemoryBackend()
+    backend = TieredBackend(l2, fake_redis, max_bytes=10)
+
+    asyncio.run(backend.set("a", b"12345", 60))
+    asyncio.run(backend.set("b", b"12345", 60))
+    asyncio.run(l2.set("a", b"changed", 60))
+    assert asyncio.run(backend.get("a")) == b"12345"  # from L1, no round trip
+
+    asyncio.run(backend.set("c", b"12345", 60))  # evicts "b", the least recently used
+    assert list(backend._entries) == ["a", "c"]
+    assert backend.stats()["evictions"] == 1
+    assert len(fake_redis.published) == 3
+
+
+def test_tiered_backend_drops_entries_written_by_other_workers(fake_redis):
+    l2 = InMemoryBackend()
+    ours = TieredBackend(l2, fake_redis)
+    theirs = TieredBackend(l2, fake_redis)
+    asyncio.run(ours.set("forecast_cache:forecast:12756", b"old", 60))
+
+    asyncio.run(theirs.set("forecast_cache:forecast:12756", b"new", 60))
+    for _, message in fake_redis.published:
+        ours.handle_invalidation(message)
+
+    assert asyncio.run(ours.get("forecast_cache:forecast:12756")) == b"new"
+    assert ours.stats()["invalidations"] == 1
+
+
+def test_tiered_backend_resubscribes_after_the_connection_drops(fake_redis):
+    message = json.dumps({"origin": "other", "namespace": None, "key": "forecast_cache:forecast:12756"})
+    fake_redis.subscriptions = 0
+    fake_redis.pubsub = lambda: DroppingPubSub(fake_redis, [message])
+    backend = TieredBackend(InMemoryBackend(), fake_redis, reconnect_delay=timedelta(0))
+
+    async def run():
+        await backend.set("forecast_cache:forecast:12772", b"cached", 60)
+        backend.start()
+        while backend.stats()["invalidations"] == 0:
+            await asyncio.sleep(0.001)
+        await backend.close()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=2))
+    assert fake_redis.subscriptions == 2
+    assert backend.stats()["reconnects"] == 1
+    assert backend.stats()["entries"] == 0  # anything cached before the drop may have been replaced
@@ -0,0 +1,71 @@
+import json
+
+import pandas as pd
+import pytest
+
+from db.cassandra.loader import CassandraLoader
+from db.cassandra.repository import BulkWriteResult, WEATHER_FLOAT_COLUMNS
+
+
+class FakeRepository:
+    """Records written rows; the call numbered `fail_on` reports every row as failed."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = 0
+        self.rows = []
+
+    def write_partitioned(self, query, rows, batch_size, concurrency):
+        self.calls += 1
+        rows = list(rows)
+        if self.calls == self.fail_on:
+            return BulkWriteResult(rows=len(rows), batches=1, failed_rows=len(rows), seconds=0.1)
+        self.rows.extend(rows)
+        return BulkWriteResult(rows=len(rows), batches=1, failed_rows=0, seconds=0.1)
+
+
+def write_station(path, station_id, hours):
+    df = pd.DataFrame({
+        'station_id': station_id,
+        'timestamp': pd.date_range('2025-01-01', periods=hours, freq='h'),
+        **{column: range(hours) for column in WEATHER_FLOAT_COLUMNS},
+        'condition_group': 'Clear',
+        'snow': 0.0,  # extra columns are not read
+    })
+    # Small row groups so the file is streamed in several pieces
+    df.to_parquet(path, row_group_size=4)
+
+
+def test_file_is_streamed_in_chunks_and_resumed(tmp_path):
+    path = tmp_path / "agard_data.parquet"
+    write_station(path, "12925", 10)
+
+    flaky = FakeRepository(fail_on=2)
+    loader = CassandraLoader(flaky, chunk_rows=3, checkpoint_dir=str(tmp_path / "checkpoints"))
+    with pytest.raises(RuntimeError):
+        loader.load_parquet_to_cassandra(str(path))
+    assert len(flaky.rows) == 3
+    checkpoint = json.loads((tmp_path / "checkpoints" / "agard_data.parquet.json").read_text())
+    assert checkpoint['rows_done'] == 3 and not checkpoint['complete']
+
+    repository = FakeRepository()
+    loader.repository = repository
+    assert loader.load_parquet_to_cassandra(str(path)) == 7
+    assert [row[2] for row in repository.rows] == [3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0]
+    assert repository.rows[0][0] == "12925"
+
+    # A finished file is skipped on the next run
+    assert loader.load_parquet_to_cassandra(str(path)) == 0
+    assert repository.calls == 3
+
+
+def test_directory_is_loaded_in_parallel(tmp_path):
+    for station_id in ("12772", "12812", "12925"):
+        write_station(tmp_path / f"{station_id}_data.parquet", station_id, 6)
+    (tmp_path / "stations.csv").write_text("not parquet")
+
+    repository = FakeRepository()
+    loaded = CassandraLoader(repository, chunk_rows=4).load_all_parquet_files(str(tmp_path), workers=3)
+
+    assert sorted(loaded.values()) == [6, 6, 6]
+    assert {row[0] for row in repository.rows} == {"12772", "12812", "12925"}
@@ -0,0 +1,183 @@
+import asyncio
+import os
+import re
+from datetime import datetime
+
+import pytest
+from cassandra.query import SimpleStatement
+
+import db.cassandra.repository as repository_module
+from db.cassandra.repository import CassandraRepository
+
+
+class FakeBound:
+    def __init__(self, query, params):
+        self.query = query
+        self.params = params
+        self.fetch_size = None
+
+
+class FakePrepared:
+    def __init__(self, query):
+        self.query = query
+
+    def bind(self, params):
+        return FakeBound(self.query, params)
+
+
+class FakeResponseFuture:
+    """Delivers rows a page at a time through callbacks, like the driver's ResponseFuture."""
+
+    def __init__(self, rows, page_size):
+        self.pages = [rows[i:i + page_size] for i in range(0, len(rows), page_size)] or [[]]
+        self.has_more_pages = len(self.pages) > 1
+        self.fetched = 0
+
+    def add_callbacks(self, callback, errback):
+        self.callback = callback
+        self.start_fetching_next_page()
+
+    def start_fetching_next_page(self):
+        page = self.pages.pop(0)
+        self.has_more_pages = bool(self.pages)
+        self.fetched += 1
+        self.callback(page)
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.prepared = []
+        self.futures = []
+
+    def prepare(self, query):
+        self.prepared.append(query)
+        return FakePrepared(query)
+
+    def execute_async(self, bound):
+        future = FakeResponseFuture(self.rows, bound.fetch_size)
+        self.futures.append(future)
+        return future
+
+
+def make_repository(rows):
+    repository = CassandraRepository(["localhost"], fetch_size=4)
+    repository._session = FakeSession(rows)
+    return repository
+
+
+def test_statements_are_prepared_once():
+    repository = make_repository([])
+    query = "SELECT * FROM weather_data WHERE station_id = ?"
+
+    assert repository.prepare(query) is repository.prepare(query)
+    assert repository.session.prepared == [query]
+
+
+def test_pages_are_fetched_on_demand():
+    repository = make_repository(list(range(10)))
+
+    async def first_page():
+        async for page in repository.iter_pages("SELECT", ("12756",)):
+            return page
+
+    assert asyncio.run(first_page()) == [0, 1, 2, 3]
+    assert repository.session.futures[0].fetched == 1
+
+    assert asyncio.run(repository.fetch_all("SELECT", ("12756",))) == list(range(10))
+    assert repository.session.futures[1].fetched == 3
+
+
+class FakeExecuteConcurrent:
+    """Stands in for cassandra.concurrent.execute_concurrent; fails the first `failures` calls for `bad_station`."""
+
+    def __init__(self, bad_station=None, failures=0):
+        self.bad_station = bad_station
+        self.failures = failures
+        self.calls = []
+
+    def __call__(self, session, statements, concurrency, raise_on_first_error):
+        batches = [batch for batch, _ in statements]
+        self.calls.append(batches)
+        failing = len(self.calls) <= self.failures
+        results = []
+        for batch in batches:
+            ok = not (failing and self.bad_station in stations_in(batch))
+            results.append((ok, None if ok else Exception("write timeout")))
+        return results
+
+
+class FakeWriteSession(FakeSession):
+    def prepare(self, query):
+        # A simple statement batches like a prepared one without needing a cluster
+        return SimpleStatement(query)
+
+
+def make_writer():
+    repository = CassandraRepository(["localhost"])
+    repository._session = FakeWriteSession([])
+    return repository
+
+
+INSERT = "INSERT INTO weather_data (station_id, timestamp, air_temperature) VALUES (%s, %s, %s)"
+
+
+def stations_in(batch):
+    # Simple statements are batched as plain CQL with the values inlined
+    return {re.search(r"VALUES \('(\w+)'", query).group(1) for _, query, _ in batch._statements_and_parameters}
+
+
+def rows_for(station_id, count):
+    return [(station_id, datetime(2025, 1, 1, hour % 24), float(hour)) for hour in range(count)]
+
+
+def test_bulk_writes_are_unlogged_single_partition_batches(monkeypatch):
+    fake = FakeExecuteConcurrent()
+    monkeypatch.setattr(repository_module, "execute_concurrent", fake)
+    repository = make_writer()
+
+    result = repository.write_partitioned(INSERT, rows_for("a", 7) + rows_for("b", 3), batch_size=3, retry_delay=0)
+
+    batches = fake.calls[0]
+    assert [len(batch) for batch in batches] == [3, 3, 1, 3]
+    for batch in batches:
+        assert batch.batch_type == repository_module.BatchType.UNLOGGED
+        assert len(stations_in(batch)) == 1
+    assert (result.rows, result.batches, result.failed_rows) == (10, 4, 0)
+
+
+def test_failed_batches_are_retried_then_counted(monkeypatch):
+    repository = make_writer()
+
+    flaky = FakeExecuteConcurrent(bad_station="b", failures=1)
+    monkeypatch.setattr(repository_module, "execute_concurrent", flaky)
+    result = repository.write_partitioned(INSERT, rows_for("a", 4) + rows_for("b", 4), batch_size=2, retry_delay=0)
+    assert len(flaky.calls) == 2 and len(flaky.calls[1]) == 2
+    assert result.failed_rows == 0
+
+    broken = FakeExecuteConcurrent(bad_station="b", failures=10)
+    monkeypatch.setattr(repository_module, "execute_concurrent", broken)
+    result = repository.write_partitioned(INSERT, rows_for("a", 4) + rows_for("b", 4), batch_size=2, retries=2, retry_delay=0)
+    assert len(broken.calls) == 3
+    assert result.failed_rows == 4
+
+
+@pytest.mark.skipif("CASSANDRA_TEST_HOST" not in os.environ, reason="needs a local Cassandra (set CASSANDRA_TEST_HOST)")
+def test_range_read_against_local_cassandra():
+    # e.g. docker compose up cassandra && CASSANDRA_TEST_HOST=localhost pytest backend/tests
+    repository = CassandraRepository(os.environ["CASSANDRA_TEST_HOST"].split(","), fetch_size=2).connect()
+    try:
+        hours = [datetime(2025, 1, 1, hour) for hour in range(5)]
+        for hour in hours:
+            repository.session.execute(
+                repository.prepare("INSERT INTO weather_data (station_id, timestamp, air_temperature) VALUES (?, ?, ?)"),
+                ("test-station", hour, float(hour.hour)),
+            )
+        rows = asyncio.run(repository.fetch_all(
+            "SELECT timestamp, air_temperature FROM weather_data WHERE station_id = ? AND timestamp >= ? LIMIT ?",
+            ("test-station", hours[1], 10),
+        ))
+        assert [row.air_temperature for row in rows] == [4.0, 3.0, 2.0, 1.0]
+    finally:
+        repository.session.execute("DELETE FROM weather_data WHERE station_id = 'test-station'")
+        repository.shutdown()
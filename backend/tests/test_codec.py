@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from backend.utils.codec import decode_rows, encode_rows
+
+COLUMNS = ['air_temperature', 'relative_humidity', 'pressure']
+
+
+def make_frame(rows=96):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, len(COLUMNS))), columns=COLUMNS)
+    df.insert(0, 'timestamp', pd.date_range('2025-03-30 00:00:00.123456789', periods=rows, freq='h'))
+    return df
+
+
+def test_rows_round_trip_one_record_per_hour():
+    df = make_frame(rows=5)
+    records = encode_rows(df, COLUMNS)
+
+    assert len(records) == 5
+    assert all(len(record) == 8 + 4 * len(COLUMNS) for record in records)
+    decoded = decode_rows(records[2:], COLUMNS)
+    pd.testing.assert_series_equal(decoded['timestamp'], df['timestamp'].iloc[2:].reset_index(drop=True))
+    np.testing.assert_array_equal(decoded[COLUMNS].to_numpy(), df[COLUMNS].iloc[2:].to_numpy(dtype=np.float32))
+
+
+def test_records_are_smaller_than_json():
+    df = make_frame()
+    assert sum(len(record) for record in encode_rows(df, COLUMNS)) < len(df.to_json()) / 3
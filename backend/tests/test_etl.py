@@ -0,0 +1,229 @@
+import gzip
+import io
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+from db.cassandra.repository import BulkWriteResult
+from model.data import FEATURES, load_observations, write_partitions
+from model.etl.etl import WeatherETLPipeline
+
+STATIONS = [
+    # id, name, latitude, longitude
+    ("12772", "Miskolc", 48.1, 20.77),
+    ("12812", "Szombathely", 47.27, 16.63),
+    ("12925", "Agard", 47.18, 18.6),
+]
+
+
+def gzip_csv(df, header=True):
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as f:
+        f.write(df.to_csv(index=False, header=header).encode())
+    return buffer.getvalue()
+
+
+def station_list():
+    return gzip_csv(pd.DataFrame([
+        [station_id, name, "HU", "", station_id, "", lat, lon, 100.0, "Europe/Budapest",
+         "2000-01-01", "2030-01-01", "2000-01-01", "2030-01-01", "2000-01-01", "2030-01-01"]
+        for station_id, name, lat, lon in STATIONS
+    ]), header=False)
+
+
+def hourly_year(station_id, year):
+    hours = pd.date_range(f"{year}-01-01", periods=48, freq="h")
+    values = {
+        "temp": float(station_id[-2:]), "rhum": 80.0, "prcp": 0.0, "snwd": None,
+        "wdir": 180.0, "wspd": 10.0, "wpgt": None, "pres": 1015.0, "tsun": None, "coco": 1,
+    }
+    return gzip_csv(pd.DataFrame({
+        "year": hours.year, "month": hours.month, "day": hours.day, "hour": hours.hour,
+        **values,
+        **{f"{column}_source": "synop" for column in values},
+    }))
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serves the Meteostat bulk layout and a flat grey GIBS tile, each after `delay` seconds."""
+
+    delay = 0.2
+    requests = []
+
+    def do_GET(self):
+        StandIn.requests.append(self.path)
+        time.sleep(self.delay)
+        parts = self.path.strip("/").split("/")
+        if self.path.startswith("/meteostat/stations/"):
+            body = station_list()
+        elif parts[:2] == ["meteostat", "hourly"]:
+            body = hourly_year(parts[3].split(".")[0], int(parts[2]))
+        elif self.path.startswith("/gibs"):
+            image = io.BytesIO()
+            Image.new("L", (8, 8), 120).save(image, format="PNG")
+            body = image.getvalue()
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    StandIn.requests = []
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def make_pipeline(tmp_path, base_url, workers, end_date=datetime(2025, 1, 1, 23), full_refresh=False):
+    tmp_path.mkdir(exist_ok=True)
+    stations_csv = tmp_path / "stations.csv"
+    pd.DataFrame(STATIONS, columns=["id", "name", "latitude", "longitude"]).to_csv(stations_csv, index=False)
+    return WeatherETLPipeline(
+        stations_csv=str(stations_csv),
+        output_dir=str(tmp_path / "out"),
+        start_date=datetime(2025, 1, 1),
+        end_date=end_date,
+        workers=workers,
+        meteostat_endpoint=f"{base_url}/meteostat/",
+        gibs_url=f"{base_url}/gibs",
+        full_refresh=full_refresh,
+    )
+
+
+def test_parallel_run_matches_serial_run(tmp_path, stand_in, capsys):
+    started = time.perf_counter()
+    make_pipeline(tmp_path / "serial", stand_in, workers=1).run()
+    serial_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    make_pipeline(tmp_path / "parallel", stand_in, workers=3).run()
+    parallel_time = time.perf_counter() - started
+
+    serial = load_observations(root=str(tmp_path / "serial" / "out" / "weather"))
+    parallel = load_observations(root=str(tmp_path / "parallel" / "out" / "weather"))
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert list(parallel["station_id"].drop_duplicates()) == ["12772", "12812", "12925"]
+    assert len(parallel) == 3 * 24
+    assert (tmp_path / "parallel" / "out" / "agard_data.parquet").exists()
+
+    # Every station did a station-list, hourly and GIBS round trip; in parallel they overlap
+    assert sum(path.startswith("/gibs") for path in StandIn.requests) == 6
+    assert parallel_time < serial_time
+
+    summary = capsys.readouterr().out
+    assert "3 stations in" in summary and "3 workers" in summary
+
+
+def recording_load(loaded, failed=False):
+    """Stands in for load_to_cassandra; a `failed` load reports every row as failed."""
+    def load(df):
+        loaded.append(df)
+        return BulkWriteResult(rows=len(df), batches=1, failed_rows=len(df) if failed else 0, seconds=0.1)
+    return load
+
+
+def test_incremental_run_appends_only_new_hours(tmp_path, stand_in, monkeypatch):
+    monkeypatch.setattr(StandIn, "delay", 0)
+    loaded = []
+
+    def run(end_date, full_refresh=False):
+        pipeline = make_pipeline(tmp_path, stand_in, workers=3, end_date=end_date, full_refresh=full_refresh)
+        pipeline.load_to_cassandra = recording_load(loaded)
+        pipeline.run(load_to_cassandra=True)
+        return load_observations(root=str(tmp_path / "out" / "weather"))
+
+    assert len(run(datetime(2025, 1, 1, 11))) == 3 * 12
+    merged = run(datetime(2025, 1, 1, 23))
+    assert len(loaded[-1]) == 3 * 12
+    assert loaded[-1]["timestamp"].min() == pd.Timestamp("2025-01-01 12:00")
+
+    assert len(merged) == 3 * 24
+    assert not merged.duplicated(["station_id", "timestamp"]).any()
+    assert list(merged["station_id"].drop_duplicates()) == ["12772", "12812", "12925"]
+    assert merged.groupby("station_id")["timestamp"].is_monotonic_increasing.all()
+    assert len(pd.read_parquet(tmp_path / "out" / "agard_data.parquet")) == 24
+    watermarks = json.loads((tmp_path / "out" / "watermarks.json").read_text())
+    assert watermarks == {station_id: "2025-01-01T23:00:00" for station_id, *_ in STATIONS}
+
+    # Nothing new: nothing written to Cassandra
+    run(datetime(2025, 1, 1, 23))
+    assert len(loaded) == 2
+
+    # A full refresh reloads everything
+    assert len(run(datetime(2025, 1, 1, 23), full_refresh=True)) == 3 * 24
+    assert len(loaded[-1]) == 3 * 24
+
+
+def test_failed_cassandra_load_is_retried_on_the_next_run(tmp_path, stand_in, monkeypatch):
+    monkeypatch.setattr(StandIn, "delay", 0)
+    loaded = []
+
+    def run(end_date, load):
+        pipeline = make_pipeline(tmp_path, stand_in, workers=3, end_date=end_date)
+        pipeline.load_to_cassandra = load
+        pipeline.run(load_to_cassandra=True)
+
+    run(datetime(2025, 1, 1, 11), recording_load(loaded))
+    cassandra_watermarks = tmp_path / "out" / "cassandra_watermarks.json"
+    assert json.loads(cassandra_watermarks.read_text()) == {
+        station_id: "2025-01-01T11:00:00" for station_id, *_ in STATIONS
+    }
+
+    # The parquet watermarks move on, the Cassandra ones stay put
+    run(datetime(2025, 1, 1, 17), recording_load(loaded, failed=True))
+    assert len(loaded[-1]) == 3 * 6
+    assert json.loads(cassandra_watermarks.read_text())["12772"] == "2025-01-01T11:00:00"
+    assert json.loads((tmp_path / "out" / "watermarks.json").read_text())["12772"] == "2025-01-01T17:00:00"
+
+    def crash(df):
+        raise RuntimeError("cluster unavailable")
+
+    with pytest.raises(RuntimeError):
+        run(datetime(2025, 1, 1, 20), crash)
+    assert json.loads(cassandra_watermarks.read_text())["12772"] == "2025-01-01T11:00:00"
+
+    # Hours 12-17 and 18-20 are sent again along with the new ones
+    run(datetime(2025, 1, 1, 23), recording_load(loaded))
+    assert len(loaded[-1]) == 3 * 12
+    assert loaded[-1]["timestamp"].min() == pd.Timestamp("2025-01-01 12:00")
+    assert json.loads(cassandra_watermarks.read_text()) == {
+        station_id: "2025-01-01T23:00:00" for station_id, *_ in STATIONS
+    }
+
+
+def test_reader_pushes_down_station_and_time_range(tmp_path):
+    hours = pd.date_range("2025-01-30", "2025-03-02", freq="h")
+    df = pd.concat([
+        pd.DataFrame({"station_id": station_id, "timestamp": hours, **{f: 1.0 for f in FEATURES}, "condition_group": "Clear"})
+        for station_id in (12772, 12925)
+    ])
+    write_partitions(df, str(tmp_path))
+    assert sorted(p.name for p in (tmp_path / "station_id=12925" / "year=2025").iterdir()) == ["month=1", "month=2", "month=3"]
+
+    sliced = load_observations(
+        ["12925"], start=datetime(2025, 2, 10), end=datetime(2025, 2, 11, 23),
+        columns=["air_temperature", "condition_group"], root=str(tmp_path),
+    )
+    assert list(sliced.columns) == ["station_id", "timestamp", "air_temperature", "condition_group"]
+    assert len(sliced) == 48 and set(sliced["station_id"]) == {"12925"}
+
+    # Rewriting a month replaces it without touching the others
+    write_partitions(df[(df["station_id"] == 12925) & (df["timestamp"].dt.month == 3)].iloc[:1], str(tmp_path))
+    assert len(load_observations(["12925"], start=datetime(2025, 3, 1), root=str(tmp_path))) == 1
+    assert len(load_observations(["12925"], root=str(tmp_path))) == len(hours) - 24
@@ -0,0 +1,39 @@
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+from backend.services.history import HistoryWindow
+
+
+def test_window_matches_naive_rolling():
+    rng = np.random.default_rng(0)
+    initial = rng.normal(size=(2, 24, 13)).astype(np.float32)
+    window = HistoryWindow.from_array(initial)
+    expected = initial.copy()
+
+    for _ in range(30):
+        row = rng.normal(size=(2, 13)).astype(np.float32)
+        window.append(row)
+        expected = np.concatenate([expected[:, 1:], row[:, np.newaxis]], axis=1)
+    block = rng.normal(size=(2, 10, 13)).astype(np.float32)
+    window.extend(block)
+    expected = np.concatenate([expected[:, 10:], block], axis=1)
+
+    np.testing.assert_array_equal(window.view(), expected)
+    np.testing.assert_array_equal(window.last(), expected[:, -1])
+
+
+def test_single_station_view_is_contiguous():
+    window = HistoryWindow.from_array(np.zeros((96, 13)))
+    for _ in range(50):
+        window.append(np.ones((1, 13)))
+        assert window.view().flags['C_CONTIGUOUS']
+        assert np.shares_memory(window.view(), window._buffer)
+
+
+def test_scaled_matches_scaler_transform():
+    rng = np.random.default_rng(1)
+    history = rng.normal(size=(96, 13))
+    scaler = MinMaxScaler().fit(rng.normal(size=(500, 13)))
+    window = HistoryWindow.from_array(history)
+
+    np.testing.assert_allclose(window.scaled(scaler)[0], scaler.transform(history), rtol=1e-5, atol=1e-6)
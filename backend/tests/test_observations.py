@@ -0,0 +1,152 @@
+import asyncio
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services import BlockingExecutor
+from backend.services import observations
+from backend.services.observations import FEATURES, CassandraSource, ObservationStore
+from backend.services.station import StationLookup
+
+
+class FakeHourly:
+    """Stand-in for meteostat.Hourly returning one raw row per whole hour in [start, end]."""
+
+    calls = []
+
+    def __init__(self, point, start, end):
+        FakeHourly.calls.append((start, end))
+        self.times = pd.date_range(pd.Timestamp(start).ceil('h'), end, freq='h', name='time')
+
+    def fetch(self):
+        n = len(self.times)
+        return pd.DataFrame({
+            'temp': np.linspace(0, 1, n), 'dwpt': 0.0, 'rhum': 80.0, 'prcp': 0.0,
+            'snow': np.nan, 'wdir': 90.0, 'wspd': 5.0, 'wpgt': np.nan,
+            'pres': 1015.0, 'tsun': np.nan, 'coco': 3.0,
+        }, index=self.times)
+
+
+@pytest.fixture
+def store(fake_redis, monkeypatch):
+    FakeHourly.calls = []
+    monkeypatch.setattr(observations, "Hourly", FakeHourly)
+    return ObservationStore(fake_redis, BlockingExecutor(), retention_hours=48, refresh_interval=timedelta(minutes=10))
+
+
+def test_refresh_only_fetches_hours_after_the_newest_stored(store, fake_redis):
+    station = StationLookup.get_station("12756")
+
+    first = asyncio.run(store.recent(station, 24))
+    assert list(first.columns) == ['timestamp'] + FEATURES
+    assert len(FakeHourly.calls) == 1
+
+    # Still fresh: served straight from Redis
+    asyncio.run(store.recent(station, 24))
+    assert len(FakeHourly.calls) == 1
+
+    # Pretend the last three hours were published after our last check
+    newest = asyncio.run(store.latest_hour(station.id))
+    cutoff = int(newest.timestamp() // 3600) - 2
+    asyncio.run(fake_redis.zremrangebyscore(store._key(station.id), cutoff, "+inf"))
+    latest = asyncio.run(store.latest_hour(station.id))
+    del fake_redis.store[store._checked_key(station.id)]
+
+    asyncio.run(store.recent(station, 24))
+    assert len(FakeHourly.calls) == 2
+    assert FakeHourly.calls[1][0] == latest + timedelta(hours=1)
+    assert asyncio.run(store.latest_hour(station.id)) == newest
+
+
+def test_append_replaces_overlapping_hours_and_trims_retention(store):
+    station_id = "12756"
+    ts = pd.date_range('2025-01-01', periods=60, freq='h')
+    df = pd.DataFrame({'timestamp': ts, **{feature: 1.0 for feature in FEATURES}})
+
+    asyncio.run(store.append(station_id, df.iloc[:40]))
+    revised = df.iloc[30:].assign(air_temperature=2.0)
+    asyncio.run(store.append(station_id, revised))
+
+    window = asyncio.run(store.window(station_id, 100))
+    assert len(window) == 48
+    assert window['timestamp'].iloc[0] == ts[12]
+    assert window['timestamp'].is_unique
+    assert (window.set_index('timestamp').loc[ts[30]:, 'air_temperature'] == 2.0).all()
+
+
+def test_recent_raises_when_history_is_too_short(store, fake_redis):
+    station = StationLookup.get_station("12756")
+    fake_redis.store[store._checked_key(station.id)] = b"1"
+    with pytest.raises(ValueError):
+        asyncio.run(store.recent(station, 24))
+
+
+Row = namedtuple('Row', CassandraSource._columns)
+
+
+class FakeRepository:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def fetch_all(self, query, params):
+        self.queries.append(params)
+        return list(self.rows)
+
+
+class RecordingSource:
+    def __init__(self):
+        self.calls = []
+
+    async def fetch(self, station, start, end):
+        self.calls.append((start, end))
+        ts = pd.date_range(start, end, freq='h')
+        return pd.DataFrame({'timestamp': ts, **{feature: -1.0 for feature in FEATURES}})
+
+
+def test_cassandra_source_reads_newest_rows_and_fills_gaps_upstream():
+    station = StationLookup.get_station("12756")
+    start, end = datetime(2025, 1, 1, 0), datetime(2025, 1, 4, 23, 30)
+    hours = pd.date_range(start, periods=96, freq='h')
+    missing = {hours[10], hours[11]}
+    rows = [
+        Row(ts.to_pydatetime(), 1.0, 0.5, 80.0, 0.0, 3.0, None, 1015.0)
+        for ts in hours[::-1] if ts not in missing  # clustering order is newest first
+    ]
+    repository = FakeRepository(rows)
+    fallback = RecordingSource()
+
+    df = asyncio.run(CassandraSource(repository, fallback=fallback, limit=96).fetch(station, start, end))
+
+    assert repository.queries == [("12756", start, end, 96)]
+    assert fallback.calls == [(hours[10].to_pydatetime(), hours[11].to_pydatetime())]
+    assert list(df.columns) == ['timestamp'] + FEATURES
+    assert df['timestamp'].tolist() == list(hours)
+    assert (df.loc[df['timestamp'].isin(missing), 'air_temperature'] == -1.0).all()
+    assert df['wdir_cos'].drop(index=[10, 11]).eq(1.0).all()  # missing wind direction reads as 0°
+
+
+def test_window_never_sees_a_half_replaced_series(store, fake_redis):
+    station_id = "12756"
+    hours = pd.date_range("2025-01-01", periods=48, freq="h")
+    df = pd.DataFrame({"timestamp": hours, **{feature: 1.0 for feature in FEATURES}})
+    asyncio.run(store.append(station_id, df))
+
+    async def interleave():
+        # Upstream revises the last 12 hours while forecasts read the window
+        revised = df.iloc[-12:].assign(air_temperature=2.0)
+        windows = []
+
+        async def read():
+            for _ in range(10):
+                windows.append(await store.window(station_id, 48))
+
+        await asyncio.gather(store.append(station_id, revised), read(), read())
+        return windows
+
+    for window in asyncio.run(interleave()):
+        assert len(window) == 48
+        assert set(window["air_temperature"].iloc[-12:]) in ({1.0}, {2.0})
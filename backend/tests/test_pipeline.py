@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+from model.data import FEATURES, load_observations, write_partitions
+from model.pipeline import WindowThroughput, fit_scaler, series_dataset, station_ids, window_dataset
+from model.sequences import WindowBatches, WindowedSeries
+
+
+def write_stations(root):
+    rng = np.random.default_rng(0)
+    frames = []
+    for station_id, hours in (("12772", 60), ("12812", 45), ("12925", 50)):
+        timestamps = pd.date_range("2025-01-31", periods=hours, freq="h")
+        frames.append(pd.DataFrame({
+            "station_id": station_id, "timestamp": timestamps,
+            **{feature: rng.normal(size=hours) for feature in FEATURES},
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    write_partitions(df, str(root))
+    return df
+
+
+def test_streamed_windows_match_the_in_memory_split(tmp_path):
+    df = write_stations(tmp_path)
+    assert station_ids(str(tmp_path)) == ["12772", "12812", "12925"]
+
+    scaler = fit_scaler(FEATURES, root=str(tmp_path))
+    np.testing.assert_allclose(scaler.data_min_, df[FEATURES].min().to_numpy())
+
+    expected = {}
+    loaded = load_observations(root=str(tmp_path))
+    for station_id, station in loaded.groupby("station_id"):
+        series = WindowedSeries(
+            scaler.transform(station[FEATURES]), station["air_temperature"].to_numpy(np.float32),
+            station["station_id"].to_numpy(), window=8, horizon=3, timestamps=station["timestamp"].to_numpy(),
+        )
+        expected[station_id] = series.split(0.2)
+
+    kwargs = dict(window=8, horizon=3, scaler=scaler, root=str(tmp_path), batch_size=16, chunk_size=5)
+    test = list(window_dataset(FEATURES, "air_temperature", split="test", target_shape=(3, 1), **kwargs))
+    assert test[0][0].shape[1:] == (8, len(FEATURES)) and test[0][1].shape[1:] == (3, 1)
+    assert sum(len(X) for X, _ in test) == sum(len(t) for _, t in expected.values())
+
+    train = window_dataset(FEATURES, "air_temperature", split="train", **kwargs)
+    assert sum(len(X) for X, _ in train) == sum(len(t) for t, _ in expected.values())
+
+
+def test_streams_per_step_targets_from_several_columns(tmp_path):
+    write_stations(tmp_path)
+    dataset = window_dataset(
+        FEATURES, ["air_temperature", "dew_point"], window=8, root=str(tmp_path), batch_size=16, split="test",
+        target_transform=lambda y: y.to_numpy(), target_width=2, step_targets=True,
+        map_batch=lambda X, y: (X, y[..., 1]),
+    )
+    X, y = next(iter(dataset))
+    assert X.shape[1:] == (8, len(FEATURES)) and y.shape[1:] == (8,)
+    # The target after every row is the next row's dew point
+    np.testing.assert_allclose(y[:, :-1], X[:, 1:, FEATURES.index("dew_point")], atol=1e-6)
+
+
+def test_series_batches_match_the_windows_they_are_cut_from():
+    X = np.random.default_rng(0).random((40, 3), dtype=np.float32)
+    series = WindowedSeries(X, X[:, 0], np.zeros(40), window=5, horizon=2)
+
+    batches = list(series_dataset(series, series.starts, batch_size=8, target_shape=(2, 1)))
+    assert [len(X_batch) for X_batch, _ in batches] == [8, 8, 8, 8, 2]
+    X_all = np.concatenate([X_batch for X_batch, _ in batches])
+    y_all = np.concatenate([y_batch for _, y_batch in batches])
+    np.testing.assert_array_equal(X_all, series.windows[series.starts])
+    np.testing.assert_array_equal(y_all[..., 0], series.targets(series.starts))
+
+    shuffled = series_dataset(series, series.starts, batch_size=8, shuffle=True, step_targets=True)
+    X_batch, y_batch = next(iter(shuffled))
+    assert y_batch.shape == (8, 5)
+    np.testing.assert_array_equal(y_batch[:, :-1], X_batch[:, 1:, 0])
+
+
+def test_throughput_is_logged_per_epoch(tmp_path):
+    write_stations(tmp_path)
+    df = load_observations(root=str(tmp_path))
+    series = WindowedSeries(
+        df[FEATURES].to_numpy(), df["air_temperature"].to_numpy(np.float32), df["station_id"].to_numpy(), window=8,
+    )
+    batches = WindowBatches(series, series.starts, batch_size=16, target_shape=(1,))
+
+    model = tf.keras.Sequential([tf.keras.Input((8, len(FEATURES))), tf.keras.layers.LSTM(4), tf.keras.layers.Dense(1)])
+    model.compile(optimizer="adam", loss="mse")
+    throughput = WindowThroughput(batch_size=16)
+    history = model.fit(batches, epochs=2, callbacks=[throughput], verbose=0)
+
+    assert len(throughput.history) == 2 and all(rate > 0 for rate in throughput.history)
+    assert history.history["windows_per_second"] == throughput.history
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.schemas.forecast import ForcastOutputBase
+from backend.services.precompute import ForecastPrecomputer
+
+
+class FakePredictor:
+    def __init__(self, missing=(), short=()):
+        self.missing = set(missing)
+        self.short = set(short)
+        self.batches = []
+
+    async def predict_batch(self, station_ids, predict_hours=72):
+        self.batches.append(list(station_ids))
+        if self.missing & set(station_ids):
+            raise ValueError("❌ Not enough data fetched")
+        return {
+            station_id: [ForcastOutputBase(temperature="1.0", condition="Clear", timestamp="2025-01-05T01:00:00", type="hourly")]
+            for station_id in station_ids
+            if station_id not in self.short
+        }
+
+
+def make_precomputer(redis, predictor, stored):
+    async def store(station_id, predict_hours, predictions):
+        stored[station_id] = predictions
+
+    return ForecastPrecomputer(redis, predictor, ["12756", "12840", "12882"], store, predict_hours=72)
+
+
+def test_refresh_caches_every_station_once_per_cycle(fake_redis):
+    stored = {}
+    predictor = FakePredictor()
+    first = make_precomputer(fake_redis, predictor, stored)
+    second = make_precomputer(fake_redis, predictor, stored)
+
+    assert asyncio.run(first.refresh()) is True
+    assert asyncio.run(second.refresh()) is False  # another worker already owns this cycle
+
+    assert predictor.batches == [["12756", "12840", "12882"]]
+    assert list(stored) == ["12756", "12840", "12882"]
+    stats = first.stats()
+    assert stats["runs"] == 1 and stats["failures"] == 0
+    assert stats["last_duration_seconds"] is not None
+    assert first.observation_hours["12756"] == datetime(2025, 1, 5)
+    assert second.stats()["skipped"] == 1
+
+
+def test_refresh_isolates_stations_that_fail(fake_redis, capsys):
+    stored = {}
+    predictor = FakePredictor(missing={"12840"})
+    precomputer = make_precomputer(fake_redis, predictor, stored)
+
+    asyncio.run(precomputer.refresh())
+
+    assert list(stored) == ["12756", "12882"]
+    assert precomputer.failures == 1
+    # The failed batch is reported, not swallowed
+    assert precomputer.stats()["batch_failures"] == 1
+    assert "batch failed, retrying station by station: ❌ Not enough data fetched" in capsys.readouterr().out
+
+
+def test_next_refresh_is_offset_past_the_hour(fake_redis):
+    precomputer = ForecastPrecomputer(
+        fake_redis, FakePredictor(), [], None,
+        interval=timedelta(hours=1), offset=timedelta(minutes=10),
+    )
+    assert precomputer.seconds_until_boundary(datetime(2025, 1, 1, 12, 5)) == 5 * 60
+    assert precomputer.seconds_until_boundary(datetime(2025, 1, 1, 12, 30)) == 40 * 60
+
+
+def test_stations_left_out_of_the_batch_count_as_failures(fake_redis):
+    stored = {}
+    predictor = FakePredictor(short={"12840"})
+    precomputer = make_precomputer(fake_redis, predictor, stored)
+
+    asyncio.run(precomputer.refresh())
+
+    assert predictor.batches == [["12756", "12840", "12882"]]
+    assert list(stored) == ["12756", "12882"]
+    assert precomputer.failures == 1
+    assert precomputer.stats()["batch_failures"] == 0
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from backend.services import AsyncWeatherPredictorV1, BlockingExecutor
+from backend.services.scheduler import InferenceScheduler
+from model.data import FEATURES
+from model.train import build_stepwise
+
+CLASSES = ["Clear", "Cloudy", "Fog", "Rainy", "Snowy", "Thunderstorm"]
+
+
+class FakeModel:
+    """Counts full-window passes of the current v1 models."""
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.calls = 0
+        self.inputs = []
+
+    def predict(self, X, verbose=0):
+        self.calls += 1
+        self.inputs.append(X)
+        return np.tile(np.asarray(self.outputs, dtype=np.float32), (len(X), 1))
+
+
+class FakeRegistry:
+    version = "test"
+
+    def __init__(self, artifacts):
+        self.artifacts = artifacts
+
+    def has(self, name):
+        return name in self.artifacts
+
+    def get(self, name):
+        return self.artifacts[name]
+
+    def scheduler(self, name):
+        return InferenceScheduler(self.artifacts[name])
+
+
+def make_rows(hours=24):
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(hours, len(FEATURES))).astype(np.float32)
+
+
+@pytest.fixture
+def training_model():
+    model, step_model = build_stepwise(len(FEATURES), len(CLASSES))
+    return model, step_model
+
+
+def make_registry(step_model=None):
+    training = pd.DataFrame(np.random.default_rng(1).normal(size=(200, len(FEATURES))), columns=FEATURES)
+    label_encoder = LabelEncoder().fit(CLASSES)
+    artifacts = {
+        'v1.scaler_x': MinMaxScaler().fit(training),
+        'v1.model_temp': FakeModel([5.0]),
+        'condition.model': FakeModel(np.eye(len(CLASSES))[1]),
+        'condition.label_encoder': label_encoder,
+    }
+    if step_model is not None:
+        artifacts.update({
+            'stepwise.scaler_x': MinMaxScaler().fit(training),
+            'stepwise.scaler_y': MinMaxScaler().fit(training[['air_temperature']]),
+            'stepwise.label_encoder': label_encoder,
+            'stepwise.model': step_model,
+        })
+    return FakeRegistry(artifacts)
+
+
+def test_stepwise_rollout_matches_recomputing_the_whole_sequence(training_model, fake_redis):
+    model, step_model = training_model
+    registry = make_registry(step_model)
+    predictor = AsyncWeatherPredictorV1(fake_redis, registry, BlockingExecutor())
+    assert predictor.stepwise
+
+    rows = make_rows()
+    predictions = asyncio.run(predictor.rollout(rows, predict_hours=12, base_timestamp=datetime(2025, 1, 1)))
+    assert len(predictions) == 12 and predictions[0].timestamp == "2025-01-01T00:00:00"
+    assert registry.get('v1.model_temp').calls == 0
+
+    # Reference: run the causal model over every row so far, once per forecast hour
+    scaler_x, scaler_y = registry.get('stepwise.scaler_x'), registry.get('stepwise.scaler_y')
+    temp_idx = FEATURES.index('air_temperature')
+    sequence = list(rows)
+    for prediction in predictions:
+        outputs = model.predict(scaler_x.transform(pd.DataFrame(sequence, columns=FEATURES))[np.newaxis], verbose=0)
+        temperature = scaler_y.inverse_transform(outputs['temperature'][:, -1])[0][0]
+        assert float(prediction.temperature) == pytest.approx(temperature, abs=0.011)
+        assert prediction.condition == CLASSES[np.argmax(outputs['condition'][0, -1])]
+        new_row = sequence[-1].copy()
+        new_row[temp_idx] = temperature
+        sequence.append(new_row)
+
+
+def test_full_window_loop_is_kept_without_a_stepwise_model(training_model, fake_redis):
+    registry = make_registry()
+    predictor = AsyncWeatherPredictorV1(fake_redis, registry, BlockingExecutor())
+    assert not predictor.stepwise
+
+    predictions = asyncio.run(predictor.rollout(make_rows(), predict_hours=6))
+    assert [p.temperature for p in predictions] == ["5.0"] * 6
+    assert {p.condition for p in predictions} == {"Cloudy"}
+    assert registry.get('v1.model_temp').calls == 6 and registry.get('condition.model').calls == 6
+
+    # The step-wise model can also be switched off explicitly
+    _, step_model = training_model
+    assert not AsyncWeatherPredictorV1(fake_redis, make_registry(step_model), BlockingExecutor(), stepwise=False).stepwise
+
+
+def test_condition_model_reads_input_scaled_with_its_own_scaler(fake_redis):
+    registry = make_registry()
+    rows = make_rows()
+    condition_scaler = MinMaxScaler().fit(pd.DataFrame(rows, columns=FEATURES))
+    registry.artifacts['condition.scaler_x'] = condition_scaler
+    predictor = AsyncWeatherPredictorV1(fake_redis, registry, BlockingExecutor())
+
+    asyncio.run(predictor.rollout(rows, predict_hours=1))
+    expected = condition_scaler.transform(pd.DataFrame(rows, columns=FEATURES))
+    np.testing.assert_allclose(registry.get('condition.model').inputs[0][0], expected, atol=1e-5)
+    assert not np.allclose(registry.get('v1.model_temp').inputs[0][0], expected, atol=1e-5)
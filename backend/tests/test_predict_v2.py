@@ -0,0 +1,259 @@
+import asyncio
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from backend.schemas.forecast import ForcastOutputBase
+from backend.services import AsyncWeatherPredictorV2, BlockingExecutor
+from backend.services.scheduler import InferenceScheduler
+from backend.services.observations import ObservationStore
+
+FEATURES = [
+    'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
+    'wind_speed', 'wind_direction', 'wdir_sin', 'wdir_cos',
+    'pressure', 'hour_sin', 'hour_cos', 'dayofyear_sin', 'dayofyear_cos'
+]
+
+
+class FakeSeq2Seq:
+    """Deterministic stand-in for a (N, 96, 13) -> (N, 24, 1) float32 seq2seq model."""
+
+    def __init__(self, column):
+        self.column = column
+        self.calls = 0
+
+    def predict(self, X, verbose=0):
+        self.calls += 1
+        last = X[:, -24:, self.column]
+        return (last * 0.9 + X[:, -1:, 0] * 0.1)[..., np.newaxis].astype(np.float32)
+
+
+class FakeMultiOutput:
+    """The three FakeSeq2Seq heads as one (N, 96, 13) -> (N, 24, 3) model."""
+
+    def __init__(self, columns):
+        self.heads = [FakeSeq2Seq(column) for column in columns]
+        self.calls = 0
+
+    def predict(self, X, verbose=0):
+        self.calls += 1
+        return np.concatenate([head.predict(X) for head in self.heads], axis=-1)
+
+
+class FakeClassifier:
+    """Deterministic stand-in for the (N, steps, 13) -> (N, classes) condition model."""
+
+    def __init__(self, n_classes):
+        self.n_classes = n_classes
+        self.calls = 0
+
+    def predict(self, X, verbose=0):
+        self.calls += 1
+        logits = np.stack([np.sin(X[:, -k:, :].sum(axis=(1, 2))) for k in range(1, self.n_classes + 1)], axis=1)
+        return (np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+class FakeRegistry:
+    version = "test"
+
+    def __init__(self, artifacts):
+        self.artifacts = artifacts
+
+    def has(self, name):
+        return name in self.artifacts
+
+    def get(self, name):
+        return self.artifacts[name]
+
+    def scheduler(self, name):
+        return InferenceScheduler(self.artifacts[name])
+
+
+def make_history(seed, hours=96):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range('2025-01-01', periods=hours, freq='h')
+    df = pd.DataFrame({
+        'timestamp': ts,
+        'air_temperature': rng.normal(5, 3, hours),
+        'dew_point': rng.normal(0, 2, hours),
+        'relative_humidity': rng.uniform(50, 95, hours),
+        'precipitation': rng.uniform(0, 1, hours),
+        'wind_speed': rng.uniform(0, 20, hours),
+        'wind_direction': rng.uniform(0, 360, hours),
+        'pressure': rng.normal(1015, 5, hours),
+    })
+    df['hour_sin'] = np.sin(2 * np.pi * ts.hour / 24)
+    df['hour_cos'] = np.cos(2 * np.pi * ts.hour / 24)
+    df['dayofyear_sin'] = np.sin(2 * np.pi * ts.dayofyear / 365)
+    df['dayofyear_cos'] = np.cos(2 * np.pi * ts.dayofyear / 365)
+    df['wdir_sin'] = np.sin(np.deg2rad(df['wind_direction']))
+    df['wdir_cos'] = np.cos(np.deg2rad(df['wind_direction']))
+    return df
+
+
+@pytest.fixture
+def registry():
+    training = pd.concat([make_history(seed) for seed in range(5)], ignore_index=True)
+    scaler_x = MinMaxScaler().fit(training[FEATURES])
+    label_encoder = LabelEncoder().fit(["Clear", "Cloudy", "Fog", "Rainy", "Snowy", "Thunderstorm"])
+    return FakeRegistry({
+        'temperature.scaler_x': scaler_x,
+        'temperature.scaler_y': MinMaxScaler().fit(training[['air_temperature']]),
+        'temperature.seq2seq': FakeSeq2Seq(column=0),
+        'relative_humidity.scaler_x': scaler_x,
+        'relative_humidity.scaler_y': MinMaxScaler().fit(training[['relative_humidity']]),
+        'relative_humidity.seq2seq': FakeSeq2Seq(column=2),
+        'condition.model': FakeClassifier(len(label_encoder.classes_)),
+        'condition.label_encoder': label_encoder,
+    })
+
+
+def seed_observations(redis, station_ids):
+    store = ObservationStore(redis, BlockingExecutor())
+    for seed, station_id in enumerate(station_ids):
+        asyncio.run(store.append(station_id, make_history(seed)[['timestamp'] + FEATURES]))
+        redis.store[store._checked_key(station_id)] = b"1"  # fresh, so nothing is fetched
+
+
+def reference_predict(registry, predictor, history_df, predict_hours=72, precipitation=None):
+    """
+    The original per-hour rollout, with one condition call per forecast hour.
+    `precipitation` is a (model, scaler_y) pair whose forecast is reported and
+    fed back into the history, as the multi-output model's is.
+    """
+    model_temp = registry.get('temperature.seq2seq')
+    model_rh = registry.get('relative_humidity.seq2seq')
+    model_cond = registry.get('condition.model')
+    base_timestamp = history_df['timestamp'].max() + timedelta(hours=1)
+    history_features = history_df[predictor.features]
+    predicted_results = []
+    total_predicted_hours = 0
+
+    while total_predicted_hours < predict_hours:
+        X_input_temp = np.expand_dims(predictor.scaler_X_temp.transform(history_features), axis=0)
+        X_input_rh = np.expand_dims(predictor.scaler_X_rh.transform(history_features), axis=0)
+        y_pred_temp = predictor.scaler_y_temp.inverse_transform(model_temp.predict(X_input_temp)[0]).flatten()
+        y_pred_rh = predictor.scaler_y_rh.inverse_transform(model_rh.predict(X_input_rh)[0]).flatten()
+        if precipitation is not None:
+            model_prcp, scaler_y_prcp = precipitation
+            y_pred_prcp = np.maximum(scaler_y_prcp.inverse_transform(model_prcp.predict(X_input_temp)[0]).flatten(), 0)
+        hours_to_add = min(predictor.future_block, predict_hours - total_predicted_hours)
+
+        X_input_cond = np.expand_dims(predictor.scaler_X_cond.transform(history_features), axis=0)
+        for i in range(hours_to_add):
+            cond_probs = model_cond.predict(X_input_cond)[0]
+            cond_pred = predictor.label_encoder.inverse_transform([np.argmax(cond_probs)])[0]
+            predicted_results.append(ForcastOutputBase(
+                temperature=f"{round(y_pred_temp[i], 2)}",
+                humidity=f"{round(y_pred_rh[i], 2)}",
+                precipitation=f"{round(y_pred_prcp[i], 2)}" if precipitation is not None else "0",
+                condition=cond_pred,
+                timestamp=(base_timestamp + timedelta(hours=total_predicted_hours + i)).replace(minute=0, second=0, microsecond=0).isoformat(),
+                type="hourly"
+            ))
+
+        for i, (temp, rh) in enumerate(zip(y_pred_temp[:hours_to_add], y_pred_rh[:hours_to_add])):
+            new_row = history_features.iloc[-1].copy()
+            new_row['air_temperature'] = temp
+            new_row['relative_humidity'] = rh
+            if precipitation is not None:
+                new_row['precipitation'] = y_pred_prcp[i]
+            history_features = pd.concat([history_features, pd.DataFrame([new_row])], ignore_index=True)
+            history_features = history_features.iloc[1:]
+
+        total_predicted_hours += hours_to_add
+
+    return predicted_results
+
+
+def test_predict_matches_per_hour_condition_rollout(registry, fake_redis):
+    redis = fake_redis
+    seed_observations(redis, ["12756"])
+    predictor = AsyncWeatherPredictorV2(redis, registry, BlockingExecutor())
+
+    predictions = asyncio.run(predictor.predict(station_id="12756", predict_hours=72))
+    assert registry.get('condition.model').calls == 8  # one per 10h block
+
+    expected = reference_predict(registry, predictor, make_history(0))
+    assert predictions == expected
+    assert {p.precipitation for p in predictions} == {"0"}  # only the multi-output model forecasts it
+
+
+def test_predict_batch_matches_single_station(registry, fake_redis):
+    station_ids = ["12756", "12840", "12882"]
+    redis = fake_redis
+    seed_observations(redis, station_ids)
+    predictor = AsyncWeatherPredictorV2(redis, registry, BlockingExecutor())
+
+    batch = asyncio.run(predictor.predict_batch(station_ids, predict_hours=72))
+    assert list(batch) == station_ids
+    assert registry.get('temperature.seq2seq').calls == 8
+
+    for seed, station_id in enumerate(station_ids):
+        assert batch[station_id] == reference_predict(registry, predictor, make_history(seed))
+
+
+def test_predict_batch_skips_stations_without_enough_history(registry, fake_redis):
+    redis = fake_redis
+    seed_observations(redis, ["12756", "12840"])
+    store = ObservationStore(redis, BlockingExecutor())
+    asyncio.run(store.append("12882", make_history(2, hours=50)[['timestamp'] + FEATURES]))
+    redis.store[store._checked_key("12882")] = b"1"
+    predictor = AsyncWeatherPredictorV2(redis, registry, BlockingExecutor())
+
+    batch = asyncio.run(predictor.predict_batch(["12756", "12882", "12840"], predict_hours=24))
+    assert list(batch) == ["12756", "12840"]
+    assert batch["12840"] == reference_predict(registry, predictor, make_history(1), predict_hours=24)
+
+    # Alone, the short station still fails
+    with pytest.raises(ValueError):
+        asyncio.run(predictor.predict_batch(["12882"], predict_hours=24))
+
+
+def test_multi_output_model_replaces_the_per_target_models(registry, fake_redis):
+    redis = fake_redis
+    seed_observations(redis, ["12756"])
+    training = pd.concat([make_history(seed) for seed in range(5)], ignore_index=True)
+    precipitation = (FakeSeq2Seq(column=3), MinMaxScaler().fit(training[['precipitation']]))
+    expected = reference_predict(
+        registry, AsyncWeatherPredictorV2(redis, registry, BlockingExecutor()), make_history(0), precipitation=precipitation,
+    )
+
+    registry.artifacts.update({
+        'multi_output.scaler_x': registry.get('temperature.scaler_x'),
+        'multi_output.scaler_y': MinMaxScaler().fit(training[['air_temperature', 'relative_humidity', 'precipitation']]),
+        'multi_output.seq2seq': FakeMultiOutput(columns=(0, 2, 3)),
+    })
+    predictor = AsyncWeatherPredictorV2(redis, registry, BlockingExecutor())
+    assert predictor.multi_output
+    separate_calls = registry.get('temperature.seq2seq').calls
+
+    predictions = asyncio.run(predictor.predict(station_id="12756", predict_hours=72))
+    assert predictions == expected
+    assert any(float(p.precipitation) > 0 for p in predictions)
+    assert registry.get('multi_output.seq2seq').calls == 8  # one pass per 10h block
+    assert registry.get('temperature.seq2seq').calls == separate_calls
+
+
+def test_shared_result_is_keyed_on_the_model_version(registry, fake_redis):
+    seed_observations(fake_redis, ["12756"])
+    predictor = AsyncWeatherPredictorV2(fake_redis, registry, BlockingExecutor())
+
+    asyncio.run(predictor.predict(station_id="12756", predict_hours=72))
+    results = [key for key in fake_redis.store if ":result:" in key]
+    assert results == ["forecast:result:v2:12756:72:test"]
+
+
+def test_condition_model_reads_input_scaled_with_its_own_scaler(registry, fake_redis):
+    seed_observations(fake_redis, ["12756"])
+    assert AsyncWeatherPredictorV2(fake_redis, registry, BlockingExecutor()).scaler_X_cond is registry.get('temperature.scaler_x')
+
+    registry.artifacts['condition.scaler_x'] = MinMaxScaler().fit(make_history(7)[FEATURES])
+    predictor = AsyncWeatherPredictorV2(fake_redis, registry, BlockingExecutor())
+    assert predictor.scaler_X_cond is registry.get('condition.scaler_x')
+
+    predictions = asyncio.run(predictor.predict(station_id="12756", predict_hours=72))
+    assert predictions == reference_predict(registry, predictor, make_history(0))
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from backend.services.executor import BlockingExecutor
+from backend.services.scheduler import InferenceScheduler
+
+
+class RecordingModel:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, X, verbose=0):
+        self.batches.append(len(X))
+        return X.sum(axis=(1, 2))
+
+
+def test_concurrent_requests_share_one_model_call():
+    model = RecordingModel()
+    scheduler = InferenceScheduler(model, max_batch_size=64, max_delay=timedelta(milliseconds=20))
+    inputs = [np.full((1, 4, 2), i, dtype=np.float32) for i in range(5)]
+
+    async def run():
+        results = await asyncio.gather(*(scheduler.predict(X) for X in inputs))
+        await scheduler.close()
+        return results
+
+    results = asyncio.run(run())
+    assert model.batches == [5]
+    assert [r.tolist() for r in results] == [[i * 8.0] for i in range(5)]
+    assert scheduler.stats()["batch_sizes"] == {5: 1}
+
+
+def test_batch_flushes_at_size_limit_and_splits_by_shape():
+    model = RecordingModel()
+    scheduler = InferenceScheduler(model, max_batch_size=4, max_delay=timedelta(milliseconds=200))
+    inputs = [np.ones((2, 4, 2))] * 2 + [np.ones((1, 6, 2))]
+
+    async def run():
+        results = await asyncio.gather(*(scheduler.predict(X) for X in inputs))
+        await scheduler.close()
+        return results
+
+    results = asyncio.run(run())
+    assert sorted(model.batches) == [1, 4]
+    assert [len(r) for r in results] == [2, 2, 1]
+
+
+class SlowModel:
+    def predict(self, X, verbose=0):
+        time.sleep(0.2)
+        return X.sum(axis=(1, 2))
+
+
+def test_executor_keeps_event_loop_responsive():
+    executor = BlockingExecutor(kind="thread", max_workers=1, max_concurrency=1)
+    scheduler = InferenceScheduler(SlowModel(), max_delay=timedelta(milliseconds=1), executor=executor)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def run():
+        task = asyncio.create_task(ticker())
+        result = await scheduler.predict(np.ones((1, 4, 2)))
+        task.cancel()
+        await scheduler.close()
+        return result
+
+    result = asyncio.run(run())
+    executor.shutdown()
+    assert result.tolist() == [8.0]
+    assert ticks >= 10
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from model.sequences import WindowBatches, WindowedSeries
+
+
+def make_series(window=4, horizon=1, drop_hour=None):
+    frames = []
+    for station_id, rows in (("12772", 10), ("12925", 7)):
+        hours = pd.date_range("2025-01-01", periods=rows, freq="h")
+        frames.append(pd.DataFrame({"station_id": station_id, "timestamp": hours}))
+    df = pd.concat(frames, ignore_index=True)
+    if drop_hour is not None:
+        df = df.drop(index=drop_hour).reset_index(drop=True)
+    X = np.arange(len(df) * 2, dtype=np.float64).reshape(-1, 2)
+    y = np.arange(len(df)) * 10
+    series = WindowedSeries(X, y, df["station_id"].to_numpy(), window, horizon, df["timestamp"].to_numpy())
+    return series, X, y, df
+
+
+def test_windows_are_views_that_stay_inside_a_station():
+    series, X, y, df = make_series()
+
+    assert np.shares_memory(series.windows, series.X)
+    # 10 - 4 and 7 - 4 windows; none straddles the two stations
+    assert list(series.starts) == [0, 1, 2, 3, 4, 5, 10, 11, 12]
+
+    windows, targets = series.take(series.starts)
+    expected = [(X[s:s + 4], y[s + 4]) for s in series.starts]
+    np.testing.assert_array_equal(windows, np.stack([w for w, _ in expected]))
+    np.testing.assert_array_equal(targets, [t for _, t in expected])
+
+
+def test_missing_hours_break_windows():
+    series, _, _, df = make_series(drop_hour=5)
+    for start in series.starts:
+        hours = df["timestamp"].iloc[start:start + series.window + 1]
+        assert (hours.diff().dropna() == pd.Timedelta(hours=1)).all()
+        assert df["station_id"].iloc[start:start + series.window + 1].nunique() == 1
+
+
+def test_multi_step_targets_and_boundary_safe_split():
+    series, _, y, _ = make_series(window=3, horizon=2)
+    np.testing.assert_array_equal(series.targets(np.array([0, 10])), [[y[3], y[4]], [y[13], y[14]]])
+
+    train, test = make_series(window=2)[0].split(test_size=0.3)
+    assert len(train) and len(test)
+    # Rows used by training windows (inputs + target) never appear in a test window
+    train_rows = {row for start in train for row in range(start, start + 3)}
+    test_rows = {row for start in test for row in range(start, start + 3)}
+    assert not train_rows & test_rows
+
+
+def test_batches_copy_one_batch_at_a_time():
+    series, _, _, _ = make_series(window=3, horizon=2)
+    batches = WindowBatches(series, series.starts, batch_size=4, shuffle=True, target_shape=(2, 1))
+    assert len(batches) == 3
+    X, y = batches[0]
+    assert X.shape == (4, 3, 2) and y.shape == (4, 2, 1)
+    assert sum(len(batches[i][0]) for i in range(len(batches))) == len(series)
+    # Batches are read ahead in background threads unless configured otherwise
+    assert (batches.workers, batches.use_multiprocessing, batches.max_queue_size) == (4, False, 10)
+    assert WindowBatches(series, series.starts, workers=1).workers == 1
+
+
+def test_step_targets_are_one_row_ahead_of_every_window_row():
+    series, X, y, df = make_series()
+
+    step_targets = series.step_targets(series.starts)
+    assert step_targets.shape == (len(series), 4)
+    for s, targets in zip(series.starts, step_targets):
+        np.testing.assert_array_equal(targets, y[s + 1:s + 5])
+    np.testing.assert_array_equal(step_targets[:, -1], series.targets(series.starts))
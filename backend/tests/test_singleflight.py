@@ -0,0 +1,83 @@
+import asyncio
+
+from backend.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution(fake_redis):
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("station", fake_redis, work) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["result"] * 10
+    assert calls == 1
+    assert not fake_redis.locks
+
+
+def test_followers_see_leader_exception(fake_redis):
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("station", fake_redis, work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert not fake_redis.locks
+
+
+def test_followers_outlive_a_cancelled_leader(fake_redis):
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("station", fake_redis, work))
+        await asyncio.sleep(0.005)
+        followers = [asyncio.create_task(flight.do("station", fake_redis, work)) for _ in range(3)]
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+    leader, *followers = asyncio.run(run())
+    assert isinstance(leader, asyncio.CancelledError)
+    assert followers == ["result"] * 3
+    assert calls == 1
+    assert not fake_redis.locks
+
+
+def test_other_worker_reuses_shared_result(fake_redis):
+    # Two SingleFlight instances stand in for two worker processes
+    worker_a = SingleFlight("test", encode=str.encode, decode=bytes.decode)
+    worker_b = SingleFlight("test", encode=str.encode, decode=bytes.decode)
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "forecast"
+
+    async def run():
+        first = asyncio.create_task(worker_a.do("station", fake_redis, work))
+        await asyncio.sleep(0.005)
+        second = await worker_b.do("station", fake_redis, work)
+        return await first, second
+
+    assert asyncio.run(run()) == ("forecast", "forecast")
+    assert calls == 1
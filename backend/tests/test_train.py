@@ -0,0 +1,124 @@
+import dataclasses
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from tensorflow import keras
+
+from model import train as training
+from model.data import FEATURES, load_observations, write_partitions
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    frames = []
+    for station_id, hours in (("12772", 80), ("12925", 70)):
+        frames.append(pd.DataFrame({
+            "station_id": station_id,
+            "timestamp": pd.date_range("2025-01-31", periods=hours, freq="h"),
+            **{feature: rng.normal(size=hours) for feature in FEATURES},
+            "condition_group": rng.choice(["Clear", "Cloudy", "Rain"], size=hours),
+        }))
+    write_partitions(pd.concat(frames, ignore_index=True), str(tmp_path / "weather"))
+
+    # Short windows keep the models quick to train
+    monkeypatch.setattr(training, "TARGETS", {
+        name: dataclasses.replace(spec, window=8, horizon=3 if spec.kind == "seq2seq" else 1)
+        for name, spec in training.TARGETS.items()
+    })
+    return str(tmp_path / "weather")
+
+
+def test_targets_share_one_scaled_matrix(dataset, tmp_path):
+    data = training.TrainingData.build(str(tmp_path), ["temperature", "condition"], root=dataset)
+    assert isinstance(data.X, np.memmap)
+    assert data.X.shape == (150, len(FEATURES)) and data.X.dtype == np.float32
+    assert data.X.min() == 0 and data.X.max() == 1
+
+    temperature, condition = data.series("temperature"), data.series("condition")
+    assert np.shares_memory(temperature.windows, data.X) and np.shares_memory(condition.windows, data.X)
+    assert set(data.targets["condition"]) == {0, 1, 2}
+
+
+def test_writes_the_layout_the_registry_loads(dataset, tmp_path):
+    paths = training.train(training.TARGETS, root=dataset, output_dir=str(tmp_path / "models"), epochs=1)
+
+    assert set(paths) == set(training.TARGETS)
+    models = tmp_path / "models"
+    assert (models / "temperature" / "seq2seq_temperature_forecast_optimized.keras").exists()
+    assert (models / "relative_humidity" / "scaler_y_relative_humidity.pkl").exists()
+    assert (models / "precipation" / "scaler_x_precipitation.pkl").exists()
+    assert (models / "condition" / "lstm_condition_classifier_latest.keras").exists()
+    assert (models / "condition" / "scaler_x_condition.pkl").exists()
+    assert (models / "scaler_X_latest.pkl").exists()
+    assert keras.models.load_model(paths["v1_temperature"]["model"]).output_shape == (None, 1)
+
+    forecast = keras.models.load_model(paths["precipitation"]["model"])
+    assert forecast.output_shape == (None, 3, 1)
+    multi_output = keras.models.load_model(paths["multi_output"]["model"])
+    assert multi_output.output_shape == (None, 3, 3)
+    scaler_y = joblib.load(paths["multi_output"]["scaler_y"])
+    assert list(scaler_y.feature_names_in_) == ["air_temperature", "relative_humidity", "precipitation"]
+    encoder = joblib.load(paths["condition"]["label_encoder"])
+    assert list(encoder.classes_) == ["Clear", "Cloudy", "Rain"]
+    assert list(joblib.load(paths["stepwise"]["label_encoder"]).classes_) == ["Clear", "Cloudy", "Rain"]
+    step_model = keras.models.load_model(paths["stepwise"]["model"])
+    assert len(step_model.inputs) == 5 and step_model.output_shape[0] == (None, 1)
+    scaler_x = joblib.load(paths["temperature"]["scaler_x"])
+    assert list(scaler_x.feature_names_in_) == FEATURES
+
+
+def test_streamed_training_writes_the_same_artifacts(dataset, tmp_path):
+    targets = ["temperature", "multi_output", "condition", "stepwise", "v1_temperature"]
+    paths = training.train(targets, root=dataset, output_dir=str(tmp_path / "models"), epochs=1, stream=True)
+
+    assert set(paths) == set(targets)
+    assert keras.models.load_model(paths["multi_output"]["model"]).output_shape == (None, 3, 3)
+    assert list(joblib.load(paths["condition"]["label_encoder"]).classes_) == ["Clear", "Cloudy", "Rain"]
+    built = training.TrainingData.build(str(tmp_path), ["temperature"], root=dataset)
+    streamed_scaler = joblib.load(paths["temperature"]["scaler_x"])
+    np.testing.assert_array_equal(streamed_scaler.data_max_, built.scaler_x.data_max_)
+
+
+def test_new_models_are_only_trained_on_request(monkeypatch):
+    trained = []
+    monkeypatch.setattr(training, "train", lambda targets, *args: trained.append(targets))
+
+    training.main([])
+    assert trained[0] == ["temperature", "relative_humidity", "precipitation", "condition"]
+    training.main(["--targets", "multi_output", "stepwise"])
+    assert trained[1] == ["multi_output", "stepwise"]
+
+
+def test_station_by_station_build_matches_scaling_everything_at_once(dataset, tmp_path):
+    targets = ["relative_humidity", "stepwise", "v1_temperature"]
+    data = training.TrainingData.build(str(tmp_path), targets, root=dataset)
+
+    df = load_observations(columns=FEATURES + ["condition_group"], root=dataset)
+    np.testing.assert_allclose(data.X, MinMaxScaler().fit_transform(df[FEATURES]), atol=1e-6)
+    np.testing.assert_allclose(data.targets["relative_humidity"], MinMaxScaler().fit_transform(df[["relative_humidity"]])[:, 0], atol=1e-6)
+    np.testing.assert_array_equal(data.targets["stepwise"][:, 1], LabelEncoder().fit_transform(df["condition_group"]))
+    np.testing.assert_array_equal(data.targets["v1_temperature"], df["air_temperature"].to_numpy(np.float32))
+    np.testing.assert_array_equal(data.timestamps, df["timestamp"].to_numpy())
+
+    # Worker processes open the same files
+    opened = training.TrainingData.open(str(tmp_path), targets)
+    np.testing.assert_array_equal(opened.series("relative_humidity").starts, data.series("relative_humidity").starts)
+
+
+def test_step_model_continues_the_full_sequence():
+    model, step_model = training.build_stepwise(len(FEATURES), n_classes=3)
+    X = np.random.default_rng(0).random((2, 10, len(FEATURES)), dtype=np.float32)
+    full = model.predict(X, verbose=0)
+
+    # Read 6 rows at once, then one row per call, carrying the LSTM state
+    states = [np.zeros((2, units), dtype=np.float32) for units in (128, 128, 64, 64)]
+    temperature, condition, *states = step_model.predict_on_batch([X[:, :6], *states])
+    for t in range(6, 10):
+        np.testing.assert_allclose(temperature, full["temperature"][:, t - 1], atol=1e-5)
+        np.testing.assert_allclose(condition, full["condition"][:, t - 1], atol=1e-5)
+        temperature, condition, *states = step_model.predict_on_batch([X[:, t:t + 1], *states])
+    np.testing.assert_allclose(temperature, full["temperature"][:, -1], atol=1e-5)
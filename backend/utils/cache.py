@@ -1,6 +1,24 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import struct
+import time
 import typing as t
-from datetime import timedelta
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from functools import wraps
 from redis.asyncio import BlockingConnectionPool, Redis
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import JsonCoder
+from fastapi_cache.types import Backend
+from backend.config import settings
+from backend.services.station import StationLookup
+from starlette.requests import Request
+from starlette.responses import Response
+
+FORECAST_NAMESPACE = "forecast"
 
 async def create_redis_connection(
     db_url: str,
@@ -16,4 +34,435 @@ async def create_redis_connection(
         connection_pool=pool,
     )
     yield db
-    await db.close()
\ No newline at end of file
+    await db.close()
+
+
+def forecast_data_hour(predictions: t.Any) -> t.Optional[datetime]:
+    """The observation hour a forecast was computed from: its first hour follows the newest observation."""
+    if not predictions:
+        return None
+    return datetime.fromisoformat(predictions[0].timestamp) - timedelta(hours=1)
+
+
+def _hour_tag(data_hour: t.Optional[datetime]) -> str:
+    return data_hour.strftime("%Y%m%dT%H") if data_hour is not None else "none"
+
+
+def forecast_key(station_id: str, predict_hours: int, model_version: str, data_hour: t.Optional[datetime]) -> str:
+    """
+    Response-cache key for one station's forecast, shared by requests and the
+    precomputer. It embeds the model bundle version and the newest observation
+    hour, so a new model or a new hour of data maps to a fresh entry instead of
+    waiting for the old one to expire.
+    """
+    return f"{FastAPICache.get_prefix()}:{FORECAST_NAMESPACE}:{station_id}:{predict_hours}:{model_version}:{_hour_tag(data_hour)}"
+
+
+def latest_forecast_key(station_id: str, predict_hours: int, model_version: str) -> str:
+    """Alias of the most recently written forecast, whatever observation hour it used."""
+    return f"{FastAPICache.get_prefix()}:{FORECAST_NAMESPACE}:{station_id}:{predict_hours}:{model_version}:latest"
+
+
+# Cached forecasts are prefixed with the time they were written so their age
+# can be told apart from the backend TTL, which also covers the stale window
+_WRITTEN_AT = struct.Struct("<d")
+
+
+async def write_forecast_entry(
+    station_id: str,
+    predict_hours: int,
+    model_version: str,
+    data_hour: t.Optional[datetime],
+    payload: bytes,
+    written_at: t.Optional[float] = None,
+) -> None:
+    entry = _WRITTEN_AT.pack(written_at or time.time()) + payload
+    ttl = settings.FORECAST_CACHE_EXPIRE + int(settings.FORECAST_CACHE_MAX_STALE.total_seconds())
+    backend = FastAPICache.get_backend()
+    await backend.set(forecast_key(station_id, predict_hours, model_version, data_hour), entry, ttl)
+    await backend.set(latest_forecast_key(station_id, predict_hours, model_version), entry, ttl)
+
+
+async def _read_forecast_entry(key: str) -> t.Optional[t.Tuple[float, bytes]]:
+    try:
+        entry = await FastAPICache.get_backend().get(key)
+    except Exception as exc:
+        print(f"⚠️ Could not read {key} from the response cache: {exc}")
+        return None
+    if entry is None or len(entry) < _WRITTEN_AT.size:
+        return None
+    (written_at,) = _WRITTEN_AT.unpack_from(entry)
+    return written_at, entry[_WRITTEN_AT.size:]
+
+
+def _forecast_response(payload: bytes, status: str, age: float, expire: int, max_stale: int) -> Response:
+    return Response(payload, media_type="application/json", headers={
+        FastAPICache.get_cache_status_header(): status,
+        "Age": str(int(age)),
+        "Cache-Control": f"max-age={max(0, int(expire - age))}, stale-while-revalidate={max_stale}",
+    })
+
+
+def _cache_directives(request: t.Optional[Request]) -> set[str]:
+    if request is None:
+        return set()
+    header = request.headers.get("Cache-Control", "")
+    return {directive.strip().lower() for directive in header.split(",") if directive.strip()}
+
+
+# FastAPI passes the request to the cache decorators through this extra keyword argument
+_REQUEST_PARAMETER = inspect.Parameter("_forecast_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+
+
+def _accepting_request(inner: t.Callable, func: t.Callable) -> t.Callable:
+    signature = inspect.signature(func)
+    inner.__signature__ = signature.replace(parameters=[*signature.parameters.values(), _REQUEST_PARAMETER])
+    return inner
+
+
+def forecast_cache(expire: int, max_stale: timedelta) -> t.Callable:
+    """
+    Stale-while-revalidate response cache for the single-station forecast.
+
+    Entries are keyed like `forecast_key`. A fresh entry (younger than
+    `expire`) is a HIT. An entry that is older, or was computed from an
+    older observation hour, is served as STALE with its `Age` as long as it
+    is no older than `expire + max_stale`, and one background refresh per key
+    recomputes it. Anything older is recomputed before responding (MISS).
+
+    Like `fastapi_cache.decorator.cache`, a request sending
+    `Cache-Control: no-cache` is recomputed and stored without reading the
+    cache, and one sending `no-store` bypasses the cache entirely.
+    """
+    stale_seconds = int(max_stale.total_seconds())
+
+    def wrapper(func: t.Callable[..., t.Awaitable[t.Any]]) -> t.Callable[..., t.Awaitable[Response]]:
+        refreshing: set[str] = set()
+        background: set[asyncio.Task] = set()
+
+        async def recompute(station_id: str, model_version: str, args, kwargs) -> bytes:
+            predictions = await func(*args, **kwargs)
+            payload = JsonCoder.encode(predictions)
+            # Stored under the hour the forecast was computed from; predicting
+            # may have fetched hours newer than the one the lookup used
+            await write_forecast_entry(station_id, settings.FORECAST_HOURS, model_version, forecast_data_hour(predictions), payload)
+            return payload
+
+        async def revalidate(key: str, *recompute_args) -> None:
+            try:
+                await recompute(*recompute_args)
+            except Exception as exc:
+                print(f"⚠️ Background refresh of {key} failed: {exc}")
+            finally:
+                refreshing.discard(key)
+
+        @wraps(func)
+        async def inner(*args, **kwargs) -> Response:
+            directives = _cache_directives(kwargs.pop(_REQUEST_PARAMETER.name, None))
+            if not FastAPICache.get_enable() or "no-store" in directives:
+                return await func(*args, **kwargs)
+
+            # Keyed on what the forecast depends on; the per-request predictor
+            # itself is never part of the key
+            station_id = kwargs["params"].station_id
+            predictor = kwargs["predictor"]
+            data_hour = await predictor.observations.latest_hour(station_id)
+            key = forecast_key(station_id, settings.FORECAST_HOURS, predictor.model_version, data_hour)
+
+            entry = None if "no-cache" in directives else await _read_forecast_entry(key)
+            superseded = False
+            if entry is None and "no-cache" not in directives:
+                entry = await _read_forecast_entry(latest_forecast_key(station_id, settings.FORECAST_HOURS, predictor.model_version))
+                superseded = entry is not None
+
+            if entry is not None:
+                written_at, payload = entry
+                age = max(0.0, time.time() - written_at)
+                if not superseded and age <= expire:
+                    return _forecast_response(payload, "HIT", age, expire, stale_seconds)
+                if age <= expire + stale_seconds:
+                    if key not in refreshing:
+                        refreshing.add(key)
+                        task = asyncio.create_task(revalidate(key, station_id, predictor.model_version, args, kwargs))
+                        background.add(task)
+                        task.add_done_callback(background.discard)
+                    return _forecast_response(payload, "STALE", age, expire, stale_seconds)
+
+            payload = await recompute(station_id, predictor.model_version, args, kwargs)
+            return _forecast_response(payload, "MISS", 0, expire, stale_seconds)
+
+        return _accepting_request(inner, func)
+
+    return wrapper
+
+
+def forecast_batch_key(model_version: str, data_hours: t.Dict[str, t.Optional[datetime]]) -> str:
+    """Response-cache key for a batch forecast: the model version and every station's observation hour."""
+    stations = ",".join(f"{station_id}@{_hour_tag(hour)}" for station_id, hour in sorted(data_hours.items()))
+    digest = hashlib.md5(stations.encode()).hexdigest()  # noqa: S324
+    return f"{FastAPICache.get_prefix()}:{FORECAST_NAMESPACE}:batch:{settings.FORECAST_HOURS}:{model_version}:{digest}"
+
+
+def forecast_batch_cache(expire: int) -> t.Callable:
+    """
+    Response cache for the batch forecast, with the HIT/MISS, Cache-Control,
+    ETag and request Cache-Control handling of `fastapi_cache.decorator.cache`.
+
+    It is looked up by every station's newest stored observation hour, but a
+    recomputed batch is stored under the hours its forecasts were computed
+    from, which are newer whenever predicting fetched new observations.
+    """
+
+    def wrapper(func: t.Callable[..., t.Awaitable[t.Any]]) -> t.Callable[..., t.Awaitable[Response]]:
+        @wraps(func)
+        async def inner(*args, **kwargs) -> Response:
+            request = kwargs.pop(_REQUEST_PARAMETER.name, None)
+            directives = _cache_directives(request)
+            if not FastAPICache.get_enable() or "no-store" in directives:
+                return await func(*args, **kwargs)
+
+            station_ids = sorted(set(kwargs["station_id"] or StationLookup.get_station_ids()))
+            predictor = kwargs["predictor"]
+            backend = FastAPICache.get_backend()
+            status_header = FastAPICache.get_cache_status_header()
+
+            if "no-cache" not in directives:
+                data_hours = await asyncio.gather(*(predictor.observations.latest_hour(station_id) for station_id in station_ids))
+                key = forecast_batch_key(predictor.model_version, dict(zip(station_ids, data_hours)))
+                try:
+                    ttl, payload = await backend.get_with_ttl(key)
+                except Exception as exc:
+                    print(f"⚠️ Could not read {key} from the response cache: {exc}")
+                    ttl, payload = 0, None
+                if payload is not None:
+                    etag = f"W/{hashlib.md5(payload).hexdigest()}"  # noqa: S324
+                    headers = {status_header: "HIT", "Cache-Control": f"max-age={ttl}", "ETag": etag}
+                    if request is not None and request.headers.get("If-None-Match") == etag:
+                        return Response(status_code=304, headers=headers)
+                    return Response(payload, media_type="application/json", headers=headers)
+
+            forecasts = await func(*args, **kwargs)
+            payload = JsonCoder.encode(forecasts)
+            data_hours = {station_id: forecast_data_hour(forecasts[station_id]) for station_id in forecasts}
+            # Stations left out for lack of history are keyed by their stored hour, as the lookup does
+            skipped = [station_id for station_id in station_ids if station_id not in forecasts]
+            data_hours.update(zip(skipped, await asyncio.gather(*(predictor.observations.latest_hour(station_id) for station_id in skipped))))
+            key = forecast_batch_key(predictor.model_version, data_hours)
+            try:
+                await backend.set(key, payload, expire)
+            except Exception as exc:
+                print(f"⚠️ Could not write {key} to the response cache: {exc}")
+            return Response(payload, media_type="application/json", headers={
+                status_header: "MISS",
+                "Cache-Control": f"max-age={expire}",
+                "ETag": f"W/{hashlib.md5(payload).hexdigest()}",  # noqa: S324
+            })
+
+        return _accepting_request(inner, func)
+
+    return wrapper
+
+
+async def store_forecast(station_id: str, predict_hours: int, predictions: t.Any, model_version: str) -> None:
+    """Write a forecast into the response cache exactly as `forecast_cache` would."""
+    payload = JsonCoder.encode(predictions)
+    await write_forecast_entry(station_id, predict_hours, model_version, forecast_data_hour(predictions), payload)
+
+
+# Response-cache outcomes per route, from the cache-status header
+cache_counters: t.Dict[str, Counter] = defaultdict(Counter)
+
+
+async def count_cache_status(request: Request, call_next: t.Callable[[Request], t.Awaitable[Response]]) -> Response:
+    response = await call_next(request)
+    status = response.headers.get(FastAPICache.get_cache_status_header())
+    if status is not None:
+        cache_counters[request.url.path][status.lower()] += 1
+    return response
+
+
+def cache_stats() -> dict:
+    stats = {}
+    for path, counts in cache_counters.items():
+        total = counts["hit"] + counts["stale"] + counts["miss"]
+        stats[path] = {
+            "hits": counts["hit"],
+            "stale": counts["stale"],
+            "misses": counts["miss"],
+            "hit_ratio": round((counts["hit"] + counts["stale"]) / total, 3) if total else 0,
+        }
+    return stats
+
+
+class ResponseCoder(JsonCoder):
+    """
+    Serves cache hits as the stored JSON bytes, skipping the decode and the
+    response-model validation FastAPI would otherwise run on every hit.
+    """
+
+    @classmethod
+    def decode_as_type(cls, value: bytes, *, type_: t.Any) -> Response:
+        # A returned Response bypasses the one `@cache` adds its headers to
+        return Response(value, media_type="application/json", headers={FastAPICache.get_cache_status_header(): "HIT"})
+
+
+class TieredBackend(Backend):
+    """
+    Per-worker in-memory LRU (L1) in front of a shared backend (L2, Redis).
+
+    L1 entries live for at most `ttl` (never beyond the L2 expiry) and the
+    least recently used ones are evicted once their total size passes
+    `max_bytes`. Every `set` and `clear` is published on `channel` so the
+    other workers drop their copy. If the subscription drops, the listener
+    resubscribes with exponential backoff and empties L1, since invalidations
+    sent in between were lost.
+    """
+
+    def __init__(
+        self,
+        l2: Backend,
+        redis: Redis,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: timedelta = timedelta(minutes=5),
+        channel: str = "forecast_cache:invalidate",
+        reconnect_delay: timedelta = timedelta(seconds=1),
+        max_reconnect_delay: timedelta = timedelta(seconds=30),
+    ):
+        self.l2 = l2
+        self.redis = redis
+        self.max_bytes = max_bytes
+        self.ttl = ttl.total_seconds()
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay.total_seconds()
+        self.max_reconnect_delay = max_reconnect_delay.total_seconds()
+        self.origin = f"{os.getpid()}-{id(self)}"
+        self._entries: OrderedDict[str, t.Tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._listener: t.Optional[asyncio.Task] = None
+        self.counters: Counter = Counter()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def _remember(self, key: str, value: bytes, expire: t.Optional[int]) -> None:
+        if len(value) > self.max_bytes:
+            return
+        ttl = min(self.ttl, expire) if expire and expire > 0 else self.ttl
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._bytes += len(value)
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.counters["evictions"] += 1
+
+    def _lookup(self, key: str) -> t.Tuple[int, t.Optional[bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0, None
+        expires_at, value = entry
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            self._drop(key)
+            return 0, None
+        self._entries.move_to_end(key)
+        return int(remaining), value
+
+    async def get_with_ttl(self, key: str) -> t.Tuple[int, t.Optional[bytes]]:
+        ttl, value = self._lookup(key)
+        if value is not None:
+            self.counters["l1_hits"] += 1
+            return ttl, value
+        self.counters["l1_misses"] += 1
+        ttl, value = await self.l2.get_with_ttl(key)
+        if value is not None:
+            self._remember(key, value, ttl)
+        return ttl, value
+
+    async def get(self, key: str) -> t.Optional[bytes]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: t.Optional[int] = None) -> None:
+        await self.l2.set(key, value, expire)
+        self._remember(key, value, expire)
+        await self._publish(key=key)
+
+    async def clear(self, namespace: t.Optional[str] = None, key: t.Optional[str] = None) -> int:
+        count = await self.l2.clear(namespace, key)
+        self._invalidate(namespace, key)
+        await self._publish(namespace=namespace, key=key)
+        return count
+
+    async def _publish(self, namespace: t.Optional[str] = None, key: t.Optional[str] = None) -> None:
+        message = {"origin": self.origin, "namespace": namespace, "key": key}
+        await self.redis.publish(self.channel, json.dumps(message))
+
+    def _invalidate(self, namespace: t.Optional[str] = None, key: t.Optional[str] = None) -> None:
+        if namespace:
+            for cached in [k for k in self._entries if k.startswith(namespace)]:
+                self._drop(cached)
+        elif key:
+            self._drop(key)
+
+    def start(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        # A dropped pub/sub connection would leave this worker serving entries
+        # the others have replaced, so keep resubscribing, backing off while
+        # Redis is unreachable
+        delay = self.reconnect_delay
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                if self.counters["reconnects"]:
+                    self._clear_local()  # invalidations sent while disconnected were missed
+                delay = self.reconnect_delay
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    self.handle_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"⚠️ Cache invalidation channel lost, resubscribing in {delay:.0f}s: {exc}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            self.counters["reconnects"] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _clear_local(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def handle_invalidation(self, data: t.Union[bytes, str]) -> None:
+        message = json.loads(data)
+        if message["origin"] == self.origin:
+            return  # our own write, already applied
+        self.counters["invalidations"] += 1
+        self._invalidate(message["namespace"], message["key"])
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            **{name: self.counters[name] for name in ("l1_hits", "l1_misses", "evictions", "invalidations", "reconnects")},
+        }
@@ -0,0 +1,35 @@
+"""
+Compact binary encoding for the hourly observation rows stored in Redis.
+
+Each row is its own headerless record: an int64 timestamp (ns since epoch)
+followed by the float32 values, little-endian. The column order is fixed by
+the caller, so the records carry no format information themselves;
+`ROW_VERSION` is part of the Redis key instead, and must be bumped whenever
+the layout or the stored column list changes so old records are never read
+with the new layout.
+"""
+
+import numpy as np
+import pandas as pd
+
+ROW_VERSION = 1
+
+
+def _row_dtype(n_cols: int) -> np.dtype:
+    return np.dtype([('timestamp', '<i8'), ('values', '<f4', (n_cols,))])
+
+
+def encode_rows(df: pd.DataFrame, columns: list[str]) -> list[bytes]:
+    """Encode each row of `df` as its own headerless record."""
+    rows = np.empty(len(df), dtype=_row_dtype(len(columns)))
+    rows['timestamp'] = df['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    rows['values'] = np.column_stack([df[column].to_numpy() for column in columns])
+    return [row.tobytes() for row in rows]
+
+
+def decode_rows(records: list[bytes], columns: list[str]) -> pd.DataFrame:
+    """Inverse of `encode_rows`; records must be in timestamp order."""
+    rows = np.frombuffer(b"".join(records), dtype=_row_dtype(len(columns)))
+    df = pd.DataFrame(rows['values'], columns=columns)
+    df.insert(0, 'timestamp', pd.to_datetime(rows['timestamp']))
+    return df
@@ -0,0 +1,86 @@
+import asyncio
+import typing as t
+from datetime import timedelta
+from functools import partial
+
+from redis.asyncio import Redis
+from redis.exceptions import LockError
+
+T = t.TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one execution.
+
+    Inside a worker the first caller becomes the leader and everyone else
+    awaits its result. Across workers the leader holds a Redis lock while it
+    works; leaders in other workers block on that lock and then either pick
+    up the shared result (when `encode`/`decode` are given) or run `fn`
+    themselves, which should re-check whatever cache it fills first.
+
+    The work runs in its own task, so a caller that is cancelled, the first
+    one included, stops waiting without cancelling it for the others.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        lock_timeout: timedelta = timedelta(seconds=120),
+        wait_timeout: timedelta = timedelta(seconds=60),
+        result_ttl: timedelta = timedelta(seconds=60),
+        encode: t.Optional[t.Callable[[t.Any], bytes]] = None,
+        decode: t.Optional[t.Callable[[bytes], t.Any]] = None,
+    ):
+        self.namespace = namespace
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.result_ttl = result_ttl
+        self.encode = encode
+        self.decode = decode
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, redis: Redis, fn: t.Callable[[], t.Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lead(key, redis, fn))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone
+
+    async def _lead(self, key: str, redis: Redis, fn: t.Callable[[], t.Awaitable[T]]) -> T:
+        result_key = f"{self.namespace}:result:{key}"
+        lock = redis.lock(
+            f"{self.namespace}:lock:{key}",
+            timeout=self.lock_timeout.total_seconds(),
+            blocking_timeout=self.wait_timeout.total_seconds(),
+        )
+        acquired = await lock.acquire(blocking=False)
+        waited = not acquired
+        if waited:
+            # Another worker is on it. If the lock can't be had in time we do
+            # the work anyway rather than fail.
+            acquired = await lock.acquire()
+        try:
+            if waited and self.decode is not None:
+                shared = await redis.get(result_key)
+                if shared is not None:
+                    return self.decode(shared)
+
+            result = await fn()
+
+            if self.encode is not None:
+                await redis.set(result_key, self.encode(result), ex=int(self.result_ttl.total_seconds()))
+            return result
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except LockError:
+                    pass  # expired while we worked
@@ -27,6 +27,7 @@ CREATE TABLE IF NOT EXISTS weather_data (
     relative_humidity float,
     precipitation float,
     wind_speed float,
+    wind_direction float,
     pressure float,
     condition_group text,
     created_at timestamp,
@@ -37,4 +38,7 @@ CREATE TABLE IF NOT EXISTS weather_data (
 CREATE INDEX IF NOT EXISTS ON weather_forecast.weather_data (condition_group);
 "
 
+# Tables created before wind_direction was stored
+cqlsh -u cassandra -p cassandra -e "ALTER TABLE weather_forecast.weather_data ADD wind_direction float;" > /dev/null 2>&1 || true
+
 echo "✅ Cassandra initialization completed!"
\ No newline at end of file
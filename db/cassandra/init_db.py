@@ -1,21 +1,12 @@
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
-import os
-from datetime import datetime
+from cassandra import InvalidRequest
+from .repository import CassandraRepository
 
 def init_cassandra():
     """Initialize Cassandra database with required keyspace and table."""
     
-    # Get Cassandra connection details from environment variables
-    CASSANDRA_HOST = os.getenv('CASSANDRA_HOST', 'localhost')
-    CASSANDRA_PORT = int(os.getenv('CASSANDRA_PORT', 9042))
-    CASSANDRA_USER = os.getenv('CASSANDRA_USER', 'cassandra')
-    CASSANDRA_PASSWORD = os.getenv('CASSANDRA_PASSWORD', 'cassandra')
-    
-    # Connect to Cassandra
-    auth_provider = PlainTextAuthProvider(username=CASSANDRA_USER, password=CASSANDRA_PASSWORD)
-    cluster = Cluster([CASSANDRA_HOST], port=CASSANDRA_PORT, auth_provider=auth_provider)
-    session = cluster.connect()
+    # Connect without a keyspace; it may not exist yet
+    repository = CassandraRepository.from_env(keyspace=None).connect()
+    session = repository.session
     
     # Create keyspace if not exists
     session.execute("""
@@ -39,6 +30,7 @@ def init_cassandra():
             relative_humidity float,
             precipitation float,
             wind_speed float,
+            wind_direction float,
             pressure float,
             condition_group text,
             created_at timestamp,
@@ -47,14 +39,19 @@ def init_cassandra():
         ) WITH CLUSTERING ORDER BY (timestamp DESC)
     """)
     
+    # Tables created before wind_direction was stored
+    try:
+        session.execute("ALTER TABLE weather_data ADD wind_direction float")
+    except InvalidRequest:
+        pass  # column already exists
+
     # Create indexes for common queries
     session.execute("""
         CREATE INDEX IF NOT EXISTS ON weather_forecast.weather_data (condition_group)
     """)
     
     print("✅ Cassandra database initialized successfully!")
-    session.shutdown()
-    cluster.shutdown()
+    repository.shutdown()
 
 if __name__ == "__main__":
     init_cassandra() 
\ No newline at end of file
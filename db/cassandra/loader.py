@@ -1,79 +1,162 @@
-import pandas as pd
-from cassandra.cqlengine import connection
-from cassandra.cqlengine.management import sync_table
-from datetime import datetime
+import argparse
+import json
 import os
-from .schema import WeatherData
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Optional
+
+import pyarrow.parquet as pq
+
+from .repository import (
+    INSERT_WEATHER_DATA,
+    WEATHER_FLOAT_COLUMNS,
+    CassandraRepository,
+    close_repository,
+    get_repository,
+    weather_data_rows,
+)
+
+PARQUET_COLUMNS = ['station_id', 'timestamp', *WEATHER_FLOAT_COLUMNS, 'condition_group']
+
 
 class CassandraLoader:
-    def __init__(self):
-        """Initialize Cassandra connection and sync the table schema."""
-        # Get Cassandra connection details from environment variables
-        CASSANDRA_HOST = os.getenv('CASSANDRA_HOST', 'localhost')
-        CASSANDRA_PORT = int(os.getenv('CASSANDRA_PORT', 9042))
-        CASSANDRA_USER = os.getenv('CASSANDRA_USER', 'cassandra')
-        CASSANDRA_PASSWORD = os.getenv('CASSANDRA_PASSWORD', 'cassandra')
-        
-        # Connect to Cassandra
-        connection.setup(
-            [CASSANDRA_HOST],
-            "weather_forecast",
-            auth_provider={
-                'username': CASSANDRA_USER,
-                'password': CASSANDRA_PASSWORD
-            },
-            protocol_version=4
-        )
-        
-        # Sync the table schema
-        sync_table(WeatherData)
-    
-    def load_parquet_to_cassandra(self, parquet_file: str):
-        """Load data from a parquet file into Cassandra."""
-        print(f"📥 Loading data from {parquet_file} to Cassandra...")
-        
-        # Read parquet file
-        df = pd.read_parquet(parquet_file)
-        
-        # Ensure timestamp is datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Get current time for metadata
+    """
+    Streams parquet files into `weather_data`.
+
+    Each file is read `chunk_rows` rows at a time, so memory stays flat
+    whatever the file size, and every chunk is written with the repository's
+    concurrent per-partition batches. Progress is checkpointed per file after
+    each chunk, so an interrupted load picks up where it stopped. Writes are
+    upserts, so replaying a partly written chunk is harmless.
+
+    The table itself is created by `init_db` / `cassandra-init.sh`.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[CassandraRepository] = None,
+        chunk_rows: int = 50_000,
+        batch_size: int = 30,
+        concurrency: int = 64,
+        checkpoint_dir: Optional[str] = None,
+    ):
+        self.repository = repository or get_repository()
+        self.chunk_rows = chunk_rows
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.checkpoint_dir = checkpoint_dir
+
+    def _checkpoint_path(self, parquet_file: str) -> str:
+        directory = self.checkpoint_dir or os.path.join(os.path.dirname(parquet_file), '.cassandra_load')
+        return os.path.join(directory, os.path.basename(parquet_file) + '.json')
+
+    @staticmethod
+    def _fingerprint(parquet_file: str) -> dict:
+        stat = os.stat(parquet_file)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def _read_checkpoint(self, parquet_file: str) -> int:
+        """Rows already loaded from `parquet_file`; 0 if it changed since the checkpoint."""
+        try:
+            with open(self._checkpoint_path(parquet_file)) as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return 0
+        if checkpoint.get('file') != self._fingerprint(parquet_file):
+            return 0
+        return checkpoint.get('rows_done', 0)
+
+    def _write_checkpoint(self, parquet_file: str, rows_done: int, complete: bool) -> None:
+        path = self._checkpoint_path(parquet_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'file': self._fingerprint(parquet_file),
+                'rows_done': rows_done,
+                'complete': complete,
+                'updated_at': datetime.utcnow().isoformat(),
+            }, f)
+        os.replace(tmp_path, path)
+
+    def load_parquet_to_cassandra(self, parquet_file: str) -> int:
+        """Load one parquet file into Cassandra, resuming from its checkpoint. Returns rows written."""
+        parquet = pq.ParquetFile(parquet_file)
+        total_rows = parquet.metadata.num_rows
+        rows_done = self._read_checkpoint(parquet_file)
+        if rows_done >= total_rows:
+            print(f"⏭️ {parquet_file} already loaded ({total_rows} rows)")
+            return 0
+        if rows_done:
+            print(f"🔁 Resuming {parquet_file} at row {rows_done}/{total_rows}")
+        else:
+            print(f"📥 Loading data from {parquet_file} to Cassandra...")
+
         now = datetime.utcnow()
-        
-        # Prepare batch of records
-        records = []
-        for _, row in df.iterrows():
-            record = WeatherData.create(
-                station_id=row['station_id'],
-                timestamp=row['timestamp'],
-                air_temperature=float(row['air_temperature']),
-                dew_point=float(row['dew_point']),
-                relative_humidity=float(row['relative_humidity']),
-                precipitation=float(row['precipitation']),
-                wind_speed=float(row['wind_speed']),
-                pressure=float(row['pressure']),
-                condition_group=row['condition_group'],
-                created_at=now,
-                updated_at=now
+        offset = 0
+        written = 0
+        for batch in parquet.iter_batches(batch_size=self.chunk_rows, columns=PARQUET_COLUMNS):
+            start, offset = offset, offset + batch.num_rows
+            if offset <= rows_done:
+                continue
+            if start < rows_done:
+                batch = batch.slice(rows_done - start)
+
+            result = self.repository.write_partitioned(
+                INSERT_WEATHER_DATA,
+                weather_data_rows(batch.to_pandas(), now),
+                batch_size=self.batch_size,
+                concurrency=self.concurrency,
             )
-            records.append(record)
-        
-        # Batch insert records
-        WeatherData.batch_create(records)
-        print(f"✅ Successfully loaded {len(records)} records to Cassandra")
-    
-    def load_all_parquet_files(self, directory: str):
-        """Load all parquet files from a directory into Cassandra."""
-        parquet_files = [f for f in os.listdir(directory) if f.endswith('.parquet')]
-        
-        for file in parquet_files:
-            file_path = os.path.join(directory, file)
-            self.load_parquet_to_cassandra(file_path)
-        
-        print(f"✅ Completed loading {len(parquet_files)} parquet files to Cassandra")
+            if result.failed_rows:
+                # Keep the checkpoint before this chunk so the next run retries it
+                raise RuntimeError(f"❌ {result.failed_rows} rows of {parquet_file} failed at row {rows_done}")
+
+            rows_done = offset
+            written += result.rows
+            self._write_checkpoint(parquet_file, rows_done, complete=rows_done >= total_rows)
+            print(f"   {os.path.basename(parquet_file)}: {rows_done}/{total_rows} rows "
+                  f"({result.rows_per_second:,.0f} rows/s)")
+
+        print(f"✅ Successfully loaded {written} records from {parquet_file}")
+        return written
+
+    def load_all_parquet_files(self, directory: str, workers: int = 4) -> dict[str, int]:
+        """Load every parquet file in `directory`, `workers` files at a time."""
+        parquet_files = sorted(
+            os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.parquet')
+        )
+
+        loaded: dict[str, int] = {}
+        failed: dict[str, Exception] = {}
+        # The driver session is thread-safe; each worker streams its own file
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.load_parquet_to_cassandra, path): path for path in parquet_files}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    loaded[path] = future.result()
+                except Exception as e:
+                    failed[path] = e
+                    print(f"⚠️ Failed to load {path}: {e}")
+
+        print(f"✅ Completed loading {len(loaded)}/{len(parquet_files)} parquet files to Cassandra "
+              f"({sum(loaded.values())} rows)")
+        if failed:
+            raise RuntimeError(f"{len(failed)} parquet files failed to load; rerun to resume them")
+        return loaded
+
 
 if __name__ == "__main__":
-    # Example usage
-    loader = CassandraLoader()
-    loader.load_all_parquet_files("../station_datasets") 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Load station parquet files into Cassandra')
+    parser.add_argument('directory', nargs='?', default='../station_datasets')
+    parser.add_argument('--workers', type=int, default=4, help='Files loaded in parallel')
+    parser.add_argument('--chunk-rows', type=int, default=50_000, help='Rows read from parquet per chunk')
+    parser.add_argument('--concurrency', type=int, default=64, help='Batches in flight per file')
+    args = parser.parse_args()
+
+    loader = CassandraLoader(chunk_rows=args.chunk_rows, concurrency=args.concurrency)
+    try:
+        loader.load_all_parquet_files(args.directory, workers=args.workers)
+    finally:
+        close_repository()
@@ -0,0 +1,247 @@
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Hashable, Iterable, Optional, Sequence
+
+import pandas as pd
+
+from cassandra.auth import PlainTextAuthProvider
+from cassandra.cluster import EXEC_PROFILE_DEFAULT, Cluster, ExecutionProfile, Session
+from cassandra.concurrent import execute_concurrent
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.query import BatchStatement, BatchType, PreparedStatement
+
+
+WEATHER_FLOAT_COLUMNS = [
+    'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
+    'wind_speed', 'wind_direction', 'pressure',
+]
+
+INSERT_WEATHER_DATA = f"""
+    INSERT INTO weather_data (
+        station_id, timestamp, {', '.join(WEATHER_FLOAT_COLUMNS)},
+        condition_group, created_at, updated_at
+    ) VALUES ({', '.join(['?'] * (len(WEATHER_FLOAT_COLUMNS) + 5))})
+"""
+
+
+def weather_data_rows(df: pd.DataFrame, written_at: datetime) -> list[tuple]:
+    """
+    Convert a cleaned observation frame to INSERT_WEATHER_DATA parameter
+    tuples, column by column rather than with per-row float() calls.
+    """
+    station_ids = df['station_id'].astype(str).tolist()
+    timestamps = pd.to_datetime(df['timestamp']).to_numpy(dtype='datetime64[us]').astype(object).tolist()
+    values = df[WEATHER_FLOAT_COLUMNS].to_numpy(dtype='float64').T.tolist()
+    groups = df['condition_group'].astype(str).tolist()
+    stamps = [written_at] * len(df)
+    return list(zip(station_ids, timestamps, *values, groups, stamps, stamps))
+
+
+@dataclass
+class BulkWriteResult:
+    rows: int
+    batches: int
+    failed_rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return (self.rows - self.failed_rows) / self.seconds if self.seconds else 0.0
+
+
+class CassandraRepository:
+    """
+    One long-lived cluster/session per process, shared by the API and the ETL.
+
+    Requests are routed token-aware (straight to a replica owning the
+    partition), statements are prepared once and cached by query text, and
+    reads are exposed as async, paged iterators on top of `execute_async`.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        port: int = 9042,
+        username: str = "cassandra",
+        password: str = "cassandra",
+        keyspace: Optional[str] = "weather_forecast",
+        local_dc: Optional[str] = None,
+        fetch_size: int = 5000,
+    ):
+        self.hosts = list(hosts)
+        self.port = port
+        self.username = username
+        self.password = password
+        self.keyspace = keyspace
+        self.local_dc = local_dc
+        self.fetch_size = fetch_size
+        self.cluster: Optional[Cluster] = None
+        self._session: Optional[Session] = None
+        self._prepared: dict[str, PreparedStatement] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, keyspace: Optional[str] = "weather_forecast") -> "CassandraRepository":
+        """Build from the CASSANDRA_* environment variables the containers set."""
+        return cls(
+            hosts=os.getenv('CASSANDRA_HOST', 'localhost').split(','),
+            port=int(os.getenv('CASSANDRA_PORT', 9042)),
+            username=os.getenv('CASSANDRA_USERNAME', os.getenv('CASSANDRA_USER', 'cassandra')),
+            password=os.getenv('CASSANDRA_PASSWORD', 'cassandra'),
+            keyspace=keyspace,
+            local_dc=os.getenv('CASSANDRA_DC'),
+        )
+
+    def connect(self) -> "CassandraRepository":
+        """Open the cluster connection. Safe to call more than once."""
+        with self._lock:
+            if self._session is None:
+                profile = ExecutionProfile(
+                    load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy(local_dc=self.local_dc)),
+                )
+                self.cluster = Cluster(
+                    self.hosts,
+                    port=self.port,
+                    auth_provider=PlainTextAuthProvider(username=self.username, password=self.password),
+                    execution_profiles={EXEC_PROFILE_DEFAULT: profile},
+                    protocol_version=4,
+                )
+                self._session = self.cluster.connect(self.keyspace)
+        return self
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            raise RuntimeError("Cassandra repository is not connected")
+        return self._session
+
+    def prepare(self, query: str) -> PreparedStatement:
+        """Prepare `query` once per process; later calls return the cached statement."""
+        statement = self._prepared.get(query)
+        if statement is None:
+            with self._lock:
+                statement = self._prepared.get(query)
+                if statement is None:
+                    statement = self._prepared[query] = self.session.prepare(query)
+        return statement
+
+    async def iter_pages(self, query: str, params: Sequence[Any] = (), fetch_size: Optional[int] = None) -> AsyncIterator[list]:
+        """Run a prepared query and yield its result one page at a time."""
+        bound = self.prepare(query).bind(params)
+        bound.fetch_size = fetch_size or self.fetch_size
+
+        loop = asyncio.get_running_loop()
+        pages: asyncio.Queue = asyncio.Queue()
+        response_future = self.session.execute_async(bound)
+        # Driver callbacks fire on its I/O thread, once per page
+        response_future.add_callbacks(
+            lambda rows: loop.call_soon_threadsafe(pages.put_nowait, (rows, None)),
+            lambda exc: loop.call_soon_threadsafe(pages.put_nowait, (None, exc)),
+        )
+        while True:
+            rows, exc = await pages.get()
+            if exc is not None:
+                raise exc
+            yield list(rows)
+            if not response_future.has_more_pages:
+                break
+            response_future.start_fetching_next_page()
+
+    async def fetch_all(self, query: str, params: Sequence[Any] = (), fetch_size: Optional[int] = None) -> list:
+        """Run a prepared query and return every row across all pages."""
+        rows: list = []
+        async for page in self.iter_pages(query, params, fetch_size):
+            rows.extend(page)
+        return rows
+
+    @staticmethod
+    def _unlogged_batch(statement: PreparedStatement, rows: Sequence[Sequence[Any]]) -> BatchStatement:
+        batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+        for row in rows:
+            batch.add(statement, row)
+        return batch
+
+    def write_partitioned(
+        self,
+        query: str,
+        rows: Iterable[Sequence[Any]],
+        partition_key: Callable[[Sequence[Any]], Hashable] = lambda row: row[0],
+        batch_size: int = 30,
+        concurrency: int = 64,
+        retries: int = 3,
+        retry_delay: float = 1.0,
+    ) -> BulkWriteResult:
+        """
+        Bulk-write `rows` with a prepared `query`.
+
+        Rows are grouped into unlogged batches that each stay inside one
+        partition (so a batch is a single mutation on one replica set) and
+        the batches are sent with at most `concurrency` in flight. Failed
+        batches are retried up to `retries` times; rows that still fail are
+        counted in the result instead of aborting the load.
+        """
+        started = time.perf_counter()
+        statement = self.prepare(query)
+
+        partitions: dict[Hashable, list] = {}
+        for row in rows:
+            partitions.setdefault(partition_key(row), []).append(row)
+        chunks = [
+            partition[i:i + batch_size]
+            for partition in partitions.values()
+            for i in range(0, len(partition), batch_size)
+        ]
+        total_rows = sum(len(chunk) for chunk in chunks)
+
+        pending = chunks
+        for attempt in range(retries + 1):
+            if attempt:
+                print(f"🔁 Retrying {len(pending)} failed batches (attempt {attempt}/{retries})...")
+                time.sleep(retry_delay * attempt)
+            # Built lazily so only the in-flight batches exist at any one time
+            batches = ((self._unlogged_batch(statement, chunk), ()) for chunk in pending)
+            results = execute_concurrent(self.session, batches, concurrency=concurrency, raise_on_first_error=False)
+            failed = [chunk for chunk, (success, _) in zip(pending, results) if not success]
+            if failed:
+                error = next(result for success, result in results if not success)
+                print(f"⚠️ {len(failed)} of {len(pending)} batches failed: {error}")
+            pending = failed
+            if not pending:
+                break
+
+        return BulkWriteResult(
+            rows=total_rows,
+            batches=len(chunks),
+            failed_rows=sum(len(chunk) for chunk in pending),
+            seconds=time.perf_counter() - started,
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self.cluster is not None:
+                self.cluster.shutdown()
+            self.cluster = None
+            self._session = None
+            self._prepared.clear()
+
+
+_repository: Optional[CassandraRepository] = None
+
+
+def get_repository() -> CassandraRepository:
+    """Process-wide repository configured from the environment, connected on first use."""
+    global _repository
+    if _repository is None:
+        _repository = CassandraRepository.from_env()
+    return _repository.connect()
+
+
+def close_repository() -> None:
+    global _repository
+    if _repository is not None:
+        _repository.shutdown()
+        _repository = None
@@ -9,7 +9,8 @@ class WeatherData(Model):
     # Partition key: station_id for data locality
     # Clustering key: timestamp for time-series queries
     station_id = columns.Text(partition_key=True)
-    timestamp = columns.DateTime(primary_key=True, clustering_order="DESC")
+    # `timestamp` is reserved on cqlengine models, so the attribute is renamed
+    observed_at = columns.DateTime(primary_key=True, clustering_order="DESC", db_field="timestamp")
     
     # Weather metrics
     air_temperature = columns.Float()
@@ -17,6 +18,7 @@ class WeatherData(Model):
     relative_humidity = columns.Float()
     precipitation = columns.Float()
     wind_speed = columns.Float()
+    wind_direction = columns.Float()
     pressure = columns.Float()
     condition_group = columns.Text()
     
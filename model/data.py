@@ -0,0 +1,139 @@
+"""
+Shared access to the cleaned station observations.
+
+The ETL writes them as a Hive-partitioned parquet dataset,
+
+    etl/station_datasets/weather/station_id=<id>/year=<yyyy>/month=<m>/part-0.parquet
+
+so a read for one station or a date range only opens the matching
+directories, and the row-group statistics on `timestamp` skip the rest.
+`load_observations` reads just the requested columns.
+"""
+
+import argparse
+import os
+import shutil
+from datetime import datetime
+from typing import Iterable, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+FEATURES = [
+    'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
+    'wind_speed', 'wind_direction', 'wdir_sin', 'wdir_cos',
+    'pressure', 'hour_sin', 'hour_cos', 'dayofyear_sin', 'dayofyear_cos'
+]
+
+STATION_DATASETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'etl', 'station_datasets')
+DATASET_DIR = os.path.join(STATION_DATASETS, 'weather')
+LEGACY_PARQUET = os.path.join(STATION_DATASETS, 'full_concat_data_cleaned.parquet')
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('station_id', pa.string()), ('year', pa.int16()), ('month', pa.int8())]),
+    flavor='hive',
+)
+
+# A station-month is ~720 rows, so each file is a single row group; the cap
+# only matters for bulk back-fills
+ROWS_PER_GROUP = 64 * 1024
+
+
+def write_partitions(df: pd.DataFrame, root: str = DATASET_DIR) -> None:
+    """
+    Write `df` into the dataset, replacing every station/year/month partition
+    it touches. Pass complete months: rows of a replaced partition that are
+    not in `df` are dropped.
+    """
+    if df.empty:
+        return
+    df = df.assign(
+        station_id=df['station_id'].astype(str),
+        year=df['timestamp'].dt.year.astype('int16'),
+        month=df['timestamp'].dt.month.astype('int8'),
+    ).sort_values(['station_id', 'timestamp'])
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        root,
+        format='parquet',
+        partitioning=PARTITIONING,
+        basename_template='part-{i}.parquet',
+        existing_data_behavior='delete_matching',
+        max_rows_per_group=ROWS_PER_GROUP,
+        min_rows_per_group=min(len(df), ROWS_PER_GROUP),
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd', write_statistics=True),
+    )
+
+
+def drop_station(station_id, root: str = DATASET_DIR) -> None:
+    shutil.rmtree(os.path.join(root, f'station_id={station_id}'), ignore_errors=True)
+
+
+def _months_between(start: datetime, end: datetime) -> ds.Expression:
+    """Partition filter for the year/month directories overlapping [start, end]."""
+    after = (ds.field('year') > start.year) | (
+        (ds.field('year') == start.year) & (ds.field('month') >= start.month))
+    before = (ds.field('year') < end.year) | (
+        (ds.field('year') == end.year) & (ds.field('month') <= end.month))
+    return after & before
+
+
+def load_observations(
+    stations: Optional[Iterable] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    columns: Optional[list[str]] = None,
+    root: str = DATASET_DIR,
+) -> pd.DataFrame:
+    """
+    Observations as `station_id`, `timestamp` + `columns` (default FEATURES),
+    sorted by station then time. `stations`, `start` and `end` are pushed
+    down to the partition directories and row-group statistics.
+    """
+    # Targets are often features too (air_temperature); read each column once
+    columns = list(dict.fromkeys(['station_id', 'timestamp', *(columns or FEATURES)]))
+
+    if os.path.isdir(root):
+        dataset = ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+        stations = None if stations is None else [str(s) for s in stations]
+    else:
+        # Datasets written before the partitioned layout; build it with `python -m model.data`
+        print(f"⚠️ {root} not found, reading {LEGACY_PARQUET}")
+        dataset = ds.dataset(LEGACY_PARQUET, format='parquet')
+        if stations is not None:
+            station_type = dataset.schema.field('station_id').type
+            stations = pa.array(list(stations)).cast(station_type).to_pylist()
+
+    conditions = []
+    if stations is not None:
+        conditions.append(ds.field('station_id').isin(stations))
+    if start is not None or end is not None:
+        if os.path.isdir(root):
+            conditions.append(_months_between(start or datetime.min, end or datetime.max))
+        if start is not None:
+            conditions.append(ds.field('timestamp') >= pd.Timestamp(start))
+        if end is not None:
+            conditions.append(ds.field('timestamp') <= pd.Timestamp(end))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df.sort_values(['station_id', 'timestamp']).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the partitioned observation dataset from a single parquet file')
+    parser.add_argument('source', nargs='?', default=LEGACY_PARQUET)
+    parser.add_argument('--root', default=DATASET_DIR)
+    args = parser.parse_args()
+
+    source = pd.read_parquet(args.source)
+    source['timestamp'] = pd.to_datetime(source['timestamp'])
+    for station_id, station_df in source.groupby('station_id'):
+        drop_station(station_id, args.root)
+        write_partitions(station_df, args.root)
+    print(f"✅ Wrote {len(source)} rows for {source['station_id'].nunique()} stations to {args.root}")
@@ -1,15 +1,41 @@
 import os
 import glob
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import pandas as pd
 import numpy as np
-from meteostat import Point, Hourly
-from datetime import datetime
+from meteostat import Point, Hourly, Stations
+from datetime import datetime, timedelta
 import requests
 from PIL import Image
 from io import BytesIO
 import argparse
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
+from model.data import drop_station, write_partitions
+from db.cassandra.repository import INSERT_WEATHER_DATA, close_repository, get_repository, weather_data_rows
+
+GIBS_WMS_URL = "https://gibs.earthdata.nasa.gov/wms/epsg4326/best/wms.cgi"
+
+
+@contextmanager
+def meteostat_endpoint(endpoint=None):
+    """
+    Point Meteostat's station list and hourly downloads at `endpoint` (a
+    mirror or a local stand-in) for the duration of the block. Its file
+    cache is bypassed meanwhile so the data never mixes with the public one.
+    """
+    if endpoint is None:
+        yield
+        return
+    saved = Stations.endpoint, Hourly.endpoint, Stations.max_age, Hourly.max_age
+    Stations.endpoint = Hourly.endpoint = endpoint
+    Stations.max_age = Hourly.max_age = 0
+    try:
+        yield
+    finally:
+        Stations.endpoint, Hourly.endpoint, Stations.max_age, Hourly.max_age = saved
+
 
 class WeatherETLPipeline:
     WEATHER_GROUP_MAPPING = {
@@ -26,12 +52,23 @@ class WeatherETLPipeline:
         27: "Storm"
     }
 
-    def __init__(self, stations_csv, output_dir, start_date, end_date=datetime.today(), validate_satellite=True):
+    def __init__(self, stations_csv, output_dir, start_date, end_date=datetime.today(), validate_satellite=True,
+                 workers=1, meteostat_endpoint=None, gibs_url=GIBS_WMS_URL, full_refresh=False):
         self.stations_csv = stations_csv
         self.output_dir = output_dir
         self.start_date = start_date
         self.end_date = end_date
         self.validate_satellite = validate_satellite
+        self.workers = workers
+        self.meteostat_endpoint = meteostat_endpoint
+        self.gibs_url = gibs_url
+        self.full_refresh = full_refresh
+        self.watermarks_path = os.path.join(self.output_dir, "watermarks.json")
+        # Advanced separately, only once rows are in Cassandra, so a failed load is retried
+        self.cassandra_watermarks_path = os.path.join(self.output_dir, "cassandra_watermarks.json")
+        self.dataset_dir = os.path.join(self.output_dir, "weather")
+        self.watermarks = {}
+        self.cassandra_watermarks = {}
         os.makedirs(self.output_dir, exist_ok=True)
 
     def map_weather_group(self, code):
@@ -39,13 +76,85 @@ class WeatherETLPipeline:
             return "Unknown"
         return self.WEATHER_GROUP_MAPPING.get(int(code), "Unknown")
 
-    def fetch_and_clean_station(self, station):
-        print(f"Fetching: {station['name']}...")
+    def load_watermarks(self, path=None):
+        """Last loaded timestamp per station id, as written by the previous run."""
+        path = path or self.watermarks_path
+        if self.full_refresh or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return {station_id: datetime.fromisoformat(ts) for station_id, ts in json.load(f).items()}
+
+    def save_watermarks(self, watermarks=None, path=None):
+        watermarks = self.watermarks if watermarks is None else watermarks
+        path = path or self.watermarks_path
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({station_id: ts.isoformat() for station_id, ts in watermarks.items()}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def station_path(self, station):
+        name = station["name"].replace(" ", "_").replace("/", "_").replace("__", "_").lower()
+        return os.path.join(self.output_dir, f"{name}_data.parquet")
+
+    def station_watermark(self, station):
+        """The station's last loaded hour, or None when it has to be fetched from `start_date`."""
+        watermark = self.watermarks.get(str(station["id"]))
+        if watermark is None or not os.path.exists(self.station_path(station)):
+            return None
+        return watermark
+
+    def pending_cassandra_rows(self, stations_list):
+        """Per station id, the rows of its parquet newer than its Cassandra watermark."""
+        pending = {}
+        for station in stations_list:
+            path = self.station_path(station)
+            if not os.path.exists(path):
+                continue
+            df = pd.read_parquet(path)
+            loaded = self.cassandra_watermarks.get(str(station["id"]))
+            if loaded is not None:
+                df = df[df["timestamp"] > loaded]
+            if not df.empty:
+                pending[str(station["id"])] = df
+        return pending
+
+    def sync_cassandra(self, stations_list):
+        """
+        Load every row not yet in Cassandra, including any a previous failed
+        load left behind, and advance the Cassandra watermarks only if all of
+        them were written.
+        """
+        pending = self.pending_cassandra_rows(stations_list)
+        if not pending:
+            print("✅ Cassandra is up to date.")
+            return None
+        result = self.load_to_cassandra(pd.concat(pending.values(), ignore_index=True))
+        if result.failed_rows:
+            print("⚠️ Cassandra watermarks not advanced; the rows are loaded again on the next run")
+            return result
+        for station_id, df in pending.items():
+            self.cassandra_watermarks[station_id] = df["timestamp"].max().to_pydatetime()
+        self.save_watermarks(self.cassandra_watermarks, self.cassandra_watermarks_path)
+        return result
+
+    def fetch_station(self, station):
+        watermark = self.station_watermark(station)
+        start = self.start_date if watermark is None else watermark + timedelta(hours=1)
+        if start > self.end_date:
+            return pd.DataFrame()
+        print(f"Fetching: {station['name']} from {start}...")
         pt = Point(station["latitude"], station["longitude"])
+        df = Hourly(pt, start, self.end_date).fetch().reset_index()
+        if watermark is not None and not df.empty:
+            df = df[df["time"] > watermark]
+        return df
 
-        df = Hourly(pt, self.start_date, self.end_date).fetch().reset_index()
+    def clean_station(self, station, df):
         if df.empty:
-            print(f"⚠️ No data found for {station['name']}")
+            if self.station_watermark(station) is not None:
+                print(f"✅ {station['name']} is up to date")
+            else:
+                print(f"⚠️ No data found for {station['name']}")
             return None
 
         df = df.rename(columns={
@@ -90,7 +199,7 @@ class WeatherETLPipeline:
 
     def validate_with_satellite(self, df, lat, lon):
         latest_time = df['timestamp'].max().strftime('%Y-%m-%d')
-        url = f"https://gibs.earthdata.nasa.gov/wms/epsg4326/best/wms.cgi?" \
+        url = f"{self.gibs_url}?" \
               f"service=WMS&request=GetMap&layers=MODIS_Terra_CorrectedReflectance_TrueColor" \
               f"&styles=&format=image/png&transparent=true&version=1.1.1" \
               f"&height=256&width=256&bbox={lon-1},{lat-1},{lon+1},{lat+1}&srs=EPSG:4326" \
@@ -113,97 +222,157 @@ class WeatherETLPipeline:
         except Exception as e:
             print(f"⚠️ Satellite validation failed: {e}")
 
-    def load_to_cassandra(self, df):
-        """Load the data into Cassandra database."""
+    def load_to_cassandra(self, df, batch_size=30, concurrency=64, retries=3):
+        """
+        Bulk-load the data into Cassandra: per-station unlogged batches of
+        `batch_size` rows, `concurrency` batches in flight, failed batches
+        retried `retries` times.
+        """
         print("Connecting to Cassandra...")
-        auth_provider = PlainTextAuthProvider(
-            username=os.getenv('CASSANDRA_USERNAME', 'cassandra'),
-            password=os.getenv('CASSANDRA_PASSWORD', 'cassandra')
-        )
-        cluster = Cluster(
-            [os.getenv('CASSANDRA_HOST', 'cassandra')],
-            port=int(os.getenv('CASSANDRA_PORT', 9042)),
-            auth_provider=auth_provider
-        )
-        session = cluster.connect('weather_forecast')
-
-        # Prepare the insert statement
-        insert_stmt = session.prepare("""
-            INSERT INTO weather_data (
-                station_id, timestamp, air_temperature, dew_point,
-                relative_humidity, precipitation, wind_speed, pressure,
-                condition_group, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """)
+        repository = get_repository()
 
         # Get current timestamp for created_at and updated_at
         current_time = datetime.now()
+        rows = weather_data_rows(df, current_time)
+        print(f"Loading {len(rows)} rows into Cassandra...")
+
+        result = repository.write_partitioned(
+            INSERT_WEATHER_DATA, rows,
+            batch_size=batch_size, concurrency=concurrency, retries=retries,
+        )
+        print(f"Wrote {result.rows - result.failed_rows}/{result.rows} rows in {result.batches} batches "
+              f"({result.seconds:.1f}s, {result.rows_per_second:,.0f} rows/s)")
+        if result.failed_rows:
+            print(f"⚠️ {result.failed_rows} rows could not be written after {retries} retries")
+        else:
+            print("✅ Data loaded into Cassandra successfully!")
+        return result
+
+    def process_station(self, station):
+        """Fetch, clean and satellite-check one station. Returns (df or None, timings in seconds)."""
+        timings = {}
+        started = time.perf_counter()
+        raw = self.fetch_station(station)
+        timings["fetch"] = time.perf_counter() - started
 
-        # Insert data in batches
-        batch_size = 100
-        total_rows = len(df)
-        print(f"Loading {total_rows} rows into Cassandra...")
+        started = time.perf_counter()
+        df = self.clean_station(station, raw)
+        timings["clean"] = time.perf_counter() - started
 
-        for i in range(0, total_rows, batch_size):
-            batch = df.iloc[i:i + batch_size]
-            for _, row in batch.iterrows():
+        if df is not None and self.validate_satellite:
+            started = time.perf_counter()
+            self.validate_with_satellite(df, station["latitude"], station["longitude"])
+            timings["satellite"] = time.perf_counter() - started
+        return df, timings
+
+    def iter_stations(self, stations_list):
+        """
+        Yield (station, df, timings) for every station, `workers` at a time,
+        in completion order. A station that raises yields its exception as df.
+        """
+        if self.workers <= 1:
+            for station in stations_list:
                 try:
-                    session.execute(insert_stmt, (
-                        str(row['station_id']),
-                        row['timestamp'],
-                        float(row['air_temperature']),
-                        float(row['dew_point']),
-                        float(row['relative_humidity']),
-                        float(row['precipitation']),
-                        float(row['wind_speed']),
-                        float(row['pressure']),
-                        str(row['condition_group']),
-                        current_time,
-                        current_time
-                    ))
+                    yield (station, *self.process_station(station))
                 except Exception as e:
-                    print(f"Error inserting row: {e}")
-                    print(f"Problematic row data: {row.to_dict()}")
-                    raise
-            print(f"Processed {min(i + batch_size, total_rows)}/{total_rows} rows")
+                    yield station, e, {}
+            return
 
-        print("✅ Data loaded into Cassandra successfully!")
-        session.shutdown()
-        cluster.shutdown()
+        # Download the shared station list once, before the workers race to cache it
+        Stations()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.process_station, station): station for station in stations_list}
+            for future in as_completed(futures):
+                try:
+                    yield (futures[future], *future.result())
+                except Exception as e:
+                    yield futures[future], e, {}
 
-    def run(self, load_to_cassandra=False):
-        stations_list = pd.read_csv(self.stations_csv).to_dict(orient="records")
-        all_dfs = []
+    def write_station(self, station, df):
+        """
+        Write (or, incrementally, append) the station's parquet, replace the
+        dataset partitions its new rows fall in, and advance its watermark.
+        """
+        path = self.station_path(station)
+        new_months = df["timestamp"].dt.to_period("M").unique()
+        incremental = self.station_watermark(station) is not None
+        if incremental:
+            df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+            df = df.drop_duplicates(subset="timestamp", keep="last")
+        df.to_parquet(path, index=False)
 
-        for station in stations_list:
-            df = self.fetch_and_clean_station(station)
-            if df is None:
-                continue
+        if incremental:
+            # Partitions are rewritten whole, so pass every row of the touched months
+            write_partitions(df[df["timestamp"].dt.to_period("M").isin(new_months)], self.dataset_dir)
+        else:
+            drop_station(station["id"], self.dataset_dir)
+            write_partitions(df, self.dataset_dir)
 
-            if self.validate_satellite:
-                self.validate_with_satellite(df, station["latitude"], station["longitude"])
+        self.watermarks[str(station["id"])] = df["timestamp"].max().to_pydatetime()
+        self.save_watermarks()
+        return path
 
-            name = station["name"].replace(" ", "_").replace("/", "_").replace("__", "_").lower()
-            path = os.path.join(self.output_dir, f"{name}_data.parquet")
-            df.to_parquet(path, index=False)
-            all_dfs.append(df)
+    def print_summary(self, summary, wall_time):
+        print(f"{'station':<32}{'rows':>8}{'fetch':>8}{'clean':>8}{'sat':>8}{'write':>8}")
+        for name, rows, timings in summary:
+            cells = "".join(
+                f"{timings[step]:>7.2f}s" if step in timings else f"{'-':>8}"
+                for step in ("fetch", "clean", "satellite", "write")
+            )
+            print(f"{name[:31]:<32}{rows:>8}{cells}")
+        station_time = sum(sum(timings.values()) for _, _, timings in summary)
+        print(f"⏱️ {len(summary)} stations in {wall_time:.1f}s wall time "
+              f"({station_time:.1f}s summed across stations, {self.workers} workers)")
 
-        if all_dfs:
-            merged_df = pd.concat(all_dfs, ignore_index=True)
-            merged_path = os.path.join(self.output_dir, "full_concat_data_cleaned.parquet")
-            merged_df.to_parquet(merged_path, index=False)
-            print(f"✅ Merged dataset shape: {merged_df.shape}")
-            print(f"✅ Cleaned full dataset saved to {merged_path}")
+    def run(self, load_to_cassandra=False):
+        stations_list = pd.read_csv(self.stations_csv).to_dict(orient="records")
+        self.watermarks = self.load_watermarks()
+        self.cassandra_watermarks = self.load_watermarks(self.cassandra_watermarks_path)
+        if self.full_refresh:
+            print("🔄 Full refresh: rebuilding every station from", self.start_date)
+        new_dfs = []
+        summary = []
+
+        started = time.perf_counter()
+        with meteostat_endpoint(self.meteostat_endpoint):
+            # Stations are written as they finish, while the rest are still downloading
+            for station, df, timings in self.iter_stations(stations_list):
+                if isinstance(df, Exception):
+                    print(f"⚠️ Failed to process {station['name']}: {df}")
+                    summary.append((station["name"], 0, timings))
+                    continue
+                if df is None:
+                    summary.append((station["name"], 0, timings))
+                    continue
 
-            if load_to_cassandra:
-                self.load_to_cassandra(merged_df)
+                write_started = time.perf_counter()
+                self.write_station(station, df)
+                timings["write"] = time.perf_counter() - write_started
+                summary.append((station["name"], len(df), timings))
+                new_dfs.append(df)
+        self.print_summary(summary, time.perf_counter() - started)
+
+        if new_dfs:
+            new_rows = pd.concat(new_dfs, ignore_index=True)
+            print(f"✅ {len(new_rows)} new rows written to the {self.dataset_dir} dataset")
+        elif self.watermarks:
+            print("✅ No new observations since the last run.")
         else:
             print("❌ No station data processed.")
 
+        if load_to_cassandra:
+            # Rows past each station's Cassandra watermark: this run's, plus any an earlier load failed on
+            self.sync_cassandra(stations_list)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Weather ETL Pipeline')
     parser.add_argument('--cassandra', action='store_true', help='Load data into Cassandra')
+    parser.add_argument('--workers', type=int, default=8, help='Stations fetched in parallel (1 = one after another)')
+    parser.add_argument('--meteostat-endpoint', help='Meteostat bulk data mirror to download from')
+    parser.add_argument('--gibs-url', default=GIBS_WMS_URL, help='GIBS WMS endpoint used for the satellite check')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Ignore the stored watermarks and rebuild every station from the start date')
     args = parser.parse_args()
 
     pipeline = WeatherETLPipeline(
@@ -211,6 +380,11 @@ if __name__ == "__main__":
         output_dir="station_datasets",
         start_date=datetime(2024, 5, 1),
         end_date=datetime.today(),
-        validate_satellite=True  # Set to False if you want to skip satellite check
+        validate_satellite=True,  # Set to False if you want to skip satellite check
+        workers=args.workers,
+        meteostat_endpoint=args.meteostat_endpoint,
+        gibs_url=args.gibs_url,
+        full_refresh=args.full_refresh,
     )
     pipeline.run(load_to_cassandra=args.cassandra)
+    close_repository()
@@ -1,14 +1,15 @@
-import pandas as pd
 import numpy as np
 import joblib
 import os
 os.environ["CUDA_VISIBLE_DEVICES"] = "-1"  # disable GPU
 import tensorflow as tf
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score, accuracy_score, classification_report, confusion_matrix
-from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from model.data import FEATURES, load_observations
+from model.sequences import WindowBatches, WindowedSeries
+
 
 # --- 1. Load models and scalers ---
 scaler_X = joblib.load('models_scalers/scaler_X_latest.pkl')
@@ -17,48 +18,42 @@ model_temp = tf.keras.models.load_model('models_scalers/lstm_temperature_latest.
 model_cond = tf.keras.models.load_model('models_scalers/lstm_condition_classifier_latest.keras')
 
 # --- 2. Define features exactly like training ---
-features = [
-    'air_temperature', 'dew_point', 'relative_humidity', 'precipitation',
-    'wind_speed', 'wind_direction', 'wdir_sin', 'wdir_cos',
-    'pressure', 'hour_sin', 'hour_cos', 'dayofyear_sin', 'dayofyear_cos'
-]
+features = FEATURES
 
-# --- 3. Load dataset (the same you trained with) ---
-raw_df = pd.read_parquet('./station_datasets/full_concat_data_cleaned.parquet')
-raw_df['timestamp'] = pd.to_datetime(raw_df['timestamp'])
-raw_df = raw_df.sort_values(['station_id', 'timestamp']).reset_index(drop=True)
+# --- 3. Load dataset (the same you trained with; pass stations=/start= to evaluate a slice) ---
+raw_df = load_observations(columns=features + ['condition_group'])
 
 # --- 4. Prepare inputs ---
 X_scaled = scaler_X.transform(raw_df[features])
 
-# --- 5. Create sequences ---
-def create_sequences(X, y, window_size=24):
-    Xs, ys = [], []
-    for i in range(window_size, len(X)):
-        Xs.append(X[i-window_size:i])
-        ys.append(y[i])
-    return np.array(Xs), np.array(ys)
+# --- 5. Create sequences (both share the same strided view of X_scaled) ---
+station_ids = raw_df['station_id'].to_numpy()
+timestamps = raw_df['timestamp'].to_numpy()
 
 # Temperature
-X_temp, y_temp = create_sequences(X_scaled, raw_df['air_temperature'].values)
-print(1)
+temp_series = WindowedSeries(X_scaled, raw_df['air_temperature'].to_numpy(), station_ids, window=24, timestamps=timestamps)
 # Condition
-X_cond, y_cond = create_sequences(X_scaled, label_encoder.transform(raw_df['condition_group'].values))
-print(1)
-# --- 6. Train/Test Split (same as training) ---
-X_temp_train, X_temp_test, y_temp_train, y_temp_test = train_test_split(X_temp, y_temp, test_size=0.2, random_state=42)
-X_cond_train, X_cond_test, y_cond_train, y_cond_test = train_test_split(X_cond, y_cond, test_size=0.2, random_state=42)
-print(1)
+cond_series = WindowedSeries(
+    X_scaled, label_encoder.transform(raw_df['condition_group'].values), station_ids, window=24, timestamps=timestamps,
+)
+
+# --- 6. Train/Test Split (last 20% of each station) ---
+# This is the split model/train.py holds out, so the scores are out-of-sample only for
+# models trained with it. Models from the older scripts were split at random across all
+# windows; part of this test set was in their training data and their scores read high.
+_, test_idx = temp_series.split(test_size=0.2)
+y_temp_test = temp_series.targets(test_idx)
+y_cond_test = cond_series.targets(test_idx)
+
 # --- 7. Predict and Evaluate ---
 
 # Temperature
-y_temp_pred = model_temp.predict(X_temp_test, verbose=0)
+y_temp_pred = model_temp.predict(WindowBatches(temp_series, test_idx, 256), verbose=0)
 
 mae = mean_absolute_error(y_temp_test, y_temp_pred)
 mse = mean_squared_error(y_temp_test, y_temp_pred)
 rmse = np.sqrt(mse)
 r2 = r2_score(y_temp_test, y_temp_pred)
-print(1)
 print("🔵 Temperature Evaluation:")
 print(f"MAE: {mae:.3f}")
 print(f"MSE: {mse:.3f}")
@@ -66,7 +61,7 @@ print(f"RMSE: {rmse:.3f}")
 print(f"R² Score: {r2:.3f}")
 
 # Condition
-y_cond_pred_probs = model_cond.predict(X_cond_test, verbose=0)
+y_cond_pred_probs = model_cond.predict(WindowBatches(cond_series, test_idx, 256), verbose=0)
 y_cond_pred_classes = np.argmax(y_cond_pred_probs, axis=1)
 
 acc = accuracy_score(y_cond_test, y_cond_pred_classes)
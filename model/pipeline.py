@@ -0,0 +1,196 @@
+"""
+Streaming tf.data input pipeline over the partitioned station dataset.
+
+Instead of loading every station and materialising every window up front,
+each station is read from parquet on demand, scaled, cut into windows with
+`WindowedSeries` and emitted in chunks. Several stations are read in
+parallel (`interleave`), windows from them are mixed in a shuffle buffer,
+batched and prefetched while the model trains on the previous batch, so
+memory holds a few stations plus the shuffle buffer rather than the whole
+history.
+
+`series_dataset` runs windows that are already in memory or memory-mapped
+through the same batching and prefetching. `model/train.py` trains from the
+memory-mapped arrays that way, or with `--stream` from `window_dataset`.
+"""
+
+import os
+import time
+from typing import Callable, Iterable, Optional, Union
+
+import numpy as np
+import pyarrow.parquet as pq
+import tensorflow as tf
+from sklearn.preprocessing import MinMaxScaler
+from tensorflow import keras
+
+from model.data import DATASET_DIR, LEGACY_PARQUET, load_observations
+from model.sequences import WindowedSeries
+
+
+def station_ids(root: str = DATASET_DIR) -> list[str]:
+    """Stations present in the dataset (or the legacy merged file if it hasn't been built)."""
+    if os.path.isdir(root):
+        return sorted(name.split('=', 1)[1] for name in os.listdir(root) if name.startswith('station_id='))
+    column = pq.read_table(LEGACY_PARQUET, columns=['station_id']).column('station_id')
+    return sorted({str(station_id) for station_id in column.to_pylist()})
+
+
+def fit_scaler(columns: list[str], stations: Optional[Iterable] = None, root: str = DATASET_DIR) -> MinMaxScaler:
+    """Fit a MinMaxScaler on `columns` one station at a time."""
+    scaler = MinMaxScaler()
+    for station_id in stations or station_ids(root):
+        df = load_observations([station_id], columns=columns, root=root)
+        if len(df):
+            scaler.partial_fit(df[columns])
+    return scaler
+
+
+def window_dataset(
+    features: list[str],
+    target: Union[str, list[str]],
+    window: int,
+    horizon: int = 1,
+    scaler: Optional[MinMaxScaler] = None,
+    target_transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    split: str = 'train',
+    test_size: float = 0.2,
+    stations: Optional[Iterable] = None,
+    root: str = DATASET_DIR,
+    batch_size: int = 64,
+    shuffle_buffer: int = 10_000,
+    seed: int = 42,
+    parallel_stations: int = 4,
+    chunk_size: int = 1024,
+    target_shape: Optional[tuple] = None,
+    target_width: Optional[int] = None,
+    step_targets: bool = False,
+    map_batch: Optional[Callable] = None,
+) -> tf.data.Dataset:
+    """
+    Batches of (windows, targets) for the `split` ('train' or 'test') side
+    of `WindowedSeries.split`, read station by station from `root`.
+
+    `scaler` transforms the features, `target_transform` the raw target
+    column (e.g. a label encoder or a target scaler); with a list of target
+    columns it receives them as a DataFrame. `target_width` is the number of
+    values it returns per row, if more than one. With `step_targets` every
+    window is paired with the target after each of its rows
+    (`WindowedSeries.step_targets`). `map_batch` is applied to every batch.
+    Only the train split is shuffled.
+    """
+    stations = [str(station_id) for station_id in (stations or station_ids(root))]
+    shuffle = split == 'train'
+    targets = [target] if isinstance(target, str) else list(target)
+
+    def station_windows(station_id):
+        df = load_observations([station_id.decode()], columns=features + targets, root=root)
+        X = scaler.transform(df[features]) if scaler is not None else df[features].to_numpy()
+        y = df[target].to_numpy() if isinstance(target, str) else df[targets]
+        if target_transform is not None:
+            y = target_transform(y)
+        series = WindowedSeries(
+            X, np.asarray(y, dtype=np.float32), df['station_id'].to_numpy(), window, horizon,
+            timestamps=df['timestamp'].to_numpy(),
+        )
+        train, test = series.split(test_size)
+        starts = train if split == 'train' else test
+        for i in range(0, len(starts), chunk_size):
+            chunk = starts[i:i + chunk_size]
+            yield series.windows[chunk], series.step_targets(chunk) if step_targets else series.targets(chunk)
+
+    target_spec = (None, window) if step_targets else (None,) if horizon == 1 else (None, horizon)
+    if target_width is not None:
+        target_spec += (target_width,)
+    signature = (
+        tf.TensorSpec((None, window, len(features)), tf.float32),
+        tf.TensorSpec(target_spec, tf.float32),
+    )
+
+    dataset = tf.data.Dataset.from_tensor_slices(stations)
+    if shuffle:
+        dataset = dataset.shuffle(len(stations), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.interleave(
+        lambda station_id: tf.data.Dataset.from_generator(station_windows, args=(station_id,), output_signature=signature),
+        cycle_length=parallel_stations,
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not shuffle,
+    ).unbatch()
+    if shuffle:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return _finish(dataset.batch(batch_size), target_shape, map_batch)
+
+
+def series_dataset(
+    series: WindowedSeries,
+    starts: np.ndarray,
+    batch_size: int = 64,
+    shuffle: bool = False,
+    seed: int = 42,
+    target_shape: Optional[tuple] = None,
+    step_targets: bool = False,
+    map_batch: Optional[Callable] = None,
+) -> tf.data.Dataset:
+    """
+    The batches `window_dataset` would give, cut out of a `WindowedSeries`
+    that is already in memory or memory-mapped (`model.train.TrainingData`)
+    instead of read from parquet. Batches of window starts are shuffled,
+    copied out of the series in parallel and prefetched.
+    """
+    y_shape = (series.window,) if step_targets else () if series.horizon == 1 else (series.horizon,)
+    y_shape += series.y.shape[1:]
+
+    def take(batch_starts):
+        targets = series.step_targets(batch_starts) if step_targets else series.targets(batch_starts)
+        return series.windows[batch_starts].astype(np.float32), targets.astype(np.float32)
+
+    def take_batch(batch_starts):
+        X, y = tf.numpy_function(take, [batch_starts], (tf.float32, tf.float32))
+        X.set_shape((None, series.window, series.X.shape[1]))
+        y.set_shape((None, *y_shape))
+        return X, y
+
+    dataset = tf.data.Dataset.from_tensor_slices(np.asarray(starts, dtype=np.int64))
+    if shuffle:
+        dataset = dataset.shuffle(len(starts), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(take_batch, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+    return _finish(dataset, target_shape, map_batch)
+
+
+def _finish(dataset: tf.data.Dataset, target_shape: Optional[tuple], map_batch: Optional[Callable]) -> tf.data.Dataset:
+    if target_shape is not None:
+        dataset = dataset.map(
+            lambda X, y: (X, tf.reshape(y, (-1, *target_shape))),
+            num_parallel_calls=tf.data.AUTOTUNE,
+        )
+    if map_batch is not None:
+        dataset = dataset.map(map_batch, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+class WindowThroughput(keras.callbacks.Callback):
+    """Logs training throughput in windows per second at the end of every epoch."""
+
+    def __init__(self, batch_size: int):
+        super().__init__()
+        self.batch_size = batch_size
+        self.history: list[float] = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._started = time.perf_counter()
+        self._steps = 0
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._steps += 1
+        self._finished = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        # Training time only (validation runs before on_epoch_end). The last
+        # batch may be short, so this overstates by less than one batch.
+        if not self._steps:
+            return
+        windows_per_second = self._steps * self.batch_size / (self._finished - self._started)
+        self.history.append(windows_per_second)
+        if logs is not None:
+            logs['windows_per_second'] = windows_per_second
+        print(f"⚡ Epoch {epoch + 1}: {windows_per_second:,.0f} windows/s over {self._steps} batches")
@@ -0,0 +1,143 @@
+"""
+Sliding-window training sequences without copying the data per window.
+
+`WindowedSeries` keeps the scaled feature matrix once and exposes every
+window as a strided view into it (`numpy.lib.stride_tricks.sliding_window_view`),
+so the full set of windows costs no more memory than the rows themselves.
+Only windows that stay inside one station (and, when timestamps are given,
+inside one run of consecutive hours) are valid; they are addressed by their
+start row. Windows are copied out a batch at a time by `take` /
+`WindowBatches`.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from tensorflow import keras
+
+
+class WindowedSeries:
+    """
+    Windows of `window` rows of `X`, each followed by `horizon` target rows
+    of `y`. `station_ids` must be grouped (rows sorted by station, then time).
+    """
+
+    def __init__(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        station_ids: np.ndarray,
+        window: int,
+        horizon: int = 1,
+        timestamps: Optional[np.ndarray] = None,
+    ):
+        self.X = np.ascontiguousarray(X, dtype=np.float32)
+        self.y = np.ascontiguousarray(y)
+        self.window = window
+        self.horizon = horizon
+
+        # (n_windows, window, n_features) view; row i is X[i:i + window]
+        self.windows = sliding_window_view(self.X, window, axis=0).transpose(0, 2, 1)
+
+        self.station_bounds = self._bounds(np.asarray(station_ids))
+        segment_bounds = self.station_bounds
+        if timestamps is not None:
+            # Also break where hours are missing, so a window is always consecutive hours
+            gaps = np.flatnonzero(np.diff(np.asarray(timestamps, dtype='datetime64[h]').astype(np.int64)) != 1) + 1
+            segment_bounds = np.union1d(segment_bounds, gaps)
+        self.starts = self._valid_starts(segment_bounds)
+
+    @staticmethod
+    def _bounds(station_ids: np.ndarray) -> np.ndarray:
+        """Row offsets where each station begins, plus the total length."""
+        changes = np.flatnonzero(station_ids[1:] != station_ids[:-1]) + 1
+        return np.concatenate([[0], changes, [len(station_ids)]])
+
+    def _valid_starts(self, bounds: np.ndarray) -> np.ndarray:
+        span = self.window + self.horizon
+        starts = [np.arange(lo, hi - span + 1) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi - lo >= span]
+        return np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def targets(self, starts: np.ndarray) -> np.ndarray:
+        """Targets for the windows at `starts`: shape (n,) for horizon 1, else (n, horizon)."""
+        first = np.asarray(starts) + self.window
+        if self.horizon == 1:
+            return self.y[first]
+        return self.y[first[:, None] + np.arange(self.horizon)]
+
+    def step_targets(self, starts: np.ndarray) -> np.ndarray:
+        """
+        The target one row after every row of the windows at `starts`, shape
+        (n, window, ...), for models that predict after each input step. The
+        last one is `targets(starts)` for horizon 1.
+        """
+        return self.y[np.asarray(starts)[:, None] + 1 + np.arange(self.window)]
+
+    def take(self, starts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Copy out the windows and targets at `starts`."""
+        return self.windows[starts], self.targets(starts)
+
+    def split(self, test_size: float = 0.2) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Per-station chronological train/test split of `starts`. The last
+        `test_size` of each station's rows are test rows; a training window
+        (inputs and targets) never reaches into them, so no row is seen by
+        both sides.
+        """
+        lo, hi = self.station_bounds[:-1], self.station_bounds[1:]
+        cuts = lo + np.floor((hi - lo) * (1 - test_size)).astype(np.int64)
+        cut = cuts[np.searchsorted(self.station_bounds, self.starts, side='right') - 1]
+        train = self.starts[self.starts + self.window + self.horizon <= cut]
+        test = self.starts[self.starts >= cut]
+        return train, test
+
+
+class WindowBatches(keras.utils.PyDataset):
+    """
+    Feeds `model.fit`/`predict` from a WindowedSeries one copied batch at a
+    time. `workers` threads (processes with `use_multiprocessing`) copy up
+    to `max_queue_size` batches ahead, so the model does not wait on the
+    host while a batch is read from a memory-mapped series.
+    """
+
+    def __init__(
+        self,
+        series: WindowedSeries,
+        starts: np.ndarray,
+        batch_size: int = 64,
+        shuffle: bool = False,
+        seed: int = 42,
+        target_shape: Optional[tuple] = None,
+        workers: int = 4,
+        use_multiprocessing: bool = False,
+        max_queue_size: int = 10,
+        **kwargs,
+    ):
+        super().__init__(workers=workers, use_multiprocessing=use_multiprocessing, max_queue_size=max_queue_size, **kwargs)
+        self.series = series
+        self.starts = np.array(starts)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.target_shape = target_shape
+        self.rng = np.random.default_rng(seed)
+        if shuffle:
+            self.rng.shuffle(self.starts)
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.starts) / self.batch_size)
+
+    def __getitem__(self, index):
+        starts = self.starts[index * self.batch_size:(index + 1) * self.batch_size]
+        X, y = self.series.take(starts)
+        if self.target_shape is not None:
+            y = y.reshape((len(starts), *self.target_shape))
+        return X, y
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.starts)
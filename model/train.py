@@ -0,0 +1,567 @@
+"""
+One entry point for training the forecast models.
+
+    python -m model.train                                  # the models the backend serves, one after another
+    python -m model.train --targets temperature condition
+    python -m model.train --workers 4                      # one process per target
+    python -m model.train --targets multi_output           # one model for temperature, humidity and precipitation
+    python -m model.train --targets stepwise               # v1 temperature and condition, one recurrent step per hour
+    python -m model.train --targets v1_temperature         # the single-step v1 temperature model
+    python -m model.train --stream                         # stream windows from parquet every epoch
+
+The observations are read from the station dataset one station at a time,
+scaled once and written to .npy files in a scratch directory. Every target
+then cuts its own windows out of the same memory-mapped feature matrix
+(`WindowedSeries` views, no per-target copies) and feeds them through the
+tf.data pipeline of `model.pipeline.series_dataset`, in this process or, with
+`--workers` above 1, in worker processes, so the page cache holds a single
+copy however many models train and however large the dataset is.
+
+With `--stream` nothing is written: the scalers are fitted in one pass and
+every epoch streams the windows from the station dataset through
+`model.pipeline.window_dataset`, trading parquet reads per epoch for disk.
+
+Artifacts are written where `backend/services/registry.py` loads them from:
+`<output>/<target directory>/<file>`.
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
+from typing import Iterable, Optional, Union
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")  # disable GPU
+
+import joblib
+import tensorflow as tf
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from tensorflow import keras
+from tensorflow.keras import layers
+
+from model.data import DATASET_DIR, FEATURES, load_observations
+from model.pipeline import WindowThroughput, series_dataset, station_ids, window_dataset
+from model.sequences import WindowedSeries
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend', 'models')
+
+HISTORY_STEPS = 96   # past 4 days (96h)
+FUTURE_STEPS = 24    # predict 24h
+WINDOW_SIZE = 24     # condition classifier input
+
+
+@dataclass(frozen=True)
+class TargetSpec:
+    column: str | tuple   # a tuple trains one multi-output model with a head per column
+    directory: str
+    files: dict           # role ('model', 'scaler_x', 'scaler_y', 'label_encoder') -> file name
+    kind: str = 'seq2seq'  # 'seq2seq', 'classifier', 'regressor' or 'stepwise'
+    window: int = HISTORY_STEPS
+    horizon: int = FUTURE_STEPS
+    epochs: int = 80
+    batch_size: int = 32
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.column) if isinstance(self.column, tuple) else [self.column]
+
+
+TARGETS = {
+    'temperature': TargetSpec('air_temperature', 'temperature', {
+        'scaler_x': 'scaler_X_latest2.pkl',
+        'scaler_y': 'scaler_y_temperature_latest2.pkl',
+        'model': 'seq2seq_temperature_forecast_optimized.keras',
+    }),
+    'relative_humidity': TargetSpec('relative_humidity', 'relative_humidity', {
+        'scaler_x': 'scaler_x_relative_humidity.pkl',
+        'scaler_y': 'scaler_y_relative_humidity.pkl',
+        'model': 'seq2seq_relative_humidity_forecast.keras',
+    }),
+    # The directory name predates the training script; the shipped models live there
+    'precipitation': TargetSpec('precipitation', 'precipation', {
+        'scaler_x': 'scaler_x_precipitation.pkl',
+        'scaler_y': 'scaler_y_precipitation.pkl',
+        'model': 'seq2seq_precipitation_forecast.keras',
+    }),
+    # Shared encoder with a decoder head per target; the three forecasts cost one pass
+    'multi_output': TargetSpec(('air_temperature', 'relative_humidity', 'precipitation'), 'multi_output', {
+        'scaler_x': 'scaler_x_multi_output.pkl',
+        'scaler_y': 'scaler_y_multi_output.pkl',
+        'model': 'seq2seq_multi_output_forecast.keras',
+    }),
+    'condition': TargetSpec('condition_group', 'condition', {
+        'scaler_x': 'scaler_x_condition.pkl',
+        'label_encoder': 'label_encoder_condition.pkl',
+        'model': 'lstm_condition_classifier_latest.keras',
+    }, kind='classifier', window=WINDOW_SIZE, horizon=1, epochs=30, batch_size=64),
+    # Causal LSTMs predicting the next hour after every input row; the saved
+    # model carries its state so the v1 rollout costs one step per hour
+    'stepwise': TargetSpec(('air_temperature', 'condition_group'), 'stepwise', {
+        'scaler_x': 'scaler_x_stepwise.pkl',
+        'scaler_y': 'scaler_y_stepwise.pkl',
+        'label_encoder': 'label_encoder_stepwise.pkl',
+        'model': 'lstm_stepwise.keras',
+    }, kind='stepwise', horizon=1, epochs=30, batch_size=64),
+    # The v1 model: next hour's temperature (unscaled) from the last 24h
+    'v1_temperature': TargetSpec('air_temperature', '', {
+        'scaler_x': 'scaler_X_latest.pkl',
+        'model': 'lstm_temperature_latest.keras',
+    }, kind='regressor', window=WINDOW_SIZE, horizon=1, epochs=30, batch_size=64),
+}
+
+# Trained when no targets are given. The backend switches to the multi-output
+# and step-wise models as soon as their artifacts exist, so they are only
+# trained on request
+DEFAULT_TARGETS = ('temperature', 'relative_humidity', 'precipitation', 'condition')
+
+
+def _target_shape(spec: TargetSpec) -> Optional[tuple]:
+    """Per-window target shape the model expects, where it differs from the stored one."""
+    return {'seq2seq': (spec.horizon, len(spec.columns)), 'regressor': (1,)}.get(spec.kind)
+
+
+def _encode_targets(spec: TargetSpec, scalers: dict, df: pd.DataFrame) -> np.ndarray:
+    """The training targets of `spec` for the rows of `df`, using its fitted scalers / encoders."""
+    if spec.kind == 'classifier':
+        return scalers['label_encoder'].transform(df[spec.column]).astype(np.int32)
+    if spec.kind == 'stepwise':
+        temperature, condition = spec.columns
+        # Scaled temperature and condition code side by side in one float32 array
+        return np.column_stack([
+            scalers['scaler_y'].transform(df[[temperature]])[:, 0], scalers['label_encoder'].transform(df[condition]),
+        ]).astype(np.float32)
+    if spec.kind == 'regressor':
+        return df[spec.column].to_numpy(np.float32)
+    scaled = scalers['scaler_y'].transform(df[spec.columns]).astype(np.float32)
+    return scaled if len(spec.columns) > 1 else scaled[:, 0]
+
+
+def fit_scalers(targets: Iterable[str], stations: list[str], root: str = DATASET_DIR) -> tuple:
+    """
+    One pass over `stations`: the feature scaler, every target's scalers /
+    encoders and each station's row count, holding one station at a time.
+    """
+    specs = {name: TARGETS[name] for name in targets}
+    columns = FEATURES + [column for spec in specs.values() for column in spec.columns]
+    scaler_x = MinMaxScaler()
+    scalers_y = {name: MinMaxScaler() for name, spec in specs.items() if spec.kind in ('seq2seq', 'stepwise')}
+    labels = {name: set() for name, spec in specs.items() if spec.kind in ('classifier', 'stepwise')}
+    counts = []
+    for station_id in stations:
+        df = load_observations([station_id], columns=columns, root=root)
+        counts.append(len(df))
+        if not len(df):
+            continue
+        scaler_x.partial_fit(df[FEATURES])
+        for name, scaler_y in scalers_y.items():
+            scaler_y.partial_fit(df[specs[name].columns[:1] if specs[name].kind == 'stepwise' else specs[name].columns])
+        for name, seen in labels.items():
+            seen.update(df[specs[name].columns[-1]].unique())
+    print(f"📦 {sum(counts)} rows from {sum(1 for count in counts if count)} stations")
+
+    target_scalers = {name: {} for name in specs}
+    for name, scaler_y in scalers_y.items():
+        target_scalers[name]['scaler_y'] = scaler_y
+    for name, seen in labels.items():
+        target_scalers[name]['label_encoder'] = LabelEncoder().fit(sorted(seen))
+    return scaler_x, target_scalers, counts
+
+
+def _stepwise_outputs(X, y):
+    """Per-step (temperature, condition code) targets as the two named outputs of `build_stepwise`."""
+    return X, {'temperature': y[..., :1], 'condition': tf.cast(y[..., 1], tf.int32)}
+
+
+class TrainingData:
+    """
+    The scaled features plus every requested target, row-aligned and sorted
+    by station then time, with the scalers / encoders that produced them.
+    Built by `build` as .npy files and memory-mapped by `open`.
+    """
+
+    def __init__(self, X, station_ids, timestamps, targets: dict, scaler_x, target_scalers: dict):
+        self.X = X
+        self.station_ids = station_ids
+        self.timestamps = timestamps
+        self.targets = targets
+        self.scaler_x = scaler_x
+        self.target_scalers = target_scalers
+
+    @classmethod
+    def build(
+        cls,
+        directory: str,
+        targets: Iterable[str],
+        stations: Optional[Iterable] = None,
+        root: str = DATASET_DIR,
+    ) -> 'TrainingData':
+        """
+        Scale the dataset into `directory` one station at a time and open it.
+
+        The first pass over the stations fits the scalers and encoders and
+        counts the rows (`fit_scalers`), the second writes every station's
+        scaled rows into preallocated .npy files. Memory holds one station
+        at a time, however large the dataset.
+        """
+        targets = list(targets)
+        specs = {name: TARGETS[name] for name in targets}
+        columns = FEATURES + [column for spec in specs.values() for column in spec.columns]
+        stations = [str(station_id) for station_id in (stations or station_ids(root))]
+        scaler_x, target_scalers, counts = fit_scalers(targets, stations, root)
+
+        # --- Second pass: scaled rows into the memory-mapped arrays ---
+        rows = sum(counts)
+
+        def create(name, dtype, shape=()):
+            return np.lib.format.open_memmap(os.path.join(directory, f'{name}.npy'), mode='w+', dtype=dtype, shape=(rows, *shape))
+
+        X = create('X', np.float32, (len(FEATURES),))
+        station_codes = create('station_ids', np.int32)
+        timestamps = create('timestamps', 'datetime64[ns]')
+        values = {}
+        offset = 0
+        for code, (station_id, count) in enumerate(zip(stations, counts)):
+            if not count:
+                continue
+            df = load_observations([station_id], columns=columns, root=root)
+            rows_slice = slice(offset, offset + len(df))
+            X[rows_slice] = scaler_x.transform(df[FEATURES])
+            # Only equality between neighbouring rows matters for window bounds
+            station_codes[rows_slice] = code
+            timestamps[rows_slice] = df['timestamp'].to_numpy()
+            for name, spec in specs.items():
+                encoded = _encode_targets(spec, target_scalers[name], df)
+                if name not in values:
+                    values[name] = create(f'y_{name}', encoded.dtype, encoded.shape[1:])
+                values[name][rows_slice] = encoded
+            offset += len(df)
+
+        for array in (X, station_codes, timestamps, *values.values()):
+            array.flush()
+        del X, station_codes, timestamps, values
+        joblib.dump((scaler_x, target_scalers), os.path.join(directory, 'scalers.pkl'))
+        return cls.open(directory, targets)
+
+    @classmethod
+    def open(cls, directory: str, targets: Iterable[str]) -> 'TrainingData':
+        """Memory-map arrays written by `build`."""
+        def array(name):
+            return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+        scaler_x, target_scalers = joblib.load(os.path.join(directory, 'scalers.pkl'))
+        return cls(
+            array('X'), array('station_ids'), array('timestamps'),
+            {name: array(f'y_{name}') for name in targets},
+            scaler_x, target_scalers,
+        )
+
+    def series(self, name: str) -> WindowedSeries:
+        spec = TARGETS[name]
+        return WindowedSeries(self.X, self.targets[name], self.station_ids, spec.window, spec.horizon,
+                              timestamps=self.timestamps)
+
+    def batches(self, name: str, split: str, batch_size: int, test_size: float = 0.2):
+        """Batches of the `split` ('train' or 'test') windows of `name`, or None if there are none."""
+        spec = TARGETS[name]
+        series = self.series(name)
+        starts = dict(zip(('train', 'test'), series.split(test_size)))[split]
+        print(f"🧮 {name}: {len(starts)} {split} windows")
+        if not len(starts):
+            return None
+        return series_dataset(
+            series, starts, batch_size, shuffle=split == 'train',
+            target_shape=_target_shape(spec),
+            step_targets=spec.kind == 'stepwise',
+            map_batch=_stepwise_outputs if spec.kind == 'stepwise' else None,
+        )
+
+
+class StreamedData:
+    """
+    The scalers of `TrainingData` without its arrays: every epoch streams the
+    windows of a target from the station dataset (`window_dataset`).
+    """
+
+    def __init__(self, scaler_x, target_scalers: dict, stations: list[str], root: str = DATASET_DIR):
+        self.scaler_x = scaler_x
+        self.target_scalers = target_scalers
+        self.stations = stations
+        self.root = root
+
+    @classmethod
+    def fit(cls, targets: Iterable[str], stations: Optional[Iterable] = None, root: str = DATASET_DIR) -> 'StreamedData':
+        stations = [str(station_id) for station_id in (stations or station_ids(root))]
+        scaler_x, target_scalers, counts = fit_scalers(list(targets), stations, root)
+        return cls(scaler_x, target_scalers, [station for station, count in zip(stations, counts) if count], root)
+
+    def save(self, directory: str) -> None:
+        """Write the scalers where `open` (in a worker process) reads them."""
+        joblib.dump((self.scaler_x, self.target_scalers, self.stations, self.root), os.path.join(directory, 'scalers.pkl'))
+
+    @classmethod
+    def open(cls, directory: str, targets: Iterable[str] = ()) -> 'StreamedData':
+        return cls(*joblib.load(os.path.join(directory, 'scalers.pkl')))
+
+    def batches(self, name: str, split: str, batch_size: int, test_size: float = 0.2) -> tf.data.Dataset:
+        spec = TARGETS[name]
+        return window_dataset(
+            FEATURES, spec.columns, spec.window, spec.horizon,
+            scaler=self.scaler_x,
+            target_transform=partial(_encode_targets, spec, self.target_scalers[name]),
+            split=split, test_size=test_size, stations=self.stations, root=self.root, batch_size=batch_size,
+            target_shape=_target_shape(spec),
+            target_width=2 if spec.kind == 'stepwise' else len(spec.columns) if spec.kind == 'seq2seq' and len(spec.columns) > 1 else None,
+            step_targets=spec.kind == 'stepwise',
+            map_batch=_stepwise_outputs if spec.kind == 'stepwise' else None,
+        )
+
+
+def build_seq2seq(history_steps: int, future_steps: int, n_features: int) -> keras.Model:
+    # Encoder
+    encoder_inputs = layers.Input(shape=(history_steps, n_features))
+    encoder_l1 = layers.LSTM(128, return_sequences=True)(encoder_inputs)
+    encoder_l1 = layers.Dropout(0.2)(encoder_l1)
+    encoder_outputs, state_h, state_c = layers.LSTM(64, return_state=True)(encoder_l1)
+
+    # Decoder
+    decoder_inputs = layers.RepeatVector(future_steps)(state_h)
+    decoder_l1 = layers.LSTM(64, return_sequences=True)(decoder_inputs, initial_state=[state_h, state_c])
+    decoder_l1 = layers.Dropout(0.2)(decoder_l1)
+    decoder_outputs = layers.TimeDistributed(layers.Dense(1))(decoder_l1)
+
+    model = keras.Model(encoder_inputs, decoder_outputs)
+    model.compile(optimizer='adam', loss='mae', metrics=['mse'])
+    return model
+
+
+def build_multi_output_seq2seq(history_steps: int, future_steps: int, n_features: int, heads: list[str]) -> keras.Model:
+    """
+    The seq2seq encoder run once, feeding one decoder per target. The heads
+    are concatenated, so the output is (N, future_steps, len(heads)) in
+    `heads` order.
+    """
+    # Encoder
+    encoder_inputs = layers.Input(shape=(history_steps, n_features))
+    encoder_l1 = layers.LSTM(128, return_sequences=True)(encoder_inputs)
+    encoder_l1 = layers.Dropout(0.2)(encoder_l1)
+    encoder_outputs, state_h, state_c = layers.LSTM(64, return_state=True)(encoder_l1)
+
+    # Decoders
+    decoder_inputs = layers.RepeatVector(future_steps)(state_h)
+    outputs = []
+    for head in heads:
+        decoder = layers.LSTM(64, return_sequences=True, name=f'{head}_decoder')(decoder_inputs, initial_state=[state_h, state_c])
+        decoder = layers.Dropout(0.2)(decoder)
+        outputs.append(layers.TimeDistributed(layers.Dense(1), name=f'{head}_output')(decoder))
+
+    model = keras.Model(encoder_inputs, layers.Concatenate(name='forecast')(outputs))
+    model.compile(optimizer='adam', loss='mae', metrics=['mse'])
+    return model
+
+
+def build_classifier(window: int, n_features: int, n_classes: int) -> keras.Model:
+    model = keras.Sequential([
+        layers.Input(shape=(window, n_features)),
+        layers.Bidirectional(layers.LSTM(128, return_sequences=True)),
+        layers.Dropout(0.3),
+        layers.Bidirectional(layers.LSTM(64)),
+        layers.Dropout(0.3),
+        layers.Dense(n_classes, activation='softmax'),
+    ])
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+def build_regressor(window: int, n_features: int) -> keras.Model:
+    model = keras.Sequential([
+        layers.Input(shape=(window, n_features)),
+        layers.Bidirectional(layers.LSTM(128, return_sequences=True)),
+        layers.Dropout(0.2),
+        layers.Bidirectional(layers.LSTM(64)),
+        layers.Dropout(0.2),
+        layers.Dense(1),
+    ])
+    model.compile(optimizer='adam', loss='mse', metrics=['mae'])
+    return model
+
+
+def build_stepwise(n_features: int, n_classes: int) -> tuple[keras.Model, keras.Model]:
+    """
+    Unidirectional LSTMs that predict the next hour's temperature and
+    condition after every input row.
+
+    Returns the training model, (N, steps, features) -> per-step
+    `temperature` and `condition`, and a step model sharing its weights,
+    [x, h1, c1, h2, c2] -> [temperature, condition, h1, c1, h2, c2], which
+    continues from the given LSTM states and predicts after the last row of x.
+    """
+    lstm_1 = layers.LSTM(128, return_sequences=True, return_state=True, name='lstm_1')
+    lstm_2 = layers.LSTM(64, return_sequences=True, return_state=True, name='lstm_2')
+    dropout_1, dropout_2 = layers.Dropout(0.2), layers.Dropout(0.2)
+    temperature = layers.Dense(1, name='temperature')
+    condition = layers.Dense(n_classes, activation='softmax', name='condition')
+
+    inputs = layers.Input(shape=(None, n_features))
+    sequence, *_ = lstm_1(inputs)
+    sequence, *_ = lstm_2(dropout_1(sequence))
+    sequence = dropout_2(sequence)
+    model = keras.Model(inputs, {'temperature': temperature(sequence), 'condition': condition(sequence)})
+    model.compile(
+        optimizer='adam',
+        loss={'temperature': 'mse', 'condition': 'sparse_categorical_crossentropy'},
+        metrics={'temperature': ['mae'], 'condition': ['accuracy']},
+    )
+
+    step_inputs = layers.Input(shape=(None, n_features))
+    states = [layers.Input(shape=(units,)) for units in (128, 128, 64, 64)]
+    sequence, h1, c1 = lstm_1(step_inputs, initial_state=states[:2])
+    sequence, h2, c2 = lstm_2(dropout_1(sequence), initial_state=states[2:])
+    last = dropout_2(sequence)[:, -1]
+    step_model = keras.Model([step_inputs, *states], [temperature(last), condition(last), h1, c1, h2, c2])
+    return model, step_model
+
+
+def train_target(
+    name: str,
+    data: Union[TrainingData, StreamedData],
+    output_dir: str = MODELS_DIR,
+    epochs: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    test_size: float = 0.2,
+) -> dict:
+    """Train one target on `data` and write its artifacts. Returns the written paths by role."""
+    spec = TARGETS[name]
+    epochs = epochs or spec.epochs
+    batch_size = batch_size or spec.batch_size
+    started = time.perf_counter()
+
+    # --- Windows (last `test_size` of each station held out) ---
+    train_batches = data.batches(name, 'train', batch_size, test_size)
+    test_batches = data.batches(name, 'test', batch_size, test_size)
+
+    # --- Model ---
+    callbacks = [WindowThroughput(batch_size)]
+    saved_model = None
+    if spec.kind == 'classifier':
+        encoder = data.target_scalers[name]['label_encoder']
+        model = build_classifier(spec.window, len(FEATURES), len(encoder.classes_))
+    elif spec.kind == 'regressor':
+        model = build_regressor(spec.window, len(FEATURES))
+    elif spec.kind == 'stepwise':
+        encoder = data.target_scalers[name]['label_encoder']
+        model, saved_model = build_stepwise(len(FEATURES), len(encoder.classes_))
+    else:
+        if len(spec.columns) > 1:
+            model = build_multi_output_seq2seq(spec.window, spec.horizon, len(FEATURES), spec.columns)
+        else:
+            model = build_seq2seq(spec.window, spec.horizon, len(FEATURES))
+        if test_batches is not None:
+            callbacks += [
+                keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-5, verbose=1),
+                keras.callbacks.EarlyStopping(monitor='val_loss', patience=15, restore_best_weights=True, verbose=1),
+            ]
+
+    model.fit(train_batches, validation_data=test_batches, epochs=epochs, callbacks=callbacks, verbose=2)
+
+    # --- Artifacts ---
+    directory = os.path.join(output_dir, spec.directory)
+    os.makedirs(directory, exist_ok=True)
+    paths = {role: os.path.join(directory, file_name) for role, file_name in spec.files.items()}
+    (saved_model or model).save(paths['model'])
+    if 'scaler_x' in paths:
+        joblib.dump(data.scaler_x, paths['scaler_x'])
+    for role, scaler in data.target_scalers[name].items():
+        joblib.dump(scaler, paths[role])
+
+    print(f"✅ {name} model saved to {directory} in {time.perf_counter() - started:.0f}s")
+    return paths
+
+
+def _train_in_worker(name, arrays_dir, targets, output_dir, epochs, batch_size, threads, stream=False):
+    import tensorflow as tf
+
+    # Split the cores between the workers instead of each one claiming all of them
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    data = (StreamedData if stream else TrainingData).open(arrays_dir, targets)
+    return train_target(name, data, output_dir, epochs, batch_size)
+
+
+def _train_in_workers(targets, arrays_dir, output_dir, workers, epochs, batch_size, stream) -> dict:
+    workers = min(workers, len(targets))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    results, failed = {}, {}
+    # TensorFlow is not fork-safe; spawn fresh interpreters
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(_train_in_worker, name, arrays_dir, targets, output_dir, epochs, batch_size, threads, stream): name
+            for name in targets
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                failed[name] = e
+                print(f"⚠️ Training {name} failed: {e}")
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(targets)} targets failed: {', '.join(failed)}")
+    return results
+
+
+def train(
+    targets: Iterable[str] = DEFAULT_TARGETS,
+    output_dir: str = MODELS_DIR,
+    workers: int = 1,
+    epochs: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    stations: Optional[Iterable] = None,
+    root: str = DATASET_DIR,
+    stream: bool = False,
+) -> dict:
+    """
+    Train `targets` from one build of the memory-mapped arrays, or with
+    `stream` from windows streamed out of the dataset every epoch. Returns
+    the artifact paths per target.
+    """
+    targets = list(dict.fromkeys(targets))
+    with tempfile.TemporaryDirectory(prefix='weather-train-') as arrays_dir:
+        if stream:
+            data = StreamedData.fit(targets, stations, root)
+            data.save(arrays_dir)
+        else:
+            data = TrainingData.build(arrays_dir, targets, stations, root)
+        if workers <= 1 or len(targets) == 1:
+            return {name: train_target(name, data, output_dir, epochs, batch_size) for name in targets}
+        del data
+        return _train_in_workers(targets, arrays_dir, output_dir, workers, epochs, batch_size, stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train forecast models from the station dataset')
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(DEFAULT_TARGETS))
+    parser.add_argument('--workers', type=int, default=1, help='Targets trained in parallel processes')
+    parser.add_argument('--output', default=MODELS_DIR, help='Models directory the backend loads from')
+    parser.add_argument('--epochs', type=int, help='Override the per-target epoch count')
+    parser.add_argument('--batch-size', type=int, help='Override the per-target batch size')
+    parser.add_argument('--stations', nargs='+', help='Train on these stations only')
+    parser.add_argument('--root', default=DATASET_DIR)
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream windows from the dataset every epoch instead of memory-mapping them')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    train(args.targets, args.output, args.workers, args.epochs, args.batch_size, args.stations, args.root, args.stream)
+    print(f"🏁 Trained {', '.join(args.targets)} in {time.perf_counter() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()